@@ -0,0 +1,312 @@
+import hashlib
+import json
+import random
+import threading
+from datetime import datetime, timedelta
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Local stand-in for the sites the scrapers read: Nutrislice menu pages and the
+# Nutrislice menu API behind them, the WIN organization list and detail pages
+# and its paginated organization search endpoint, and the Union dine page and
+# venue pages. The markup only has what the scrapers look at plus filler of
+# realistic size, and is generated from a seed so every benchmark run parses
+# the same bytes.
+
+TRAITS = ['wheat', 'soy', 'dairy', 'egg', 'corn', 'fish', 'coconut', 'vegan', 'vegetarian', 'halal', 'gluten_free']
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+DISHES = ['Chicken', 'Tofu', 'Beef', 'Pasta', 'Salad', 'Soup', 'Rice', 'Pizza', 'Tacos', 'Curry', 'Waffles', 'Omelet']
+STYLES = ['Grilled', 'Roasted', 'Spicy', 'Garlic', 'Lemon', 'Teriyaki', 'Vegan', 'Classic', 'Baked', 'Smoked']
+DINING_HALLS = ['Four Lakes Market', 'Gordon Avenue Market', 'Liz\'s Market', 'Rheta\'s Market', 'Carson\'s Market',
+                'Lowell Market']
+RESTAURANTS = ['Der Rathskeller', 'Strada', 'Daily Scoop', 'Peet\'s Coffee', 'Sunroom Cafe', 'Lakefront on Langdon',
+               'Craft Burger', 'Ginkgo Tree Market', 'Steep & Brew', 'Badger Market']
+
+
+def slugify(name):
+    return ''.join(ch if ch.isalnum() else '-' for ch in name.lower()).strip('-')
+
+
+def filler(n):
+    # Navigation and script noise around the content, like the real pages have
+    return ''.join(f'<div class="nav-{i}"><span>Nav item {i}</span><a href="/nav/{i}">link</a></div>' for i in range(n))
+
+
+def menu_page(rng, n_items):
+    items = []
+    for i in range(n_items):
+        icons = ''.join(
+            f'<div class="custom-icon" style="background-image: url(&quot;https://cdn.example/'
+            f'Food_Trait_Icons_{trait}-{i:04x}.png&quot;);"></div>'
+            for trait in rng.sample(TRAITS, rng.randint(0, 4))
+        )
+        calories = f'<li class="food-calories"> {rng.randint(10, 900)} Cal </li>' if rng.random() > 0.15 else ''
+        name = f"{rng.choice(STYLES)} {rng.choice(DISHES)} &amp; {rng.choice(DISHES)}"
+        items.append(
+            f'<ns-menu-item-food><div class="food-card"><span class="food-name"> {name} </span>'
+            f'<ul>{calories}<li class="food-price">$0.00</li></ul><div class="icons">{icons}</div></div>'
+            f'</ns-menu-item-food>'
+        )
+    return (f'<html><head><script>window.config = {{"menu": true}};</script></head><body>{filler(300)}'
+            f'<main class="menu">{"".join(items)}</main>{filler(100)}</body></html>')
+
+
+def organization_image(i):
+    return f"https://se-images.campuslabs.com/clink/images/org-{i}.jpg?preset=small-sq"
+
+
+def search_api(n_organizations):
+    """
+    Stand-in for the organization search endpoint: pages of the same
+    organizations the listing page shows, selected with top and skip.
+    """
+    organizations = [{
+        'Id': i,
+        'Name': f"Organization {i} & Friends",
+        'WebsiteKey': f"org-{i}",
+        'ProfilePicture': f"org-{i}.jpg" if i % 9 else None,
+        'Summary': f"Short summary of organization {i}"
+    } for i in range(n_organizations)]
+
+    def search(path, query):
+        top = int(query.get('top', ['10'])[0])
+        skip = int(query.get('skip', ['0'])[0])
+        page = {'@odata.count': len(organizations), 'value': organizations[skip:skip + top]}
+        return 'application/json', json.dumps(page).encode('utf-8')
+
+    return search
+
+
+def nutrislice_api(n_menu_items, seed=0):
+    """
+    Stand-in for the Nutrislice menu API: the schools endpoint lists the dining
+    halls and the weeks endpoint returns the Sunday-to-Saturday week around any
+    date. A hall, meal and day always get the same dishes, drawn from one pool
+    so food ids repeat across halls and days like the real menus.
+    """
+    rng = random.Random(seed)
+    pool = []
+    for food_id in range(4 * n_menu_items):
+        pool.append({
+            'id': 100000 + food_id,
+            'name': f"{rng.choice(STYLES)} {rng.choice(DISHES)} & {rng.choice(DISHES)}",
+            'ingredients': ', '.join(rng.sample([dish.lower() for dish in DISHES], 4)),
+            'rounded_nutrition_info': {
+                'calories': rng.randint(10, 900) if rng.random() > 0.15 else None,
+                'g_protein': rng.randint(0, 60),
+                'g_carbs': rng.randint(0, 120),
+                'g_fat': rng.randint(0, 50)
+            },
+            'icons': {'food_icons': [
+                {'slug': trait, 'custom_icon_url': f"https://cdn.example/Food_Trait_Icons_{trait}-{food_id:04x}.png"}
+                for trait in rng.sample(TRAITS, rng.randint(0, 4))
+            ]}
+        })
+    schools = [{
+        'name': hall,
+        'slug': slugify(hall),
+        'address': f"{i + 1}00 University Ave",
+        'active_menu_types': [{'slug': meal_type, 'formatted_hours': hours} for meal_type, hours in
+                              zip(MEAL_TYPES, ['7AM - 10AM', '11AM - 2PM', '5PM - 8PM'])]
+    } for i, hall in enumerate(DINING_HALLS)]
+
+    def schools_endpoint(path, query):
+        return 'application/json', json.dumps(schools).encode('utf-8')
+
+    def day_menu(slug, meal_type, date):
+        day_rng = random.Random(f"{slug}/{meal_type}/{date}")
+        items = [{'is_section_title': True, 'text': 'Entrees', 'food': None}]
+        items.extend({'is_section_title': False, 'food': food} for food in day_rng.sample(pool, n_menu_items))
+        return {'date': date, 'menu_items': items}
+
+    def weeks_endpoint(path, query):
+        # .../weeks/school/<slug>/menu-type/<meal>/<year>/<month>/<day>/
+        slug, _, meal_type, year, month, day = path.strip('/').split('/')[-6:]
+        date = datetime(int(year), int(month), int(day))
+        sunday = date - timedelta(days=(date.weekday() + 1) % 7)
+        week = {'days': [day_menu(slug, meal_type, (sunday + timedelta(days=i)).strftime('%Y-%m-%d'))
+                         for i in range(7)]}
+        return 'application/json', json.dumps(week).encode('utf-8')
+
+    return {'/menu/api/schools/': schools_endpoint, '/menu/api/weeks/': weeks_endpoint}
+
+
+def listing_page(n_organizations):
+    organizations = []
+    for i in range(n_organizations):
+        image = f'<div><img src="{organization_image(i)}"></div>' if i % 9 else ''
+        organizations.append(
+            f'<a href="/organization/org-{i}">{image}'
+            f'<div style="font-size: 1.125rem; font-weight: 600;"> Organization {i} &amp; Friends </div>'
+            f'<div class="summary">Short summary of organization {i}</div></a>'
+        )
+    return (f'<html><body>{filler(300)}<ul class="MuiList-root MuiList-padding">{"".join(organizations)}</ul>'
+            f'{filler(100)}</body></html>')
+
+
+def detail_page(rng, i):
+    # Each of the places extract_details_from_html finds an email in
+    email = [
+        f'<div><span class="sr-only">Contact Email</span> E: org{i}@wisc.edu</div>',
+        f'<div>E: org{i}.board@gmail.com</div>',
+        f'<p>Write to us at contact{i}@example.org</p>',
+        ''
+    ][i % 4]
+    paragraphs = ''.join(f'<p>{" ".join(rng.choice(DISHES + STYLES).lower() for _ in range(40))}</p>'
+                         for _ in range(rng.randint(1, 4)))
+    links = (f'<a href="https://www.instagram.com/org{i}" aria-label="Instagram">i</a>'
+             f'<a href="https://facebook.com/org{i}" aria-label="Facebook">f</a>'
+             f'<a href="https://org{i}.example.org" aria-label="Visit our site"><i class="globe"></i></a>'
+             f'<a href="/organizations">back</a>')
+    return (f'<html><body>{filler(300)}<div class="bodyText-large userSupplied">{paragraphs}</div>'
+            f'{email}{links}{filler(100)}</body></html>')
+
+
+def union_page():
+    links = []
+    for name in RESTAURANTS:
+        slug = slugify(name)
+        links.append(f'<div class="venue"><a href="/dine/find-food-and-drink/{slug}/">{name.replace("&", "&amp;")}</a>'
+                     f'<a href="/dine/find-food-and-drink/{slug}/#menu">View Menu</a>'
+                     f'<a href="/dine/find-food-and-drink/{slug}/#map">Directions</a></div>')
+    return f'<html><body>{filler(200)}<section class="venues">{"".join(links)}</section>{filler(100)}</body></html>'
+
+
+def venue_page(rng, name):
+    slug = slugify(name)
+    opens = rng.choice(['7am', '8am', '10am', '11am'])
+    return (f'<html><body>{filler(200)}<h1>{name.replace("&", "&amp;")}</h1>'
+            f'<div class="venue-hours"><h2>Hours</h2><ul><li>Mon-Fri: {opens} - 10pm</li>'
+            f'<li>Sat-Sun: 11am - 8pm</li></ul></div>'
+            f'<div class="venue-location"><h2>Location</h2><p>Memorial Union, 800 Langdon St</p></div>'
+            f'<a href="#menu">Menu</a><a href="/dine/menus/{slug}/">View Menu</a>'
+            f'<a href="https://order.example.com/{slug}/menu">Order online</a>{filler(100)}</body></html>')
+
+
+def build_pages(n_organizations=100, n_menu_items=120, menu_date='2025-01-06', seed=0):
+    """
+    Generate every page of the stand-in site.
+
+    Returns:
+    dict: URL path -> HTML
+    """
+    rng = random.Random(seed)
+    pages = {'/organizations': listing_page(n_organizations)}
+    for i in range(n_organizations):
+        pages[f'/organization/org-{i}'] = detail_page(rng, i)
+    for hall in DINING_HALLS:
+        for meal_type in MEAL_TYPES:
+            pages[f'/menu/{slugify(hall)}/{meal_type}/{menu_date}'] = menu_page(rng, n_menu_items)
+    pages['/dine/find-food-and-drink/'] = union_page()
+    for name in RESTAURANTS:
+        pages[f'/dine/find-food-and-drink/{slugify(name)}/'] = venue_page(rng, name)
+    return pages
+
+
+def dining_locations(site_url):
+    """
+    Dining locations as get_dining_locations returns them, linking to the stand-in menu pages.
+    """
+    return [{
+        'name': hall,
+        'link': f"{site_url}/menu/{slugify(hall)}",
+        'address': '',
+        'dates_of_operation': '',
+        'breakfast_hours': '7AM - 10AM',
+        'lunch_hours': '11AM - 2PM',
+        'dinner_hours': '5PM - 8PM'
+    } for hall in DINING_HALLS]
+
+
+def build_endpoints(n_organizations=100, n_menu_items=120):
+    """
+    Dynamic endpoints of the stand-in site, for FixtureServer. The Nutrislice
+    API is served under /menu/api/.
+
+    Returns:
+    dict: URL path (or prefix, if it ends with a slash) -> function of the
+    path and the parsed query string returning (content type, body bytes)
+    """
+    endpoints = {'/api/discovery/search/organizations': search_api(n_organizations)}
+    endpoints.update(nutrislice_api(n_menu_items))
+    return endpoints
+
+
+class FixtureServer:
+    """
+    Serves pages from memory on a free local port, in a background thread. Pages
+    carry an ETag and Last-Modified, so conditional requests get 304s; endpoints
+    are answered fresh on every request. requests counts every request served.
+
+    Use as a context manager; url is the base URL to point the scrapers at.
+    """
+
+    def __init__(self, pages, endpoints=None, host='127.0.0.1', port=0):
+        self.pages = {path: html.encode('utf-8') for path, html in pages.items()}
+        self.endpoints = endpoints or {}
+        self.etags = {path: f'"{hashlib.sha1(body).hexdigest()}"' for path, body in self.pages.items()}
+        self.last_modified = formatdate(usegmt=True)
+        self.requests = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                parts = urlsplit(self.path)
+                path = parts.path
+                endpoint = server.find_endpoint(path)
+                if endpoint is not None:
+                    content_type, body = endpoint(path, parse_qs(parts.query, keep_blank_values=True))
+                    self.send_response(200)
+                    self.send_header('Content-Type', content_type)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                body = server.pages.get(path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if self.headers.get('If-None-Match') == server.etags[path]:
+                    self.send_response(304)
+                    self.send_header('ETag', server.etags[path])
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', server.etags[path])
+                self.send_header('Last-Modified', server.last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.thread = None
+
+    def find_endpoint(self, path):
+        # An exact path, else the longest prefix ending in a slash
+        if path in self.endpoints:
+            return self.endpoints[path]
+        prefixes = [prefix for prefix in self.endpoints if prefix.endswith('/') and path.startswith(prefix)]
+        return self.endpoints[max(prefixes, key=len)] if prefixes else None
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
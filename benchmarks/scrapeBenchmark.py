@@ -0,0 +1,333 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+import fixtureSite
+
+# Parse throughput of the scrapers' extraction functions and end-to-end timings
+# of full runs of their entry points (clubsScrape.main, menuScrape.main and
+# scrape_restaurants_to_csv), cold and from a warm page cache, all against the
+# local stand-in site from fixtureSite, written out as JSON. Keep the JSON of
+# a version around and pass it as --baseline to a later run to see what got
+# faster or slower.
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for scraper_dir in ['clubScraping', 'menuScraping', 'unionScraping', 'shared']:
+    sys.path.append(os.path.join(repo_dir, scraper_dir))
+
+import clubsScrape
+import fetchCache
+import menuScrape
+import nutrisliceClient
+import scrapeMetrics
+import wisconsin_union_scraper
+
+MENU_DATE = '2025-01-06'
+
+
+def quiet():
+    # The scrapers print progress for every page; keep it out of the timings' output
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def measure(func, pages, min_seconds=1.0, traced_pages=10):
+    """
+    Parse throughput of func, called once per page, cycling through pages until
+    min_seconds have passed. Peak memory comes from an extra pass over the first
+    traced_pages pages under tracemalloc, so tracing does not slow down the timing.
+
+    Returns:
+    dict: pages, seconds, pages_per_second, mb_per_second and peak_memory_mb
+    """
+    sizes = [len(page.encode('utf-8')) for page in pages]
+    count = total_bytes = 0
+    with quiet():
+        start = time.perf_counter()
+        while True:
+            i = count % len(pages)
+            func(pages[i])
+            count += 1
+            total_bytes += sizes[i]
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_seconds:
+                break
+
+        tracemalloc.start()
+        try:
+            for page in pages[:traced_pages]:
+                func(page)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'pages': count,
+        'seconds': elapsed,
+        'pages_per_second': count / elapsed,
+        'mb_per_second': total_bytes / elapsed / 1e6,
+        'peak_memory_mb': peak / 1e6
+    }
+
+
+def bench_parsers(pages, site_url, work_dir, min_seconds):
+    menu_pages = [html for path, html in pages.items() if path.startswith('/menu/')]
+    detail_pages = [html for path, html in pages.items() if path.startswith('/organization/')]
+    union_csv = os.path.join(work_dir, 'restaurants.csv')
+
+    return {
+        'extract_menu_items': measure(
+            lambda html: menuScrape.extract_menu_items(html, 'Four Lakes Market', 'lunch'), menu_pages, min_seconds),
+        'extract_names_links_and_images': measure(
+            clubsScrape.extract_names_links_and_images, [pages['/organizations']], min_seconds),
+        # extract_details reads the description from a live browser and hands the
+        # page source to extract_details_from_html, which does all of the parsing
+        'extract_details': measure(
+            clubsScrape.extract_details_from_html, detail_pages, min_seconds),
+        # Fetches the dine page and every venue page from the local server, parses
+        # them and writes the CSV; MB/s counts the dine page only
+        'scrape_restaurants_to_csv': measure(
+            lambda html: wisconsin_union_scraper.scrape_restaurants_to_csv(site_url=site_url, csv_path=union_csv),
+            [pages['/dine/find-food-and-drink/']], min_seconds)
+    }
+
+
+def run_scraper(run, server, page_cache=None):
+    """
+    One full run of a scraper's entry point with metrics on.
+
+    Returns:
+    tuple: (stages, counts); stages has the wall time as total and the
+    seconds of each metrics stage summed over pages, which can add up to more
+    than the total when pages are handled in parallel; counts has the requests
+    the stand-in server answered, the page cache hits and misses and the
+    scraper's own counters
+    """
+    requests_before = server.requests
+    cache_before = page_cache.stats() if page_cache is not None else None
+    scrapeMetrics.enable()
+    try:
+        start = time.perf_counter()
+        run()
+        total = time.perf_counter() - start
+    finally:
+        summary = scrapeMetrics.disable()
+
+    stages = {name: numbers['total_seconds'] for name, numbers in summary['stages'].items()}
+    stages['total'] = total
+    counts = dict(summary['counters'], server_requests=server.requests - requests_before)
+    if page_cache is not None:
+        cache_after = page_cache.stats()
+        for name in ('hits', 'misses', 'revalidated'):
+            counts[f"cache_{name}"] = cache_after[name] - cache_before[name]
+    return stages, counts
+
+
+def csv_rows(path):
+    return len(pd.read_csv(path)) if os.path.exists(path) else 0
+
+
+def run_clubs(server, work_dir, workers, mode='http', page_cache=None):
+    """
+    clubsScrape.main against the stand-in site, listing from the search
+    endpoint and writing its output to work_dir.
+    """
+    def run():
+        clubsScrape.main(mode, workers, server.url, page_cache=page_cache, listing='api', batch_size=20,
+                         snapshot_path=os.path.join(work_dir, 'search_snapshot.pkl'), output_dir=work_dir)
+
+    stages, counts = run_scraper(run, server, page_cache)
+    counts['organizations'] = csv_rows(os.path.join(work_dir, 'organization_data.csv'))
+    return stages, counts
+
+
+def run_menus(server, work_dir, workers, source='api', page_cache=None):
+    """
+    menuScrape.main against the stand-in Nutrislice API, writing its output to
+    work_dir.
+    """
+    def run():
+        menuScrape.main(source, workers, 1, page_cache, work_dir, os.path.join(work_dir, 'search_snapshot.pkl'))
+
+    stages, counts = run_scraper(run, server, page_cache)
+    counts['menu_items'] = sum(csv_rows(os.path.join(work_dir, f"dining_hall_{meal_type}_items.csv"))
+                               for meal_type in menuScrape.MEAL_TYPES)
+    return stages, counts
+
+
+def run_union(server, work_dir, page_cache=None):
+    def run():
+        wisconsin_union_scraper.scrape_restaurants_to_csv(page_cache, server.url, os.path.join(work_dir, 'restaurants.csv'))
+
+    stages, counts = run_scraper(run, server, page_cache)
+    counts['restaurants'] = csv_rows(os.path.join(work_dir, 'restaurants.csv'))
+    return stages, counts
+
+
+def run_menus_browser(server, workers):
+    # The stand-in has no location listing for get_dining_locations to click
+    # through, so the browser scrape starts from the menu pages
+    def run():
+        menus = menuScrape.get_menus_for_dates(fixtureSite.dining_locations(server.url), [MENU_DATE],
+                                               pool_size=workers, skip_closed=False)
+        counts['menu_items'] = sum(len(items) for items in menus[MENU_DATE].values())
+
+    counts = {}
+    stages, run_counts = run_scraper(run, server)
+    return stages, dict(run_counts, **counts)
+
+
+def repeat_run(run, repeat):
+    """
+    Run an end-to-end scenario repeat times.
+
+    Returns:
+    dict: Median and best seconds of the whole run and of each stage, plus the
+    counts reported by the last run
+    """
+    runs = []
+    counts = {}
+    for _ in range(repeat):
+        with quiet():
+            stages, counts = run()
+        runs.append(stages)
+
+    stage_names = sorted({stage for stages in runs for stage in stages if stage != 'total'})
+    result = {
+        'runs': repeat,
+        'median_seconds': statistics.median(stages['total'] for stages in runs),
+        'best_seconds': min(stages['total'] for stages in runs),
+        'stages_median_seconds': {stage: statistics.median(stages.get(stage, 0) for stages in runs)
+                                  for stage in stage_names}
+    }
+    result.update(counts)
+    return result
+
+
+def warm_cache(name, run, page_cache, repeat):
+    """
+    Fill page_cache with one untimed run, then time runs served from it. The
+    timed runs must not reach the server; if they do, the cache is not on the
+    path being measured and the run is flagged.
+    """
+    with quiet():
+        run()
+    result = repeat_run(run, repeat)
+    result['served_from_cache'] = result['server_requests'] == 0 and result['cache_misses'] == 0
+    if not result['served_from_cache']:
+        print(f"{name}: warm cache runs made {result['server_requests']} requests "
+              f"({result['cache_misses']} cache misses)", file=sys.stderr)
+    return result
+
+
+def bench_end_to_end(server, work_dir, workers, repeat, browser):
+    # The menu scraper reads the stand-in API instead of Nutrislice
+    nutrisliceClient.api_url = f"{server.url}/menu/api/"
+    results = {
+        'clubs_http': repeat_run(lambda: run_clubs(server, work_dir, workers), repeat),
+        'menus_api': repeat_run(lambda: run_menus(server, work_dir, workers), repeat),
+        'union': repeat_run(lambda: run_union(server, work_dir), repeat)
+    }
+
+    # Warm page caches: the first pass fills them, the timed passes never reach the server
+    cache_dir = os.path.join(work_dir, 'page_cache')
+    page_cache = fetchCache.PageCache(cache_dir, 'cache')
+    results['clubs_http_cached'] = warm_cache(
+        'clubs_http_cached', lambda: run_clubs(server, work_dir, workers, page_cache=page_cache), page_cache, repeat)
+    results['menus_api_cached'] = warm_cache(
+        'menus_api_cached', lambda: run_menus(server, work_dir, workers, page_cache=page_cache), page_cache, repeat)
+    results['union_cached'] = warm_cache(
+        'union_cached', lambda: run_union(server, work_dir, page_cache), page_cache, repeat)
+
+    if browser:
+        results['menus_browser'] = repeat_run(lambda: run_menus_browser(server, workers), repeat)
+        results['clubs_drivers'] = repeat_run(lambda: run_clubs(server, work_dir, workers, 'drivers'), repeat)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repo_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline):
+    """
+    Print how each number moved against a baseline run (>1.00x is faster).
+    """
+    for name, current in results['parse'].items():
+        previous = baseline.get('parse', {}).get(name)
+        if previous:
+            ratio = current['pages_per_second'] / previous['pages_per_second']
+            print(f"parse {name}: {previous['pages_per_second']:.1f} -> {current['pages_per_second']:.1f} pages/s "
+                  f"({ratio:.2f}x)", file=sys.stderr)
+    for name, current in results['end_to_end'].items():
+        previous = baseline.get('end_to_end', {}).get(name)
+        if previous:
+            ratio = previous['median_seconds'] / current['median_seconds']
+            print(f"end-to-end {name}: {previous['median_seconds']:.3f} -> {current['median_seconds']:.3f} s "
+                  f"({ratio:.2f}x)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against a local stand-in site")
+    parser.add_argument('--organizations', type=int, default=100, help="Number of organizations on the stand-in site")
+    parser.add_argument('--menu-items', type=int, default=120, help="Menu items per stand-in menu page")
+    parser.add_argument('--min-seconds', type=float, default=1.0, help="Minimum time spent per parse benchmark")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per end-to-end benchmark")
+    parser.add_argument('--workers', type=int, default=8, help="Pages fetched at once in end-to-end runs")
+    parser.add_argument('--browser', action='store_true',
+                        help="Also run the browser-based end-to-end benchmarks (needs Chrome)")
+    parser.add_argument('--output', default=None, help="Write the results JSON here instead of printing it")
+    parser.add_argument('--baseline', default=None, help="Results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    pages = fixtureSite.build_pages(args.organizations, args.menu_items, MENU_DATE)
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'html_parser': menuScrape.HTML_PARSER,
+            'organizations': args.organizations,
+            'menu_items_per_page': args.menu_items,
+            'workers': args.workers
+        }
+    }
+
+    endpoints = fixtureSite.build_endpoints(args.organizations, args.menu_items)
+    with fixtureSite.FixtureServer(pages, endpoints) as server, tempfile.TemporaryDirectory() as work_dir:
+        print(f"Serving {len(pages)} stand-in pages at {server.url}", file=sys.stderr)
+        results['parse'] = bench_parsers(pages, server.url, work_dir, args.min_seconds)
+        results['end_to_end'] = bench_end_to_end(server, work_dir, args.workers, args.repeat, args.browser)
+
+    for name, result in results['parse'].items():
+        print(f"{name}: {result['pages_per_second']:.1f} pages/s, {result['mb_per_second']:.2f} MB/s, "
+              f"peak {result['peak_memory_mb']:.1f} MB", file=sys.stderr)
+    for name, result in results['end_to_end'].items():
+        print(f"{name}: {result['median_seconds']:.3f} s median of {result['runs']}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(results, indent=2))
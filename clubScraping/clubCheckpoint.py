@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+# Checkpoint of finished organizations for incremental club scrapes. It is an
+# append-only JSON lines file with one record per fetched organization:
+#   {"link": ..., "fingerprint": ..., "fetched_at": ..., "row": {...}}
+# Rows are appended as soon as they are fetched, so an interrupted run loses at
+# most the pages that were in flight. The last record for a link wins.
+
+
+def listing_fingerprint(name, link, image_src):
+    """
+    Fingerprint of an organization's entry in the listing. When it changes
+    (renamed, new picture, new link) the organization page is fetched again.
+    """
+    content = '\x1f'.join([name or '', link or '', image_src or ''])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def load_checkpoint(path):
+    """
+    Load a checkpoint file.
+
+    Returns:
+    dict: link -> latest record for that link (empty if the file does not exist)
+    """
+    records = {}
+    if not os.path.exists(path):
+        return records
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A run killed mid-write can leave a truncated last line
+                print(f"Skipping unreadable checkpoint line in {path}")
+                continue
+            records[record['link']] = record
+    return records
+
+
+def needs_fetch(record, fingerprint, max_age=None, now=None):
+    """
+    Whether an organization has to be fetched again.
+
+    Args:
+    record (dict): Checkpoint record for the organization, or None if it is new
+    fingerprint (str): Current listing fingerprint of the organization
+    max_age (timedelta): Refetch records older than this, even if unchanged
+    now (datetime): Current time, defaults to datetime.now()
+
+    Returns:
+    bool: True if the organization is new, changed or stale
+    """
+    if record is None or record.get('fingerprint') != fingerprint:
+        return True
+    if max_age is not None:
+        now = now or datetime.now()
+        try:
+            fetched_at = datetime.fromisoformat(record['fetched_at'])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return now - fetched_at > max_age
+    return False
+
+
+def make_record(link, fingerprint, row, fetched_at=None):
+    return {
+        'link': link,
+        'fingerprint': fingerprint,
+        'fetched_at': (fetched_at or datetime.now()).isoformat(timespec='seconds'),
+        'row': row
+    }
+
+
+def append_record(f, record):
+    # Flush every record so it survives the process being killed
+    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    f.flush()
+
+
+def compact_checkpoint(path, records):
+    """
+    Rewrite the checkpoint with only the given records (one per link),
+    dropping superseded records and organizations no longer listed.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+
@@ -0,0 +1,328 @@
+import argparse
+import base64
+import bisect
+import heapq
+import json
+import os
+import random
+import sys
+import time
+from itertools import islice
+
+import pandas as pd
+
+# Events page: clubs post events, students see the upcoming events of the clubs
+# they follow. Clubs are keyed by their organization link, which stays the same
+# across scrapes, and each key is given a bit position the first time it is seen;
+# positions are saved with save_positions and never reused, so stored follows
+# keep pointing at the same clubs as clubs are added, renamed or delisted. Each
+# club keeps its events sorted by start time, each user's follows are one
+# integer used as a bitset over club ids, and each club knows its followers for
+# fan-out when it posts. A user's feed is a k-way merge of the event lists of
+# the clubs they follow that have anything coming up; users following a large
+# share of those clubs instead scan the global timeline and test each event's
+# club against their bitset, whichever is expected to touch fewer events given
+# how many events the followed clubs have. Pages continue from an opaque cursor
+# naming the last event shown.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CLUBS_CSV = os.path.join(script_dir, "organization_data.csv")
+DEFAULT_POSITIONS_PATH = os.path.join(script_dir, "club_positions.json")
+
+PAGE_SIZE = 20
+
+
+def iter_bits(bits):
+    # Indexes of the set bits of an int, lowest first
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def encode_cursor(key):
+    start, event_id = key
+    return base64.urlsafe_b64encode(f"{start!r}:{event_id}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+    tuple: (start, event_id) of the last event of the previous page
+
+    Raises:
+    ValueError: Malformed cursor
+    """
+    try:
+        start, event_id = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii').split(':')
+        return float(start), int(event_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor {cursor!r}") from e
+
+
+class EventFeed:
+    """
+    Events of every club and the follows of every user.
+
+    Args:
+    clubs (list of tuple): (club key, name) of every listed club; the key is
+    the organization link (see load_clubs)
+    positions (dict): club key -> bit position from earlier runs (see
+    load_positions); clubs not in it get new positions, and the feed's
+    positions attribute holds the updated mapping to save
+    """
+
+    def __init__(self, clubs, positions=None):
+        self.positions = dict(positions or {})
+        next_position = max(self.positions.values(), default=-1) + 1
+        # club id (bit position) -> name, None for positions of delisted clubs
+        self.clubs = [None] * next_position
+        for key, name in clubs:
+            if key not in self.positions:
+                self.positions[key] = next_position
+                next_position += 1
+                self.clubs.append(None)
+            self.clubs[self.positions[key]] = name
+        # club id -> sorted (start, event id) keys of its events
+        self.club_events = [[] for _ in self.clubs]
+        # club id -> user ids following it
+        self.followers = [set() for _ in self.clubs]
+        # user id -> bitset of followed club ids
+        self.follows = {}
+        # Every event's key, sorted, for the scan strategy
+        self.timeline_keys = []
+        self.events = {}
+        # Bitset of clubs with at least one event, kept up to date on add and remove
+        self.clubs_with_events = 0
+        self._next_event_id = 0
+
+    def club_id(self, club):
+        """
+        Bit position of a listed club given by key or position.
+
+        Raises:
+        KeyError: Unknown or delisted club
+        """
+        club_id = club if isinstance(club, int) else self.positions[club]
+        if not 0 <= club_id < len(self.clubs) or self.clubs[club_id] is None:
+            raise KeyError(club)
+        return club_id
+
+    def follow(self, user_id, club):
+        club_id = self.club_id(club)
+        self.follows[user_id] = self.follows.get(user_id, 0) | (1 << club_id)
+        self.followers[club_id].add(user_id)
+
+    def unfollow(self, user_id, club):
+        # Clubs no longer listed can still be unfollowed
+        club_id = club if isinstance(club, int) else self.positions[club]
+        self.follows[user_id] = self.follows.get(user_id, 0) & ~(1 << club_id)
+        self.followers[club_id].discard(user_id)
+
+    def followed_clubs(self, user_id):
+        # Clubs no longer listed stay followed, but are not shown
+        return [self.clubs[club_id] for club_id in iter_bits(self.follows.get(user_id, 0))
+                if self.clubs[club_id] is not None]
+
+    def add_event(self, club, title, start, end=None, location=''):
+        """
+        Post an event.
+
+        Args:
+        club (str or int): Club key or id
+        title (str): Event title
+        start (float): Unix time the event starts
+        end (float): Unix time the event ends, if known
+        location (str): Where it takes place
+
+        Returns:
+        tuple: (event id, set of user ids following the club, to notify)
+        """
+        club_id = self.club_id(club)
+        event_id = self._next_event_id
+        self._next_event_id += 1
+        key = (float(start), event_id)
+        self.events[event_id] = {'event_id': event_id, 'club': self.clubs[club_id], 'club_id': club_id,
+                                 'title': title, 'start': float(start), 'end': end, 'location': location}
+        bisect.insort(self.club_events[club_id], key)
+        bisect.insort(self.timeline_keys, key)
+        self.clubs_with_events |= 1 << club_id
+        return event_id, self.followers[club_id]
+
+    def remove_event(self, event_id):
+        event = self.events.pop(event_id)
+        key = (event['start'], event_id)
+        club_events = self.club_events[event['club_id']]
+        del club_events[bisect.bisect_left(club_events, key)]
+        del self.timeline_keys[bisect.bisect_left(self.timeline_keys, key)]
+        if not club_events:
+            self.clubs_with_events &= ~(1 << event['club_id'])
+
+    def _merge(self, club_ids, after, limit):
+        # k-way merge of the followed clubs' lists, each starting after the cursor
+        lists = []
+        for club_id in club_ids:
+            keys = self.club_events[club_id]
+            position = bisect.bisect_right(keys, after)
+            if position < len(keys):
+                lists.append(islice(keys, position, None))
+        return list(islice(heapq.merge(*lists), limit))
+
+    def _scan(self, follows, after, limit):
+        # Walk the global timeline, keeping events of followed clubs
+        events = self.events
+        page = []
+        for key in islice(self.timeline_keys, bisect.bisect_right(self.timeline_keys, after), None):
+            if follows >> events[key[1]]['club_id'] & 1:
+                page.append(key)
+                if len(page) == limit:
+                    break
+        return page
+
+    def timeline(self, user_id, limit=PAGE_SIZE, cursor=None, now=None):
+        """
+        One page of a user's feed: upcoming events of the clubs they follow,
+        soonest first.
+
+        Args:
+        user_id (str): User
+        limit (int): Events per page
+        cursor (str): next_cursor of the previous page; starts at now if None
+        now (float): Unix time the feed starts at; current time if None
+
+        Returns:
+        dict: events (list of event dicts) and next_cursor (None on the last page)
+        """
+        after = decode_cursor(cursor) if cursor else (time.time() if now is None else now, -1)
+        follows = self.follows.get(user_id, 0) & self.clubs_with_events
+        followed = follows.bit_count()
+        if not followed:
+            return {'events': [], 'next_cursor': None}
+
+        # The merge touches every followed club once plus limit log k; the scan
+        # passes about limit * (all events / events of followed clubs) events,
+        # which counts how busy the followed clubs are rather than assuming
+        # every club posts as much
+        club_ids = list(iter_bits(follows))
+        followed_events = sum(len(self.club_events[club_id]) for club_id in club_ids)
+        merge_cost = followed + limit * max(followed.bit_length(), 1)
+        scan_cost = limit * len(self.timeline_keys) / followed_events
+        if merge_cost <= scan_cost:
+            keys = self._merge(club_ids, after, limit)
+        else:
+            keys = self._scan(follows, after, limit)
+
+        next_cursor = encode_cursor(keys[-1]) if len(keys) == limit else None
+        return {'events': [self.events[event_id] for _, event_id in keys], 'next_cursor': next_cursor}
+
+
+def load_clubs(path=DEFAULT_CLUBS_CSV):
+    """
+    Returns:
+    list of tuple: (club key, name) of every club in the organizations CSV,
+    keyed by the Link column, or by name for CSVs scraped before it was added
+    """
+    df = pd.read_csv(path, dtype=str).dropna(subset=['Name'])
+    keys = df['Link'] if 'Link' in df.columns else df['Name']
+    return list(zip(keys, df['Name']))
+
+
+def load_positions(path=DEFAULT_POSITIONS_PATH):
+    """
+    Returns:
+    dict: club key -> bit position saved by save_positions; empty if none were
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_positions(positions, path=DEFAULT_POSITIONS_PATH):
+    # Written to a temporary file first so a crash never leaves half a mapping
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(positions, f, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def synthetic_feed(clubs, n_events, start, days, seed=0, positions=None):
+    """
+    An EventFeed with random events over the next days; popular clubs (by a
+    Zipf-like weight) post more.
+
+    Returns:
+    tuple: (feed, weight of every club id, 0 for delisted clubs)
+    """
+    rng = random.Random(seed)
+    feed = EventFeed(clubs, positions)
+    ranks = list(range(len(clubs)))
+    rng.shuffle(ranks)
+    weights = [0] * len(feed.clubs)
+    for (key, _), rank in zip(clubs, ranks):
+        weights[feed.positions[key]] = 1 / (rank + 1)
+    for club_id in rng.choices(range(len(weights)), weights, k=n_events):
+        event_start = start + rng.uniform(0, days * 86400)
+        feed.add_event(club_id, f"{feed.clubs[club_id]} meeting", event_start, event_start + 3600, "Memorial Union")
+    return feed, weights
+
+
+def follow_randomly(feed, user_id, n_follows, weights, rng):
+    # Students mostly follow popular clubs
+    chosen = set()
+    while len(chosen) < min(n_follows, sum(1 for weight in weights if weight)):
+        chosen.update(rng.choices(range(len(feed.clubs)), weights, k=n_follows - len(chosen)))
+    for club_id in chosen:
+        feed.follow(user_id, club_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the club events feed with synthetic users and events")
+    parser.add_argument('--csv', default=DEFAULT_CLUBS_CSV, help="Organizations CSV")
+    parser.add_argument('--events', type=int, default=20000, help="Number of events to post")
+    parser.add_argument('--days', type=float, default=60, help="Days the events are spread over")
+    parser.add_argument('--users', type=int, default=200, help="Users per follow count")
+    parser.add_argument('--follow-counts', default='1,5,20,100,300,1000',
+                        help="Comma-separated numbers of clubs the users follow")
+    parser.add_argument('--pages', type=int, default=3, help="Pages of the feed each user reads")
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    parser.add_argument('--positions', default=None,
+                        help="JSON file to load the club bit positions from and save them to")
+    args = parser.parse_args()
+
+    # Modules shared by the scrapers live in ../shared
+    sys.path.append(os.path.join(script_dir, '..', 'shared'))
+    import scrapeMetrics
+
+    clubs = load_clubs(args.csv)
+    positions = load_positions(args.positions) if args.positions else None
+    now = time.time()
+    start = time.perf_counter()
+    feed, weights = synthetic_feed(clubs, args.events, now, args.days, positions=positions)
+    print(f"Posted {args.events} events for {len(clubs)} clubs in {time.perf_counter() - start:.2f} s")
+    if args.positions:
+        save_positions(feed.positions, args.positions)
+
+    rng = random.Random(1)
+    print(f"{'follows':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'events/page':>12}")
+    for n_follows in [int(count) for count in args.follow_counts.split(',')]:
+        users = [f"user{n_follows}-{i}" for i in range(args.users)]
+        for user_id in users:
+            follow_randomly(feed, user_id, n_follows, weights, rng)
+
+        latencies = []
+        shown = 0
+        for user_id in users:
+            cursor = None
+            for _ in range(args.pages):
+                page_start = time.perf_counter()
+                page = feed.timeline(user_id, args.page_size, cursor, now)
+                latencies.append(time.perf_counter() - page_start)
+                shown += len(page['events'])
+                cursor = page['next_cursor']
+                if cursor is None:
+                    break
+        latencies.sort()
+        print(f"{n_follows:>8} {scrapeMetrics.percentile(latencies, 50) * 1000:>8.3f} "
+              f"{scrapeMetrics.percentile(latencies, 95) * 1000:>8.3f} {latencies[-1] * 1000:>8.3f} "
+              f"{shown / len(latencies):>12.1f}")
@@ -0,0 +1,241 @@
+import argparse
+import hashlib
+import os
+import re
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Club recommendations for free-text preferences ("I like basketball and coding").
+# Name + Description of every organization is turned into a TF-IDF vector once and
+# saved to disk; a query is vectorized the same way and scored against all clubs
+# with one sparse matrix product.
+
+# The scraper writes the CSV and the index next to this script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(script_dir, "organization_data.csv")
+DEFAULT_INDEX = os.path.join(script_dir, "organization_index.npz")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+a about all also an and any are as at be been but by can do for from has have
+how i if in into is it its like love me more my not of on or our out so such
+than that the their them there these they this to up us was we were what when
+which who will with would you your
+""".split())
+
+# Words in the club name count as much as this many mentions in the description
+NAME_WEIGHT = 2
+
+# Number of queries scored per matrix product in query_batch
+QUERY_CHUNK_SIZE = 1024
+
+
+def tokenize(text):
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return []
+    return [t for t in TOKEN_PATTERN.findall(str(text).lower()) if len(t) > 1 and t not in STOP_WORDS]
+
+
+def row_fingerprint(name, description):
+    return hashlib.sha1(f"{name}\x1f{description}".encode('utf-8')).hexdigest()
+
+
+class ClubIndex:
+    """
+    TF-IDF index over organization names and descriptions.
+
+    The raw term counts are kept next to the weighted matrix so that a rebuild
+    only has to tokenize rows that changed; the IDF weights are recomputed from
+    the counts, which is cheap.
+    """
+
+    def __init__(self, names, fingerprints, terms, counts):
+        self.names = list(names)
+        self.fingerprints = list(fingerprints)
+        self.terms = list(terms)
+        self.vocabulary = {term: col for col, term in enumerate(self.terms)}
+        self.counts = sparse.csr_matrix(counts, shape=(len(self.names), len(self.terms)), dtype=np.int32)
+        self._weigh()
+
+    def _weigh(self):
+        n_docs, n_terms = self.counts.shape
+        doc_freq = np.bincount(self.counts.indices, minlength=n_terms)
+        self.idf = (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(np.float32)
+        self.matrix = self._weigh_counts(self.counts)
+
+    def _weigh_counts(self, counts):
+        # Sublinear term frequency times IDF, then every row scaled to unit length
+        # so a dot product is the cosine similarity
+        weighted = counts.astype(np.float32)
+        weighted.data = 1 + np.log(weighted.data)
+        weighted = weighted @ sparse.diags(self.idf)
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.csr_matrix(sparse.diags(1 / norms) @ weighted, dtype=np.float32)
+
+    def vectorize(self, texts):
+        """
+        Vectorize free-text queries into the index's TF-IDF space. Words that do
+        not occur in any club are ignored.
+        """
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            term_counts = Counter(t for t in tokenize(text) if t in self.vocabulary)
+            indices.extend(self.vocabulary[t] for t in term_counts)
+            data.extend(term_counts.values())
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix((data, indices, indptr), shape=(len(texts), len(self.terms)), dtype=np.int32)
+        return self._weigh_counts(counts)
+
+    def query_batch(self, texts, k=10):
+        """
+        Recommend clubs for many preference texts at once.
+
+        Args:
+        texts (list of str): Free-text preferences, one per user
+        k (int): Number of clubs to return per query
+
+        Returns:
+        list: For every query, a list of (club name, score) tuples with the best
+        match first; clubs with no word in common with the query are left out
+        """
+        results = []
+        n_docs = len(self.names)
+        k = min(k, n_docs)
+        if k <= 0:
+            return [[] for _ in texts]
+
+        for start in range(0, len(texts), QUERY_CHUNK_SIZE):
+            queries = self.vectorize(texts[start:start + QUERY_CHUNK_SIZE])
+            scores = (queries @ self.matrix.T).toarray()
+
+            # Top k per row without sorting every score, then sort just those k
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for row, row_scores in zip(top, top_scores):
+                results.append([(self.names[j], float(score)) for j, score in zip(row, row_scores) if score > 0])
+        return results
+
+    def query(self, text, k=10):
+        return self.query_batch([text], k)[0]
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            names=np.array(self.names, dtype=str),
+            fingerprints=np.array(self.fingerprints, dtype=str),
+            terms=np.array(self.terms, dtype=str),
+            data=self.counts.data,
+            indices=self.counts.indices,
+            indptr=self.counts.indptr
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as saved:
+            names = saved['names'].tolist()
+            terms = saved['terms'].tolist()
+            counts = (saved['data'], saved['indices'], saved['indptr'])
+            return cls(names, saved['fingerprints'].tolist(), terms, counts)
+
+
+def build_index(df, previous=None):
+    """
+    Build a ClubIndex from a DataFrame with Name and Description columns.
+
+    Args:
+    df (DataFrame): Organization data as saved by clubsScrape.py
+    previous (ClubIndex): Index of an earlier scrape; rows whose name and
+    description are unchanged reuse its term counts instead of being tokenized
+
+    Returns:
+    tuple: (ClubIndex, number of rows reused from previous)
+    """
+    # The vocabulary only grows, so column numbers of reused rows stay valid
+    terms = list(previous.terms) if previous else []
+    vocabulary = dict(previous.vocabulary) if previous else {}
+    old_rows = {name: i for i, name in enumerate(previous.names)} if previous else {}
+
+    names, fingerprints = [], []
+    indptr, indices, data = [0], [], []
+    reused = 0
+
+    for name, description in zip(df['Name'].fillna(''), df['Description'].fillna('')):
+        fingerprint = row_fingerprint(name, description)
+        j = old_rows.get(name)
+        if j is not None and previous.fingerprints[j] == fingerprint:
+            start, end = previous.counts.indptr[j], previous.counts.indptr[j + 1]
+            indices.extend(previous.counts.indices[start:end].tolist())
+            data.extend(previous.counts.data[start:end].tolist())
+            reused += 1
+        else:
+            term_counts = Counter(tokenize(description))
+            for term in tokenize(name):
+                term_counts[term] += NAME_WEIGHT
+            for term, count in term_counts.items():
+                if term not in vocabulary:
+                    vocabulary[term] = len(terms)
+                    terms.append(term)
+                indices.append(vocabulary[term])
+                data.append(count)
+
+        names.append(name)
+        fingerprints.append(fingerprint)
+        indptr.append(len(indices))
+
+    return ClubIndex(names, fingerprints, terms, (data, indices, indptr)), reused
+
+
+def update_index(csv_path=DEFAULT_CSV, index_path=DEFAULT_INDEX, full=False):
+    """
+    Rebuild the index saved at index_path from the organization CSV, reusing
+    unchanged rows of the existing index unless full is True.
+    """
+    previous = None
+    if not full and os.path.exists(index_path):
+        try:
+            previous = ClubIndex.load(index_path)
+        except Exception as e:
+            print(f"Could not load existing index, rebuilding from scratch: {e}")
+
+    df = pd.read_csv(csv_path)
+    index, reused = build_index(df, previous)
+    index.save(index_path)
+    print(f"Index saved to {index_path}: {len(index.names)} clubs, "
+          f"{len(index.terms)} terms, {len(index.names) - reused} rows (re)tokenized")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recommend clubs for free-text preferences")
+    parser.add_argument('--csv', default=DEFAULT_CSV, help="Organization data CSV")
+    parser.add_argument('--index', default=DEFAULT_INDEX, help="Saved index file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="Build or incrementally update the index")
+    build_parser.add_argument('--full', action='store_true', help="Rebuild every row")
+    query_parser = subparsers.add_parser('query', help="Recommend clubs for one or more preference texts")
+    query_parser.add_argument('text', nargs='+')
+    query_parser.add_argument('-k', type=int, default=10, help="Number of clubs to return")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        update_index(args.csv, args.index, args.full)
+    else:
+        index = ClubIndex.load(args.index)
+        start = time.perf_counter()
+        results = index.query_batch(args.text, args.k)
+        elapsed = time.perf_counter() - start
+        for text, matches in zip(args.text, results):
+            print(f"\n{text}")
+            for name, score in matches:
+                print(f"  {score:.3f}  {name}")
+        print(f"\nScored {len(args.text)} queries in {elapsed * 1000:.1f} ms")
@@ -1,73 +1,155 @@
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from bs4 import BeautifulSoup, SoupStrainer
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+import argparse
+import clubCheckpoint
+import clubRecommender
+import queue
 import pandas as pd
 import time
 import re
 import csv  # Import the standard csv module instead
+from datetime import timedelta
+import os
+import sys
 
-# Set up ChromeDriver with optimized options
-options = webdriver.ChromeOptions()
-options.add_argument('--disable-gpu')
-options.add_argument('--disable-extensions')
-options.add_argument('--disable-infobars')
-options.add_argument('--start-maximized')
-options.add_argument('--disable-dev-shm-usage')
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+# Modules shared by the scrapers live in ../shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import searchIndex
+import fetchCache
+import scrapeMetrics
+import browserDriver
 
-# Navigate to the website
-url = "https://win.wisc.edu/organizations"
-driver.get(url)
+# Output files are written next to this script, where clubRecommender,
+# clubEvents and searchIndex read them, whatever directory the scraper runs from
+script_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Minimal wait for initial load
-time.sleep(1)
+# Base URL of the WIN site and the organization listing page
+base_url = "https://win.wisc.edu"
+url = f"{base_url}/organizations"
+
+# Paginated search endpoint the listing page loads its organizations from, and
+# the image service it shows their logos from
+search_path = "/api/discovery/search/organizations"
+image_url = "https://se-images.campuslabs.com/clink/images/{}?preset=small-sq"
+
+# Use the much faster lxml parser when it is installed
+try:
+    import lxml
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Only the organization list is read from the listing page, so only its subtree is built
+ORGANIZATION_LIST_STRAINER = SoupStrainer('ul', class_='MuiList-root MuiList-padding')
+
+# Patterns used for every organization, compiled once
+NAME_STYLE_PATTERN = re.compile(r'font-size: 1\.125rem;')
+EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+SOCIAL_SITES = ['instagram', 'facebook', 'linkedin', 'youtube', 'twitter', 'calendar.google']
 
 # Function to extract organization names, links and image sources
 def extract_names_links_and_images(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=ORGANIZATION_LIST_STRAINER)
     organizations = soup.find('ul', class_='MuiList-root MuiList-padding').find_all('a')
     names = []
     links = []
     image_sources = []
-    
+
     for org in organizations:
-        name = org.find('div', style=lambda x: x and 'font-size: 1.125rem;' in x).text.strip()
+        name = org.find('div', style=NAME_STYLE_PATTERN).text.strip()
         link = org.get('href')
-        
+
         # Extract image source
         img_tag = org.find('img')
         image_src = img_tag.get('src') if img_tag else 'No image available'
-        
+
         names.append(name)
         links.append(link)
         image_sources.append(image_src)
-        
+
     return names, links, image_sources
 
+# Page through the organization search endpoint batch_size organizations at a time,
+# yielding (name, link, image_src) as each batch arrives. Unlike clicking "Load More",
+# nothing grows with the number of organizations and the caller can start on the
+# first batch while the rest are still being listed.
+def iter_organizations(site_url=base_url, batch_size=100, page_cache=None, timeout=10):
+    session = fetchCache.CachedSession(page_cache)
+    session.headers.update({'Accept': 'application/json'})
+    try:
+        skip = 0
+        while True:
+            params = {'orderBy[0]': 'UpperName asc', 'top': batch_size, 'skip': skip, 'filter': '', 'query': ''}
+            with scrapeMetrics.stage('fetch', url=f"{site_url}{search_path}", skip=skip):
+                response = session.get(f"{site_url}{search_path}", params=params, timeout=timeout)
+                response.raise_for_status()
+            with scrapeMetrics.stage('parse', url=f"{site_url}{search_path}", skip=skip):
+                page = response.json()
+            scrapeMetrics.count('listing_batches')
+
+            batch = page.get('value') or []
+            for org in batch:
+                name = (org.get('Name') or '').strip()
+                key = org.get('WebsiteKey')
+                if not name or not key:
+                    continue
+                picture = org.get('ProfilePicture')
+                yield name, f"/organization/{key}", image_url.format(picture) if picture else 'No image available'
+
+            skip += len(batch)
+            # The endpoint may cap a page below batch_size, so a short page only
+            # ends the listing when there is no total to go by
+            total = page.get('@odata.count')
+            if not batch or (skip >= total if total is not None else len(batch) < batch_size):
+                break
+    finally:
+        session.close()
+
 # Function to extract description, email, website, and Instagram from the organization's page
 def extract_details(driver):
     try:
         # Wait for the description element to load - shorter timeout
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '.bodyText-large.userSupplied'))
-        )
+        with scrapeMetrics.stage('wait'):
+            WebDriverWait(driver, 5).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '.bodyText-large.userSupplied'))
+            )
         description = driver.find_element(By.CSS_SELECTOR, '.bodyText-large.userSupplied').text.strip()
     except:
         description = 'No description available'
+        scrapeMetrics.count('description_missing')
 
+    try:
+        # Get the page source immediately
+        with scrapeMetrics.stage('page_source'):
+            html_content = driver.page_source
+    except Exception as e:
+        print(f"Error extracting contact info: {e}")
+        return description, 'No email available', 'No website available', 'No Instagram available'
+
+    with scrapeMetrics.stage('parse'):
+        return extract_details_from_html(html_content, description)
+
+# Same as extract_details but works on an already fetched page source, so it can be
+# used without a browser (e.g. pages fetched over plain HTTP). If no description is
+# passed in, it is read from the page source instead of the live DOM.
+def extract_details_from_html(html_content, description=None):
     website = 'No website available'
     instagram = 'No Instagram available'
     email = 'No email available'
 
     try:
-        # Get the page source immediately
-        html_content = driver.page_source
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
+        soup = BeautifulSoup(html_content, HTML_PARSER)
+
+        if description is None:
+            description_elem = soup.select_one('.bodyText-large.userSupplied')
+            description = description_elem.get_text('\n', strip=True) if description_elem else ''
+            if not description:
+                description = 'No description available'
+
         # Look for the span with class "sr-only" containing "Contact Email"
         email_span = soup.find('span', class_='sr-only', string='Contact Email')
         if email_span:
@@ -75,113 +157,437 @@ def extract_details(driver):
             parent_div = email_span.parent
             if parent_div:
                 # Extract email using regex
-                email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', parent_div.text)
+                email_match = EMAIL_PATTERN.search(parent_div.text)
                 if email_match:
                     email = email_match.group()
-        
-        # Backup method for email - search for divs containing "E:" 
+
+        # Backup method for email - search for divs containing "E:"
         if email == 'No email available':
             email_div = soup.find('div', string=lambda text: text and 'E:' in text if text else False)
             if email_div:
-                email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', email_div.text)
+                email_match = EMAIL_PATTERN.search(email_div.text)
                 if email_match:
                     email = email_match.group()
-        
+
         # Second backup method - search the entire page
         if email == 'No email available':
-            all_email_matches = re.findall(r'[\w\.-]+@[\w\.-]+\.\w+', html_content)
-            if all_email_matches:
-                email = all_email_matches[0]  # Take the first email found
-        
+            # Take the first email found; search stops there instead of collecting every match
+            email_match = EMAIL_PATTERN.search(html_content)
+            if email_match:
+                email = email_match.group()
+
         # Find all links with aria-labels
         social_links = soup.find_all('a', attrs={'href': True})
-        
+
         for link in social_links:
             href = link['href']
             aria_label = link.get('aria-label', '').lower()
-            
+
             # Extract website - prioritize links with 'visit our site' or globe icon
-            if ('visit our site' in aria_label or 
-                'globe' in str(link) or 
-                (href.startswith('http') and 
-                 not any(social in href for social in ['instagram', 'facebook', 'linkedin', 'youtube', 'twitter', 'calendar.google']))):
+            # (serializing the link to look for the icon is the costly part, so it is done once)
+            is_site_link = 'visit our site' in aria_label or 'globe' in str(link)
+            if (is_site_link or
+                (href.startswith('http') and
+                 not any(social in href for social in SOCIAL_SITES))):
                 website = href
-                
+
                 # If we found a clear website, break to avoid overwriting with less relevant links
-                if 'visit our site' in aria_label or 'globe' in str(link):
+                if is_site_link:
                     break
-            
+
             # Extract Instagram
             if 'instagram' in aria_label or 'instagram.com' in href:
                 instagram = href
-                
+
     except Exception as e:
         print(f"Error extracting contact info: {e}")
+        if description is None:
+            description = 'No description available'
 
     return description, email, website, instagram
 
-# Load all organizations by clicking "Load More" - faster version
-while True:
+# Navigate to an organization page and return its page source once the description
+# has rendered, for parsing with extract_details_from_html (e.g. from the page cache)
+def load_details_page(driver, page_url):
+    with scrapeMetrics.stage('navigate', url=page_url):
+        driver.get(page_url)
     try:
-        # Wait for "Load More" button to be clickable - shorter timeout
-        load_more_button = WebDriverWait(driver, 3).until(
-            EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Load More')]"))
-        )
-        load_more_button.click()
-
-        # Wait minimally for new content
-        WebDriverWait(driver, 3).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".MuiList-root"))
-        )
-        time.sleep(0.2)  # Very small additional wait
+        with scrapeMetrics.stage('wait', url=page_url):
+            WebDriverWait(driver, 5).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '.bodyText-large.userSupplied'))
+            )
+    except:
+        scrapeMetrics.count('description_missing')
+    with scrapeMetrics.stage('page_source', url=page_url):
+        return driver.page_source
 
-    except Exception as e:
-        print("No more 'Load More' button or error:", e)
-        break  # Stop when no more "Load More" button is available or an error occurs
+def fetch_details_http(links, max_in_flight=8, site_url=base_url, timeout=10, on_result=None, page_cache=None):
+    """
+    Fetch organization pages concurrently over plain HTTP and parse their details.
+    Only useful where the page is rendered server side (e.g. a local stand-in server
+    or recorded pages); the live WIN site renders the description with JavaScript.
 
-# Extract names, links, and image sources after all organizations have loaded
-html_content = driver.page_source
-names, links, image_sources = extract_names_links_and_images(html_content)
+    Args:
+    links (iterable): Organization links relative to site_url (e.g. '/organization/foo');
+    may be a generator, fetching starts with its first link
+    max_in_flight (int): Maximum number of requests in flight at once
+    site_url (str): Base URL the links are resolved against
+    timeout (float): Per-request timeout in seconds
+    on_result (callable): Called as on_result(index, details) as each page finishes
+    page_cache (PageCache): Cache of responses to read from and record to
 
-# List to store the extracted data
-data = []
+    Returns:
+    list: One (description, email, website, instagram) tuple per link, in the same
+    order as links, or None where the fetch failed
+    """
+    # One session shared by all workers, with a connection pool as large as the
+    # number of requests in flight so connections are reused instead of reopened
+    session = fetchCache.CachedSession(page_cache)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    def fetch(link):
+        with scrapeMetrics.stage('fetch', url=f"{site_url}{link}"):
+            response = session.get(f"{site_url}{link}", timeout=timeout)
+            response.raise_for_status()
+            html_content = response.text
+        with scrapeMetrics.stage('parse', url=f"{site_url}{link}"):
+            return extract_details_from_html(html_content)
 
-# Loop through the links to extract details
-for i, (name, link, image_src) in enumerate(zip(names, links, image_sources)):
-    if i % 10 == 0:  # Only print progress every 10 organizations to reduce console output
-        print(f"Processing {i+1}/{len(names)}: {name}")
     try:
-        driver.get(f"https://win.wisc.edu{link}")  # Navigate to the organization page
-        description, email, website, instagram = extract_details(driver)
-        data.append({
-            'Name': name, 
-            'Description': description, 
-            'Email': email, 
-            'Website': website, 
-            'Instagram': instagram,
-            'Image_Source': image_src
-        })
-        # No delay between organizations
-    except Exception as e:
-        print(f"Error processing {name}: {e}")
-        data.append({
-            'Name': name, 
-            'Description': 'Error fetching data', 
-            'Email': 'Error', 
-            'Website': 'Error', 
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            return _collect_results(executor, fetch, links, max_in_flight, on_result)
+    finally:
+        session.close()
+
+def fetch_details_with_drivers(links, max_in_flight=4, site_url=base_url, on_result=None, page_cache=None):
+    """
+    Fetch organization pages concurrently with a pool of headless browsers.
+
+    Args:
+    links (iterable): Organization links relative to site_url (e.g. '/organization/foo');
+    may be a generator, fetching starts with its first link
+    max_in_flight (int): Number of browsers in the pool
+    site_url (str): Base URL the links are resolved against
+    on_result (callable): Called as on_result(index, details) as each page finishes
+    page_cache (PageCache): Cache of rendered pages; browsers are only started
+    for pages it cannot serve
+
+    Returns:
+    list: One (description, email, website, instagram) tuple per link, in the same
+    order as links, or None where the fetch failed
+    """
+    drivers = queue.Queue()
+    created = []
+
+    def borrow():
+        # Borrow a browser from the pool, starting a new one if the pool is not full yet
+        try:
+            return drivers.get_nowait()
+        except queue.Empty:
+            driver = browserDriver.create_driver()
+            created.append(driver)
+            return driver
+
+    def load(page_url):
+        driver = borrow()
+        try:
+            return load_details_page(driver, page_url)
+        finally:
+            drivers.put(driver)
+
+    def fetch(link):
+        page_url = f"{site_url}{link}"
+        if page_cache is not None:
+            page_source = fetchCache.get_page(page_cache, page_url, lambda: load(page_url))
+            with scrapeMetrics.stage('parse', url=page_url):
+                return extract_details_from_html(page_source)
+        driver = borrow()
+        try:
+            with scrapeMetrics.stage('navigate', url=page_url):
+                driver.get(page_url)
+            return extract_details(driver)
+        finally:
+            drivers.put(driver)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            return _collect_results(executor, fetch, links, max_in_flight, on_result)
+    finally:
+        for driver in created:
+            try:
+                driver.quit()
+            except:
+                pass
+
+def _collect_results(executor, fetch, links, max_in_flight, on_result=None):
+    # Submit pages as links come in (links may still be streaming from the listing),
+    # keeping a couple of pages queued per worker, and handle them in the order they
+    # finish so on_result sees them as soon as possible
+    results = []
+    pending = {}
+    total = len(links) if isinstance(links, list) else '?'
+    done = 0
+
+    def handle(finished):
+        nonlocal done
+        for future in finished:
+            i, link = pending.pop(future)
+            if done % 10 == 0:  # Only print progress every 10 organizations to reduce console output
+                scrapeMetrics.progress(f"Processing {done+1}/{total}: {link}")
+            done += 1
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                print(f"Error processing {link}: {e}")
+                scrapeMetrics.count('detail_errors')
+            if on_result is not None:
+                on_result(i, results[i])
+
+    for i, link in enumerate(links):
+        results.append(None)
+        pending[executor.submit(fetch, link)] = (i, link)
+        if len(pending) >= 2 * max_in_flight:
+            handle(wait(pending, return_when=FIRST_COMPLETED)[0])
+    while pending:
+        handle(wait(pending, return_when=FIRST_COMPLETED)[0])
+    return results
+
+def fetch_details_serial(driver, links, site_url=base_url, on_result=None, page_cache=None):
+    """
+    Fetch organization pages one at a time with a single browser. With a
+    page_cache, driver may be None if every page is served from the cache.
+
+    Returns:
+    list: One (description, email, website, instagram) tuple per link, or None
+    where the fetch failed
+    """
+    results = []
+    total = len(links) if isinstance(links, list) else '?'
+    for i, link in enumerate(links):
+        if i % 10 == 0:  # Only print progress every 10 organizations to reduce console output
+            scrapeMetrics.progress(f"Processing {i+1}/{total}: {link}")
+        page_url = f"{site_url}{link}"
+        try:
+            if page_cache is not None:
+                page_source = fetchCache.get_page(page_cache, page_url, lambda: load_details_page(driver, page_url))
+                with scrapeMetrics.stage('parse', url=page_url):
+                    details = extract_details_from_html(page_source)
+            else:
+                with scrapeMetrics.stage('navigate', url=page_url):
+                    driver.get(page_url)  # Navigate to the organization page
+                details = extract_details(driver)
+            # No delay between organizations
+        except Exception as e:
+            print(f"Error processing {link}: {e}")
+            scrapeMetrics.count('detail_errors')
+            details = None
+            # Try to go back or restart from main page without delay
+            try:
+                driver.get(f"{site_url}/organizations")
+                scrapeMetrics.count('serial_recoveries')
+            except:
+                pass
+        results.append(details)
+        if on_result is not None:
+            on_result(i, details)
+    return results
+
+def build_row(name, image_src, details):
+    # details is None when the organization page could not be fetched
+    if details is None:
+        return {
+            'Name': name,
+            'Description': 'Error fetching data',
+            'Email': 'Error',
+            'Website': 'Error',
             'Instagram': 'Error',
             'Image_Source': image_src  # Still include the image source even if other details fail
-        })
-        # Try to go back or restart from main page without delay
+        }
+    description, email, website, instagram = details
+    return {
+        'Name': name,
+        'Description': description,
+        'Email': email,
+        'Website': website,
+        'Instagram': instagram,
+        'Image_Source': image_src
+    }
+
+# Load all organizations by clicking "Load More" - faster version
+def load_all_organizations(driver):
+    while True:
+        try:
+            # Wait for "Load More" button to be clickable - shorter timeout
+            load_more_button = WebDriverWait(driver, 3).until(
+                EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Load More')]"))
+            )
+            load_more_button.click()
+            scrapeMetrics.count('load_more_clicks')
+
+            # Wait minimally for new content
+            with scrapeMetrics.stage('wait', url='load_more'):
+                WebDriverWait(driver, 3).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ".MuiList-root"))
+                )
+                time.sleep(0.2)  # Very small additional wait
+
+        except Exception as e:
+            scrapeMetrics.progress(f"No more 'Load More' button or error: {e}")
+            break  # Stop when no more "Load More" button is available or an error occurs
+
+def main(mode='drivers', max_in_flight=4, site_url=base_url, incremental=False,
+         checkpoint_path=None, max_age_days=None, page_cache=None,
+         listing='api', batch_size=100, snapshot_path=searchIndex.DEFAULT_SNAPSHOT_PATH, output_dir=script_dir):
+    # The browser is only started once a page has to be loaded live, so a
+    # replay from the page cache runs without one
+    data_csv_path = os.path.join(output_dir, 'organization_data.csv')
+    index_path = os.path.join(output_dir, 'organization_index.npz')
+    checkpoint_path = checkpoint_path or os.path.join(output_dir, 'organization_checkpoint.jsonl')
+
+    browser = browserDriver.LazyDriver()
+    get_driver = browser.get
+
+    def load_listing():
+        listing_driver = get_driver()
+        # Navigate to the website
+        with scrapeMetrics.stage('navigate', url=f"{site_url}/organizations"):
+            listing_driver.get(f"{site_url}/organizations")
+
+        # Minimal wait for initial load
+        with scrapeMetrics.stage('wait', url=f"{site_url}/organizations"):
+            time.sleep(1)
+
+        load_all_organizations(listing_driver)
+        with scrapeMetrics.stage('page_source', url=f"{site_url}/organizations"):
+            return listing_driver.page_source
+
+    def browser_listing():
+        # Extract names, links, and image sources after all organizations have loaded
+        html_content = fetchCache.get_page(page_cache, f"{site_url}/organizations", load_listing)
+        with scrapeMetrics.stage('parse', url=f"{site_url}/organizations"):
+            return list(zip(*extract_names_links_and_images(html_content)))
+
+    try:
+        if listing == 'api':
+            records = iter_organizations(site_url, batch_size, page_cache)
+        else:
+            records = browser_listing()
+
+        # In incremental mode only new, changed or stale organizations are fetched;
+        # everything else is taken from the checkpoint of earlier runs
+        checkpoint = clubCheckpoint.load_checkpoint(checkpoint_path) if incremental else {}
+        max_age = timedelta(days=max_age_days) if max_age_days is not None else None
+        names, links, image_sources, fingerprints = [], [], [], []
+        todo = []
+
+        def todo_links():
+            # Consumed by the detail fetchers, so organizations of the first batch
+            # are fetched while later batches are still being listed
+            for name, link, image_src in records:
+                i = len(links)
+                names.append(name)
+                links.append(link)
+                image_sources.append(image_src)
+                fingerprints.append(clubCheckpoint.listing_fingerprint(name, link, image_src))
+                if incremental and not clubCheckpoint.needs_fetch(checkpoint.get(link), fingerprints[i], max_age):
+                    continue
+                todo.append(i)
+                yield link
+
+        # Rows fetched in this run, by listing index
+        fetched = {}
+        checkpoint_file = open(checkpoint_path, 'a', encoding='utf-8') if incremental else None
+
+        def on_result(j, details):
+            i = todo[j]
+            if details is None and links[i] in checkpoint:
+                # A failed fetch keeps the row of the last good one, fingerprint
+                # and all, so the organization is retried next run
+                scrapeMetrics.count('detail_errors_kept_checkpoint')
+                return
+            fetched[i] = build_row(names[i], image_sources[i], details)
+            # Stream finished rows to the checkpoint; failed ones are retried next run
+            if checkpoint_file is not None and details is not None:
+                record = clubCheckpoint.make_record(links[i], fingerprints[i], fetched[i])
+                clubCheckpoint.append_record(checkpoint_file, record)
+                checkpoint[links[i]] = record
+
         try:
-            driver.get(url)
-        except:
-            pass
+            if mode == 'http':
+                fetch_details_http(todo_links(), max_in_flight, site_url, on_result=on_result, page_cache=page_cache)
+            elif mode == 'drivers':
+                fetch_details_with_drivers(todo_links(), max_in_flight, site_url, on_result=on_result,
+                                           page_cache=page_cache)
+            else:
+                serial_driver = None if page_cache is not None and page_cache.mode == 'replay' else get_driver()
+                fetch_details_serial(serial_driver, todo_links(), site_url, on_result=on_result, page_cache=page_cache)
+        finally:
+            if checkpoint_file is not None:
+                checkpoint_file.close()
+        if incremental:
+            print(f"{len(todo)} of {len(links)} organizations were new, changed or stale")
+
+        # List to store the extracted data, in listing order
+        data = []
+        for i, (name, link, image_src) in enumerate(zip(names, links, image_sources)):
+            row = fetched[i] if i in fetched else checkpoint[link]['row']
+            # The link identifies an organization across scrapes; clubEvents keys follows by it
+            data.append(dict(row, Link=link))
+
+        if incremental:
+            # Drop superseded records and organizations that are no longer listed
+            clubCheckpoint.compact_checkpoint(checkpoint_path, [checkpoint[link] for link in links if link in checkpoint])
 
-# Save data to CSV with proper quoting
-df = pd.DataFrame(data)
-df.to_csv('organization_data.csv', index=False, quoting=csv.QUOTE_ALL)
-print(f"Data saved to organization_data.csv. Total organizations processed: {len(data)}")
+        # Save data to CSV with proper quoting
+        with scrapeMetrics.stage('write', file=data_csv_path):
+            df = pd.DataFrame(data)
+            df.to_csv(data_csv_path, index=False, quoting=csv.QUOTE_ALL)
+        print(f"Data saved to {data_csv_path}. Total organizations processed: {len(data)}")
 
-# Close the browser
-driver.quit()
\ No newline at end of file
+        # Update the recommendation index; only changed descriptions are re-tokenized
+        with scrapeMetrics.stage('write', file=index_path):
+            clubRecommender.update_index(data_csv_path, index_path)
+
+        # Refresh the search snapshot the app loads at startup
+        with scrapeMetrics.stage('write', file='search_snapshot.pkl'):
+            searchIndex.update_snapshot(clubs_csv=data_csv_path, snapshot_path=snapshot_path)
+
+        if page_cache is not None:
+            print(f"Page cache: {page_cache.stats()}")
+    finally:
+        # Close the browser
+        browser.quit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape WIN organizations to organization_data.csv")
+    parser.add_argument('--mode', choices=['serial', 'drivers', 'http'], default='drivers',
+                        help="serial: one browser; drivers: pool of headless browsers; http: plain HTTP requests")
+    parser.add_argument('--workers', type=int, default=4, help="Number of organization pages fetched at once")
+    parser.add_argument('--site-url', default=base_url, help="Base URL of the site (e.g. a local stand-in server)")
+    parser.add_argument('--listing', choices=['api', 'browser'], default='api',
+                        help="api: page through the search endpoint, fetching details as batches arrive; "
+                             "browser: click 'Load More' until every organization is on the page")
+    parser.add_argument('--batch-size', type=int, default=100, help="Organizations per search request with --listing api")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only fetch new or changed organizations and resume interrupted runs")
+    parser.add_argument('--checkpoint', default=None,
+                        help="Checkpoint file used by --incremental (default: organization_checkpoint.jsonl "
+                             "in the output directory)")
+    parser.add_argument('--max-age-days', type=float, default=None,
+                        help="With --incremental, also refetch organizations fetched longer ago than this")
+    parser.add_argument('--output-dir', default=script_dir,
+                        help="Directory organization_data.csv and organization_index.npz are written to")
+    parser.add_argument('--snapshot', default=searchIndex.DEFAULT_SNAPSHOT_PATH, help="Search snapshot to refresh")
+    fetchCache.add_cache_arguments(parser)
+    scrapeMetrics.add_metrics_arguments(parser)
+    browserDriver.add_driver_arguments(parser)
+    args = parser.parse_args()
+    scrapeMetrics.enable_from_args(args)
+    browserDriver.configure_from_args(args)
+    try:
+        main(args.mode, args.workers, args.site_url, args.incremental, args.checkpoint, args.max_age_days,
+             fetchCache.cache_from_args(args), args.listing, args.batch_size, args.snapshot, args.output_dir)
+    finally:
+        scrapeMetrics.finish()
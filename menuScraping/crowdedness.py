@@ -0,0 +1,320 @@
+import argparse
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# "Is it crowded right now?" from user reports. Each report rates a hall from
+# 1 (empty) to 5 (packed). Reports land in a fixed ring of one-minute buckets per
+# hall, and the totals of the 5, 15 and 30 minute windows are kept up to date as
+# buckets enter and leave them, so a report is O(1) to ingest and an estimate
+# never rescans reports. Every report also updates a weekday x hour profile of
+# the hall, which fills in when there are too few live reports to go by.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LOCATIONS_CSV = os.path.join(script_dir, "dining_hall_locations.csv")
+
+MIN_LEVEL = 1
+MAX_LEVEL = 5
+
+BUCKET_SECONDS = 60
+WINDOW_MINUTES = (5, 15, 30)
+
+# Live reports needed before an estimate stops leaning on the historical profile
+PRIOR_WEIGHT = 5
+
+# The profile is a running mean that forgets old reports: each weekday and hour
+# slot weighs a new report at least 1/PROFILE_MEMORY
+PROFILE_MEMORY = 500
+
+# Per user: at most RATE_BURST reports at once, and one more every RATE_SECONDS
+RATE_BURST = 3
+RATE_SECONDS = 120
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class HallWindows:
+    """
+    Ring of the last max(windows) buckets of one hall, with the running count
+    and level sum of every window.
+    """
+
+    __slots__ = ('windows', 'size', 'counts', 'sums', 'window_counts', 'window_sums', 'bucket')
+
+    def __init__(self, windows=WINDOW_MINUTES):
+        self.windows = windows
+        self.size = max(windows)
+        self.counts = [0] * self.size
+        self.sums = [0] * self.size
+        self.window_counts = [0] * len(windows)
+        self.window_sums = [0] * len(windows)
+        self.bucket = None  # newest bucket number the ring holds
+
+    def advance(self, bucket):
+        """
+        Move the ring forward to bucket, dropping buckets that leave each window.
+        Costs one step per elapsed bucket, at most the size of the ring.
+        """
+        if self.bucket is None or bucket - self.bucket >= self.size:
+            self.counts = [0] * self.size
+            self.sums = [0] * self.size
+            self.window_counts = [0] * len(self.windows)
+            self.window_sums = [0] * len(self.windows)
+            self.bucket = bucket
+            return
+        while self.bucket < bucket:
+            self.bucket += 1
+            for i, window in enumerate(self.windows):
+                leaving = (self.bucket - window) % self.size
+                self.window_counts[i] -= self.counts[leaving]
+                self.window_sums[i] -= self.sums[leaving]
+            # The slot of the new bucket held the bucket that just left the largest window
+            slot = self.bucket % self.size
+            self.counts[slot] = 0
+            self.sums[slot] = 0
+
+    def add(self, bucket, level):
+        """
+        Add a report to its bucket; late reports still count in the windows
+        they fall in. Returns False if the bucket is already out of the ring.
+        """
+        if self.bucket is None or bucket > self.bucket:
+            self.advance(bucket)
+        age = self.bucket - bucket
+        if age >= self.size:
+            return False
+        slot = bucket % self.size
+        self.counts[slot] += 1
+        self.sums[slot] += level
+        for i, window in enumerate(self.windows):
+            if age < window:
+                self.window_counts[i] += 1
+                self.window_sums[i] += level
+        return True
+
+
+class CrowdAggregator:
+    """
+    Live crowdedness of every dining hall.
+
+    Args:
+    halls (iterable): Hall names reports are accepted for
+    windows (tuple): Window lengths in buckets (minutes by default)
+    bucket_seconds (int): Length of a bucket
+    clock (callable): Time source of the rate limit, in seconds. The server's
+    own clock, not the report times, so a client cannot refill its bucket by
+    sending reports dated in the future
+    """
+
+    def __init__(self, halls, windows=WINDOW_MINUTES, bucket_seconds=BUCKET_SECONDS, clock=time.monotonic):
+        self.halls = list(halls)
+        self.windows = tuple(windows)
+        self.bucket_seconds = bucket_seconds
+        self.live = {hall: HallWindows(self.windows) for hall in self.halls}
+        # hall -> 7 x 24 running mean level and report count, weekday 0 = Monday
+        self.profile_means = {hall: np.zeros((7, 24)) for hall in self.halls}
+        self.profile_counts = {hall: np.zeros((7, 24), dtype=np.int64) for hall in self.halls}
+        # user id -> (tokens, time they were counted at), least recently seen first
+        self.tokens = OrderedDict()
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+        self._slot = (None, None)
+
+    def _profile_slot(self, bucket):
+        # Weekday and hour of a bucket, reused for every report in the same bucket
+        slot_bucket, slot = self._slot
+        if bucket != slot_bucket:
+            local = time.localtime(bucket * self.bucket_seconds)
+            slot = (local.tm_wday, local.tm_hour)
+            self._slot = (bucket, slot)
+        return slot
+
+    def _take_token(self, user_id):
+        tokens, counted_at = self.tokens.get(user_id, (RATE_BURST, None))
+        # Time never runs backwards for a bucket, even if the clock does
+        now = self.clock() if counted_at is None else max(counted_at, self.clock())
+        if counted_at is not None:
+            tokens = min(RATE_BURST, tokens + (now - counted_at) / RATE_SECONDS)
+        taken = tokens >= 1
+        self.tokens[user_id] = (tokens - 1 if taken else tokens, now)
+        self.tokens.move_to_end(user_id)
+
+        # Users whose bucket has refilled completely are forgotten, oldest
+        # first, a few per report, so the table only holds recent reporters
+        full_after = RATE_BURST * RATE_SECONDS
+        while self.tokens:
+            user, (_, seen_at) = next(iter(self.tokens.items()))
+            if now - seen_at < full_after:
+                break
+            del self.tokens[user]
+        return taken
+
+    def report(self, hall, user_id, level, when=None):
+        """
+        Record one user's report.
+
+        Args:
+        hall (str): Hall name
+        user_id (str): Reporting user
+        level (int): 1 (empty) to 5 (packed)
+        when (float): Unix time the report was received; now if None (replays
+        and load tests pass their own). Only places the report in the windows;
+        the rate limit runs on the aggregator's clock
+
+        Raises:
+        KeyError: Unknown hall
+        ValueError: Level out of range
+        RateLimitError: The user reported too often
+        """
+        if not MIN_LEVEL <= level <= MAX_LEVEL:
+            raise ValueError(f"Crowdedness level must be {MIN_LEVEL} to {MAX_LEVEL}, not {level}")
+        windows = self.live[hall]
+        when = time.time() if when is None else when
+        bucket = int(when // self.bucket_seconds)
+
+        with self.lock:
+            if not self._take_token(user_id):
+                self.rejected += 1
+                raise RateLimitError(f"Too many reports from {user_id}")
+            # A report older than every window only counts towards the profile
+            windows.add(bucket, level)
+            weekday, hour = self._profile_slot(bucket)
+            counts = self.profile_counts[hall]
+            means = self.profile_means[hall]
+            counts[weekday, hour] += 1
+            means[weekday, hour] += (level - means[weekday, hour]) / min(counts[weekday, hour], PROFILE_MEMORY)
+            self.accepted += 1
+
+    def typical(self, hall, when=None):
+        """
+        Historical mean level of the hall at this weekday and hour, or None if
+        no report was ever made then.
+        """
+        weekday, hour = self._profile_slot(int((when or time.time()) // self.bucket_seconds))
+        if not self.profile_counts[hall][weekday, hour]:
+            return None
+        return float(self.profile_means[hall][weekday, hour])
+
+    def estimate(self, hall, window=None, now=None):
+        """
+        Crowdedness of one hall over the last window buckets.
+
+        With few live reports the estimate is pulled towards the historical
+        profile, weighted as PRIOR_WEIGHT reports.
+
+        Returns:
+        dict: level (None if there is nothing to go by), reports in the
+        window, live (mean of the live reports only) and typical
+        """
+        window = window or self.windows[0]
+        i = self.windows.index(window)
+        now = time.time() if now is None else now
+        with self.lock:
+            live = self.live[hall]
+            live.advance(int(now // self.bucket_seconds))
+            count, total = live.window_counts[i], live.window_sums[i]
+            typical = self.typical(hall, now)
+
+        live_level = total / count if count else None
+        if typical is None:
+            level = live_level
+        else:
+            level = (total + PRIOR_WEIGHT * typical) / (count + PRIOR_WEIGHT)
+        return {'hall': hall, 'window_minutes': window * self.bucket_seconds / 60, 'level': level,
+                'reports': count, 'live': live_level, 'typical': typical}
+
+    def snapshot(self, now=None):
+        """
+        Estimates of every hall over every window, for the app's home screen.
+        """
+        return {hall: {window: self.estimate(hall, window, now) for window in self.windows} for hall in self.halls}
+
+    def save_profiles(self, path):
+        """
+        Save the weekday x hour profiles of every hall to a .npz file.
+        """
+        with self.lock:
+            np.savez_compressed(path, halls=np.array(self.halls),
+                                means=np.stack([self.profile_means[hall] for hall in self.halls]),
+                                counts=np.stack([self.profile_counts[hall] for hall in self.halls]))
+
+    def load_profiles(self, path):
+        """
+        Load profiles saved by save_profiles; halls no longer listed are skipped.
+        """
+        with np.load(path) as data:
+            with self.lock:
+                for hall, means, counts in zip(data['halls'], data['means'], data['counts']):
+                    if str(hall) in self.profile_means:
+                        self.profile_means[str(hall)] = means.astype(np.float64)
+                        self.profile_counts[str(hall)] = counts.astype(np.int64)
+
+
+def load_halls(path=DEFAULT_LOCATIONS_CSV):
+    return pd.read_csv(path, dtype=str)['name'].dropna().tolist()
+
+
+def synthetic_reports(halls, n_reports, n_users, start, seconds, seed=0):
+    """
+    Random reports for load testing, spread evenly over seconds from start,
+    each hall with its own typical level.
+    """
+    rng = random.Random(seed)
+    base_levels = {hall: rng.uniform(1.5, 4.5) for hall in halls}
+    step = seconds / n_reports
+    for i in range(n_reports):
+        hall = rng.choice(halls)
+        level = min(MAX_LEVEL, max(MIN_LEVEL, round(rng.gauss(base_levels[hall], 0.8))))
+        yield hall, f"user{rng.randrange(n_users)}", level, start + i * step
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate crowdedness reports for the dining halls")
+    parser.add_argument('--csv', default=DEFAULT_LOCATIONS_CSV, help="Dining hall locations CSV")
+    parser.add_argument('--synthetic-reports', type=int, default=100000, help="Number of random reports to ingest")
+    parser.add_argument('--users', type=int, default=20000, help="Number of users the reports come from")
+    parser.add_argument('--minutes', type=float, default=30, help="Time span the reports are spread over")
+    parser.add_argument('--profiles', default=None, help=".npz file to load the profiles from and save them to")
+    args = parser.parse_args()
+
+    # The rate limit follows the replayed report times, as if they arrived live
+    replay_time = [0.0]
+    aggregator = CrowdAggregator(load_halls(args.csv), clock=lambda: replay_time[0])
+    if args.profiles and os.path.exists(args.profiles):
+        aggregator.load_profiles(args.profiles)
+
+    now = time.time()
+    reports = list(synthetic_reports(aggregator.halls, args.synthetic_reports, args.users,
+                                     now - args.minutes * 60, args.minutes * 60))
+    start = time.perf_counter()
+    for hall, user_id, level, when in reports:
+        replay_time[0] = when
+        try:
+            aggregator.report(hall, user_id, level, when)
+        except RateLimitError:
+            pass
+    elapsed = time.perf_counter() - start
+    print(f"Ingested {len(reports)} reports in {elapsed:.2f} s ({len(reports) / elapsed:.0f} reports/s): "
+          f"{aggregator.accepted} accepted, {aggregator.rejected} rate limited")
+
+    start = time.perf_counter()
+    snapshot = aggregator.snapshot(now)
+    elapsed = time.perf_counter() - start
+    for hall, estimates in snapshot.items():
+        print(f"{hall}: " + ", ".join(
+            f"{window} min {estimate['level']:.2f} ({estimate['reports']} reports)" if estimate['level'] is not None
+            else f"{window} min no data" for window, estimate in estimates.items()))
+    print(f"Estimated {len(snapshot)} halls in {elapsed * 1000:.2f} ms")
+
+    if args.profiles:
+        aggregator.save_profiles(args.profiles)
+        print(f"Profiles saved to {args.profiles}")
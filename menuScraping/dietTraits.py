@@ -0,0 +1,365 @@
+import argparse
+import csv
+import enum
+import functools
+import os
+import random
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+import menuStore
+
+# Allergen and diet filtering ("no wheat, no soy", "vegan only"). The trait
+# names scraped from the Food_Trait_Icons_<trait> images are mapped once to bits
+# of a fixed enumeration, so a dish's traits are one integer and a day's menu is
+# a few numpy columns. A filter over every hall and meal is then one vectorized
+# mask, and the saved diet profiles of all users are applied together.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+
+
+class Trait(enum.IntFlag):
+    # The bits are stored in the menu database; never renumber them, only add
+    WHEAT = 1 << 0
+    SOY = 1 << 1
+    DAIRY = 1 << 2
+    EGG = 1 << 3
+    CORN = 1 << 4
+    FISH = 1 << 5
+    SHELLFISH = 1 << 6
+    SESAME = 1 << 7
+    PEANUT = 1 << 8
+    TREE_NUT = 1 << 9
+    COCONUT = 1 << 10
+    GLUTEN_FREE = 1 << 11
+    VEGETARIAN = 1 << 12
+    VEGAN = 1 << 13
+    HALAL = 1 << 14
+    # Any icon not listed above, so dishes with unrecognized traits can still be
+    # told apart (and excluded) until the trait gets its own bit
+    OTHER = 1 << 31
+
+
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9]+")
+
+# Other spellings of the trait names, after normalize_trait
+ALIASES = {
+    'milk': 'dairy',
+    'eggs': 'egg',
+    'glutenfree': 'gluten_free',
+    'shell_fish': 'shellfish',
+    'peanuts': 'peanut',
+    'tree_nuts': 'tree_nut',
+    'treenut': 'tree_nut',
+    'treenuts': 'tree_nut',
+    'veggie': 'vegetarian',
+    'plant_based': 'vegan'
+}
+
+
+def normalize_trait(name):
+    name = NON_WORD_PATTERN.sub('_', str(name).lower()).strip('_')
+    return ALIASES.get(name, name)
+
+
+def trait_bit(name):
+    """
+    Bit of one trait name, or Trait.OTHER if it is not in the enumeration.
+    """
+    return Trait.__members__.get(normalize_trait(name).upper(), Trait.OTHER)
+
+
+@functools.lru_cache(maxsize=4096)
+def trait_mask(dietary_traits):
+    """
+    Bitmask of a dietary_traits string as saved by the scrapers, e.g.
+    'wheat, soy, coconut'. The same few strings repeat on every menu, so
+    results are cached.
+
+    Returns:
+    int
+    """
+    if not isinstance(dietary_traits, str):
+        return 0
+    mask = 0
+    for name in dietary_traits.split(','):
+        if name.strip():
+            mask |= trait_bit(name)
+    return mask
+
+
+def trait_names(mask):
+    """
+    Lowercase names of the traits set in mask, in bit order.
+    """
+    return [trait.name.lower() for trait in Trait if mask & trait]
+
+
+def parse_traits(names):
+    """
+    Bitmask of trait names given by a user or a profile, as an iterable or a
+    comma-separated string. Unlike trait_mask, unknown names are an error.
+
+    Returns:
+    int
+    """
+    if isinstance(names, str):
+        names = names.split(',')
+    mask = 0
+    for name in names:
+        if not name.strip():
+            continue
+        key = normalize_trait(name).upper()
+        if key not in Trait.__members__:
+            raise ValueError(f"Unknown dietary trait '{name.strip()}'; known traits: "
+                             f"{', '.join(trait.name.lower() for trait in Trait)}")
+        mask |= Trait[key]
+    return mask
+
+
+def _calories(value):
+    # 'N/A' and empty calories become NaN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+class DayMenu:
+    """
+    One day's menus of every hall and meal as columns: one row per dish served,
+    with the hall and meal as small integer codes, the calories as floats (NaN
+    where unknown) and the traits as uint32 bitmasks.
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+        rows (iterable of dict): location_name, meal, item_name, calories and
+        dietary_traits of each dish served; a trait_mask, if present, is used
+        instead of parsing dietary_traits
+        """
+        location_codes = {}
+        meal_codes = {}
+        location, meal, calories, traits = [], [], [], []
+        self.item_names = []
+        self.dietary_traits = []
+        for row in rows:
+            location.append(location_codes.setdefault(row['location_name'], len(location_codes)))
+            meal.append(meal_codes.setdefault(row['meal'], len(meal_codes)))
+            self.item_names.append(row['item_name'])
+            self.dietary_traits.append(row.get('dietary_traits') or '')
+            calories.append(_calories(row.get('calories')))
+            mask = row.get('trait_mask')
+            traits.append(trait_mask(row.get('dietary_traits')) if mask is None else mask)
+        self.locations = list(location_codes)
+        self.meals = list(meal_codes)
+        self.location = np.array(location, dtype=np.int16)
+        self.meal = np.array(meal, dtype=np.int8)
+        self.calories = np.array(calories, dtype=np.float32)
+        self.traits = np.array(traits, dtype=np.uint32)
+
+    @classmethod
+    def from_menus(cls, menus):
+        """
+        Args:
+        menus (dict): meal_type -> list of menu item dicts as built by extract_menu_items
+        """
+        return cls(dict(item, meal=meal_type) for meal_type, items in menus.items() for item in items)
+
+    @classmethod
+    def from_store(cls, conn, menu_date):
+        """
+        Load one date from the menu database, using its stored trait masks.
+        """
+        return cls(menuStore.get_day(conn, menu_date))
+
+    def __len__(self):
+        return len(self.item_names)
+
+    def mask(self, include=0, exclude=0, locations=None, meals=None, max_calories=None):
+        """
+        Rows that have every trait in include and none in exclude, e.g.
+        mask(include=Trait.VEGAN, exclude=Trait.WHEAT | Trait.SOY).
+
+        Args:
+        include (int): Traits a dish must have
+        exclude (int): Traits a dish must not have
+        locations (iterable): Only these halls; all if None
+        meals (iterable): Only these meals; all if None
+        max_calories (float): Only dishes known to have at most this many calories
+
+        Returns:
+        ndarray of bool: One entry per row
+        """
+        selected = (self.traits & np.uint32(exclude)) == 0
+        if include:
+            selected &= (self.traits & np.uint32(include)) == np.uint32(include)
+        if locations is not None:
+            selected &= np.isin(self.location, self._codes(self.locations, locations))
+        if meals is not None:
+            selected &= np.isin(self.meal, self._codes(self.meals, meals))
+        if max_calories is not None:
+            selected &= self.calories <= max_calories
+        return selected
+
+    @staticmethod
+    def _codes(values, wanted):
+        codes = {value: code for code, value in enumerate(values)}
+        return [codes[value] for value in wanted if value in codes]
+
+    def rows(self, selected):
+        """
+        The rows picked by a mask (or index array) as menu item dicts.
+        """
+        indexes = np.flatnonzero(selected) if selected.dtype == bool else selected
+        return [{
+            'location_name': self.locations[self.location[i]],
+            'meal': self.meals[self.meal[i]],
+            'item_name': self.item_names[i],
+            'calories': None if np.isnan(self.calories[i]) else int(self.calories[i]),
+            'dietary_traits': self.dietary_traits[i]
+        } for i in indexes]
+
+    def apply_profiles(self, profiles):
+        """
+        Apply the diet profiles of many users at once.
+
+        Users with the same profile share one row of the result, and all
+        distinct profiles are checked against all dishes in a single
+        broadcast, so the cost grows with the number of distinct profiles, not
+        the number of users.
+
+        Args:
+        profiles (dict): user id -> (include mask, exclude mask)
+
+        Returns:
+        ProfileMatches
+        """
+        groups = {}
+        user_groups = {}
+        for user_id, profile in profiles.items():
+            user_groups[user_id] = groups.setdefault((int(profile[0]), int(profile[1])), len(groups))
+
+        include = np.fromiter((profile[0] for profile in groups), dtype=np.uint32, count=len(groups))[:, None]
+        exclude = np.fromiter((profile[1] for profile in groups), dtype=np.uint32, count=len(groups))[:, None]
+        traits = self.traits[None, :]
+        allowed = ((traits & include) == include) & ((traits & exclude) == 0)
+        return ProfileMatches(self, user_groups, allowed)
+
+
+class ProfileMatches:
+    """
+    What every user may eat from one DayMenu. allowed has one row per distinct
+    profile and one column per menu row.
+    """
+
+    def __init__(self, day, user_groups, allowed):
+        self.day = day
+        self.user_groups = user_groups
+        self.allowed = allowed
+        self._counts = allowed.sum(axis=1)
+
+    def mask_for(self, user_id):
+        return self.allowed[self.user_groups[user_id]]
+
+    def count_for(self, user_id):
+        return int(self._counts[self.user_groups[user_id]])
+
+    def items_for(self, user_id, locations=None, meals=None):
+        selected = self.mask_for(user_id)
+        if locations is not None or meals is not None:
+            selected = selected & self.day.mask(locations=locations, meals=meals)
+        return self.day.rows(selected)
+
+
+def load_profiles(path):
+    """
+    Load saved diet profiles from a CSV with user_id, include and exclude
+    columns, the last two holding comma-separated trait names.
+
+    Returns:
+    dict: user id -> (include mask, exclude mask)
+    """
+    profiles = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            profiles[row['user_id']] = (parse_traits(row.get('include') or ''),
+                                        parse_traits(row.get('exclude') or ''))
+    return profiles
+
+
+def synthetic_profiles(n_users, seed=0):
+    """
+    Random diet profiles for load testing: most users exclude one to three
+    allergens, some also want vegetarian or vegan dishes, many have no profile.
+    """
+    rng = random.Random(seed)
+    allergens = [Trait.WHEAT, Trait.SOY, Trait.DAIRY, Trait.EGG, Trait.CORN, Trait.FISH, Trait.SESAME,
+                 Trait.COCONUT, Trait.PEANUT, Trait.TREE_NUT]
+    diets = [0, 0, 0, Trait.VEGETARIAN, Trait.VEGAN, Trait.HALAL]
+    profiles = {}
+    for i in range(n_users):
+        exclude = 0
+        for trait in rng.sample(allergens, rng.choice([0, 0, 1, 1, 2, 3])):
+            exclude |= trait
+        profiles[f"user{i}"] = (int(rng.choice(diets)), int(exclude))
+    return profiles
+
+
+def load_menus_from_csvs(directory=script_dir):
+    menus = {}
+    for meal_type in MEAL_TYPES:
+        path = os.path.join(directory, f"dining_hall_{meal_type}_items.csv")
+        if os.path.exists(path):
+            menus[meal_type] = pd.read_csv(path, dtype=str, keep_default_na=False).to_dict('records')
+    return menus
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filter the menus by dietary traits")
+    parser.add_argument('--menus', default=script_dir, help="Directory with the per-meal menu CSVs")
+    parser.add_argument('--db', default=None, help="Read the menus of --date from this menu database instead")
+    parser.add_argument('--date', default=None, help="YYYY-MM-DD, with --db")
+    parser.add_argument('--include', default='', help="Traits dishes must have, e.g. vegan")
+    parser.add_argument('--exclude', default='', help="Traits dishes must not have, e.g. wheat,soy")
+    parser.add_argument('--location', action='append', default=None, help="Only this hall (repeatable)")
+    parser.add_argument('--meal', action='append', choices=MEAL_TYPES, default=None, help="Only this meal (repeatable)")
+    profiles_source = parser.add_mutually_exclusive_group()
+    profiles_source.add_argument('--profiles', help="CSV with user_id, include and exclude columns")
+    profiles_source.add_argument('--synthetic-users', type=int, help="Apply this many random profiles instead")
+    args = parser.parse_args()
+
+    if args.db:
+        conn = menuStore.connect(args.db)
+        try:
+            day = DayMenu.from_store(conn, args.date or time.strftime('%Y-%m-%d'))
+        finally:
+            conn.close()
+    else:
+        day = DayMenu.from_menus(load_menus_from_csvs(args.menus))
+
+    try:
+        include, exclude = parse_traits(args.include), parse_traits(args.exclude)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    selected = day.mask(include, exclude, args.location, args.meal)
+    elapsed = time.perf_counter() - start
+    for item in day.rows(selected):
+        print(f"{item['location_name']} {item['meal']}: {item['item_name']} ({item['dietary_traits'] or 'no traits'})")
+    print(f"{int(selected.sum())} of {len(day)} dishes match, filtered in {elapsed * 1e6:.0f} us")
+
+    if args.profiles or args.synthetic_users:
+        profiles = load_profiles(args.profiles) if args.profiles else synthetic_profiles(args.synthetic_users)
+        start = time.perf_counter()
+        matches = day.apply_profiles(profiles)
+        elapsed = time.perf_counter() - start
+        print(f"Applied {len(profiles)} profiles ({matches.allowed.shape[0]} distinct) to {len(day)} dishes "
+              f"in {elapsed * 1000:.1f} ms")
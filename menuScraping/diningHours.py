@@ -0,0 +1,317 @@
+import argparse
+import bisect
+import os
+import re
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+# "Is it open now?" for the dining halls. get_dining_locations stores hours as
+# free text ("Jan 12 - May 9", "9AM - 11AM", "Closed"); this module parses them
+# once into sorted minute intervals per hall, and every question after that is a
+# binary search. load_schedule() caches the parsed schedule until the locations
+# CSV is rewritten by the next scrape.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LOCATIONS_CSV = os.path.join(script_dir, "dining_hall_locations.csv")
+
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+MINUTES_PER_DAY = 24 * 60
+
+RANGE_PATTERN = re.compile(r"\s*[-–—]\s*|\s+to\s+", re.IGNORECASE)
+TIME_PATTERN = re.compile(r"^(\d{1,2})(?::(\d{2}))?\s*([ap])\.?m\.?$", re.IGNORECASE)
+DAY_PATTERN = re.compile(r"^([A-Za-z]{3})[A-Za-z]*\.?\s+(\d{1,2})$")
+
+
+def parse_time(text):
+    """
+    Parse '9AM', '11:30 pm', 'noon' or 'midnight' into minutes after midnight.
+    Returns None if the text is not a time.
+    """
+    text = text.strip().lower()
+    if text == 'noon':
+        return 12 * 60
+    if text == 'midnight':
+        return 0
+    match = TIME_PATTERN.match(text)
+    if not match:
+        return None
+    hour, minute, half = int(match.group(1)), int(match.group(2) or 0), match.group(3).lower()
+    if not 1 <= hour <= 12 or minute > 59:
+        return None
+    hour = hour % 12 + (12 if half == 'p' else 0)
+    return hour * 60 + minute
+
+
+def parse_hours(text):
+    """
+    Parse a meal hours string like '9AM - 11AM'.
+
+    Returns:
+    tuple: (start, end) in minutes after midnight, with end past 1440 if the
+    meal runs past midnight, or None if closed, empty or unreadable
+    """
+    if not isinstance(text, str) or not text.strip() or text.strip().lower() == 'closed':
+        return None
+    parts = RANGE_PATTERN.split(text.strip(), maxsplit=1)
+    if len(parts) != 2:
+        return None
+    start, end = parse_time(parts[0]), parse_time(parts[1])
+    if start is None or end is None:
+        return None
+    if end <= start:
+        end += MINUTES_PER_DAY
+    return start, end
+
+
+def parse_day(text, year):
+    match = DAY_PATTERN.match(text.strip())
+    if not match:
+        return None
+    try:
+        return datetime.strptime(f"{match.group(1).title()} {match.group(2)} {year}", '%b %d %Y').date()
+    except ValueError:
+        return None
+
+
+def parse_dates(text, reference_date):
+    """
+    Parse dates of operation like 'Jan 12 - May 9'. The site leaves out the
+    year, so the range is placed in the year of reference_date (the scrape
+    date), running into the next year if it ends before it starts. A range
+    that would already be over by reference_date is the coming one (e.g. the
+    spring term listed in a December scrape), so it is moved a year ahead.
+
+    Returns:
+    tuple: (first day, last day), or (None, None) if there is no readable range
+    """
+    if not isinstance(text, str):
+        return None, None
+    parts = RANGE_PATTERN.split(text.strip(), maxsplit=1)
+    if len(parts) != 2:
+        return None, None
+    for year in (reference_date.year, reference_date.year + 1):
+        first = parse_day(parts[0], year)
+        last = parse_day(parts[1], year)
+        if first is None or last is None:
+            return None, None
+        if last < first:
+            last = parse_day(parts[1], year + 1)
+        if last >= reference_date:
+            break
+    return first, last
+
+
+class HallSchedule:
+    """
+    Parsed opening hours of one dining hall. The same daily hours apply on
+    every day between first_day and last_day (every day if those are None).
+    """
+
+    def __init__(self, name, first_day, last_day, meals):
+        self.name = name
+        self.first_day = first_day
+        self.last_day = last_day
+        # (start, end, meal) sorted by start, in minutes after midnight
+        self.meals = sorted(meals)
+        self.meal_starts = [start for start, _, _ in self.meals]
+
+        # Back-to-back meals (11AM breakfast end, 11AM lunch start) merged into
+        # one open span, so "closing in" means the hall actually closing
+        spans = []
+        for start, end, _ in self.meals:
+            if spans and start <= spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([start, end])
+        self.spans = [tuple(span) for span in spans]
+        self.span_starts = [start for start, _ in self.spans]
+
+    def operates_on(self, day):
+        if not self.spans:
+            return False
+        if self.first_day is not None and day < self.first_day:
+            return False
+        if self.last_day is not None and day > self.last_day:
+            return False
+        return True
+
+    def _open_span(self, when):
+        """
+        The span the hall is open in at when, as (opened, closes) datetimes,
+        or None if it is closed.
+        """
+        day = when.date()
+        minute = when.hour * 60 + when.minute + when.second / 60
+        if self.operates_on(day):
+            i = bisect.bisect_right(self.span_starts, minute) - 1
+            if i >= 0 and minute < self.spans[i][1]:
+                midnight = datetime.combine(day, datetime.min.time())
+                return (midnight + timedelta(minutes=self.spans[i][0]),
+                        midnight + timedelta(minutes=self.spans[i][1]))
+        # Yesterday's last span may run past midnight
+        yesterday = day - timedelta(days=1)
+        if self.operates_on(yesterday) and minute + MINUTES_PER_DAY < self.spans[-1][1]:
+            midnight = datetime.combine(yesterday, datetime.min.time())
+            return (midnight + timedelta(minutes=self.spans[-1][0]),
+                    midnight + timedelta(minutes=self.spans[-1][1]))
+        return None
+
+    def current_meal(self, when):
+        """
+        The meal being served at when, or None.
+        """
+        for day, offset in ((when.date(), 0), (when.date() - timedelta(days=1), MINUTES_PER_DAY)):
+            if not self.operates_on(day):
+                continue
+            minute = when.hour * 60 + when.minute + when.second / 60 + offset
+            i = bisect.bisect_right(self.meal_starts, minute) - 1
+            if i >= 0 and minute < self.meals[i][1]:
+                return self.meals[i][2]
+        return None
+
+    def is_open(self, when):
+        return self._open_span(when) is not None
+
+    def closes_at(self, when):
+        span = self._open_span(when)
+        return span[1] if span else None
+
+    def next_opening(self, when):
+        """
+        When the hall next opens after when (not counting a span it is open in
+        now), or None if it does not open again within its dates of operation.
+        """
+        if not self.spans:
+            return None
+        day = when.date()
+        minute = when.hour * 60 + when.minute + when.second / 60
+        if self.operates_on(day):
+            i = bisect.bisect_right(self.span_starts, minute)
+            if i < len(self.spans):
+                return datetime.combine(day, datetime.min.time()) + timedelta(minutes=self.spans[i][0])
+
+        # First operating day after today
+        next_day = day + timedelta(days=1)
+        if self.first_day is not None and next_day < self.first_day:
+            next_day = self.first_day
+        if not self.operates_on(next_day):
+            return None
+        return datetime.combine(next_day, datetime.min.time()) + timedelta(minutes=self.spans[0][0])
+
+    def status(self, when):
+        closes = self.closes_at(when)
+        return {
+            'name': self.name,
+            'open': closes is not None,
+            'meal': self.current_meal(when),
+            'closes_at': closes,
+            'closes_in_minutes': int((closes - when).total_seconds() // 60) if closes else None,
+            'next_opening': self.next_opening(when)
+        }
+
+
+class Schedule:
+    """
+    Opening hours of all dining halls, in the order of the locations CSV.
+    """
+
+    def __init__(self, halls):
+        self.halls = halls
+        self.by_name = {hall.name: hall for hall in halls}
+        self._status_minute = None
+        self._status = None
+
+    def open_at(self, when):
+        """
+        Names of the halls open at when.
+        """
+        return [hall.name for hall in self.halls if hall.is_open(when)]
+
+    def closing_within(self, when, minutes):
+        """
+        Halls open at when that close within the given number of minutes.
+
+        Returns:
+        list of tuple: (hall name, closing datetime)
+        """
+        limit = when + timedelta(minutes=minutes)
+        closing = []
+        for hall in self.halls:
+            closes = hall.closes_at(when)
+            if closes is not None and closes <= limit:
+                closing.append((hall.name, closes))
+        return closing
+
+    def status(self, when=None):
+        """
+        Home screen status of every hall. Results are reused for every request
+        within the same minute.
+        """
+        when = (when or datetime.now()).replace(second=0, microsecond=0)
+        if when != self._status_minute:
+            self._status = [hall.status(when) for hall in self.halls]
+            self._status_minute = when
+        return self._status
+
+
+def build_schedule(locations, reference_date=None):
+    """
+    Parse the hours of every location once.
+
+    Args:
+    locations (list of dict): Locations as returned by get_dining_locations
+    reference_date (date): Date the locations were scraped, used to place the
+    year-less dates of operation; defaults to today
+
+    Returns:
+    Schedule
+    """
+    reference_date = reference_date or date.today()
+    halls = []
+    for location in locations:
+        first_day, last_day = parse_dates(location.get('dates_of_operation'), reference_date)
+        meals = []
+        for meal_type in MEAL_TYPES:
+            hours = parse_hours(location.get(f'{meal_type}_hours'))
+            if hours is not None:
+                meals.append((hours[0], hours[1], meal_type))
+        halls.append(HallSchedule(location['name'], first_day, last_day, meals))
+    return Schedule(halls)
+
+
+# path -> (modification time, Schedule)
+_schedule_cache = {}
+
+
+def load_schedule(path=DEFAULT_LOCATIONS_CSV):
+    """
+    Load the schedule from the locations CSV, parsing it only when the file
+    changed since the last call (i.e. after the next scrape).
+    """
+    mtime = os.path.getmtime(path)
+    cached = _schedule_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    df = pd.read_csv(path, dtype=str).fillna('')
+    reference_date = datetime.fromtimestamp(mtime).date()
+    schedule = build_schedule(df.to_dict('records'), reference_date)
+    _schedule_cache[path] = (mtime, schedule)
+    return schedule
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show which dining halls are open")
+    parser.add_argument('--csv', default=DEFAULT_LOCATIONS_CSV, help="Dining hall locations CSV")
+    parser.add_argument('--at', default=None, help="Time to check, YYYY-MM-DD HH:MM (default: now)")
+    args = parser.parse_args()
+
+    when = datetime.strptime(args.at, '%Y-%m-%d %H:%M') if args.at else datetime.now()
+    for hall in load_schedule(args.csv).status(when):
+        if hall['open']:
+            print(f"{hall['name']}: open for {hall['meal']}, closes in {hall['closes_in_minutes']} min")
+        elif hall['next_opening']:
+            print(f"{hall['name']}: closed, opens {hall['next_opening']:%a %b %d %I:%M %p}")
+        else:
+            print(f"{hall['name']}: closed")
@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+from collections.abc import Mapping
+
+# Modules shared by the scrapers live in ../shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import scrapeMetrics
+
+# The same dishes are served at most halls on most days, so a week of menus
+# lists each dish many times. The scrapers build every item through a DishPool:
+# the dish fields (name, calories, traits, food id) are kept once per distinct
+# dish, and each menu item is a small MenuItem pairing its location with that
+# shared record. Items read like the plain dicts the builders return without a
+# pool, so the CSV writers, menuStore and nutritionCache take either.
+
+
+class MenuItem(Mapping):
+    """
+    One dish on one location's menu: the location name plus a shared, read-only
+    dish record. Reads like a dict with the location_name key added.
+    """
+    __slots__ = ('location_name', 'dish')
+
+    def __init__(self, location_name, dish):
+        self.location_name = location_name
+        self.dish = dish
+
+    def __getitem__(self, key):
+        if key == 'location_name':
+            return self.location_name
+        return self.dish[key]
+
+    def __iter__(self):
+        yield 'location_name'
+        yield from self.dish
+
+    def __len__(self):
+        return len(self.dish) + 1
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class DishPool:
+    """
+    Hands out one shared record per distinct dish. Safe to use from the worker
+    threads that build the menus.
+    """
+
+    def __init__(self):
+        self.dishes = {}
+        self.lock = threading.Lock()
+
+    def item(self, location_name, dish):
+        """
+        Make the menu item of dish at location_name, reusing the record of an
+        identical dish seen before.
+
+        Args:
+        location_name (str): Name of the dining location
+        dish (dict): item_name, calories and dietary_traits, plus food_id for
+        API items
+
+        Returns:
+        MenuItem: The menu item; treat it as read-only
+        """
+        key = (dish['item_name'], dish['calories'], dish['dietary_traits'], dish.get('food_id'))
+        with self.lock:
+            shared = self.dishes.setdefault(key, dish)
+        scrapeMetrics.count('menu_items')
+        if shared is dish:
+            scrapeMetrics.count('distinct_dishes')
+        return MenuItem(location_name, shared)
+
+    def __len__(self):
+        return len(self.dishes)
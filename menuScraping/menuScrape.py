@@ -1,35 +1,60 @@
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import time
 import csv
-from datetime import datetime
-from bs4 import BeautifulSoup
+from datetime import datetime, timedelta
+from bs4 import BeautifulSoup, SoupStrainer
 import re
+import argparse
+import queue
+import nutrisliceClient
+import menuStore
+import nutritionCache
+import dishPool
+import sys
 
-# Set up ChromeDriver with visible browser options
-options = webdriver.ChromeOptions()
-options.add_argument('--start-maximized')  # Maximize browser window
-options.add_argument('--disable-extensions')
-options.add_experimental_option("prefs", {
-    "profile.default_content_setting_values.geolocation": 1  # 1 = allow
-})
-
-# Initialize the driver
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+# Modules shared by the scrapers live in ../shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import searchIndex
+import fetchCache
+import scrapeMetrics
+import browserDriver
 
 # Base URL
 base_url = "https://wisc-housingdining.nutrislice.com/"
 
-def get_dining_locations():
+# The CSVs and databases are written next to this script by default
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Use the much faster lxml parser when it is installed
+try:
+    import lxml
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Only the menu items are read from a menu page, so only their subtrees are built
+MENU_ITEM_STRAINER = SoupStrainer('ns-menu-item-food')
+
+# Patterns used for every menu item, compiled once
+TRAIT_PATTERN = re.compile(r'Food_Trait_Icons_([^-]+)')
+CALORIES_PATTERN = re.compile(r'(\d+)')
+
+# Meals scraped for every location, each saved to its own CSV
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+
+# Columns of the per-meal CSVs; API items also carry a food_id, which is not saved
+MENU_ITEM_COLUMNS = ['location_name', 'item_name', 'calories', 'dietary_traits']
+
+def get_dining_locations(driver):
     # Navigate to the main page
-    driver.get(base_url)
-    print("Loaded main page")
+    with scrapeMetrics.stage('navigate', url=base_url):
+        driver.get(base_url)
+    scrapeMetrics.progress("Loaded main page")
     
     # Click the "View Menus" button
     try:
@@ -40,7 +65,7 @@ def get_dining_locations():
             "button.primary"
         ]
         
-        for selector in view_menus_selectors:
+        for selector_index, selector in enumerate(view_menus_selectors):
             try:
                 if selector.startswith("//"):
                     button = WebDriverWait(driver, 10).until(
@@ -51,10 +76,13 @@ def get_dining_locations():
                         EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
                     )
                 button.click()
-                print(f"Clicked 'View Menus' using selector: {selector}")
+                scrapeMetrics.progress(f"Clicked 'View Menus' using selector: {selector}")
+                # Which fallback worked shows when the site's markup changed
+                scrapeMetrics.count(f'view_menus_selector_{selector_index}')
                 break
             except Exception as click_error:
-                print(f"Failed to click with selector {selector}: {click_error}")
+                scrapeMetrics.progress(f"Failed to click with selector {selector}: {click_error}")
+                scrapeMetrics.count('view_menus_selector_failed')
                 continue
         else:
             raise Exception("Could not find 'View Menus' button")
@@ -65,17 +93,19 @@ def get_dining_locations():
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), \"Let's do it\")]"))
             )
             lets_do_it.click()
-            print("Clicked 'Let's do it' button")
+            scrapeMetrics.progress("Clicked 'Let's do it' button")
+            scrapeMetrics.count('lets_do_it_clicked')
         except:
-            print("'Let's do it' button not found or not needed")
+            scrapeMetrics.progress("'Let's do it' button not found or not needed")
+            scrapeMetrics.count('lets_do_it_missing')
         
-        # Wait for content to load after location permissions
-        time.sleep(5)
-        
-        # Find all location containers
-        location_elements = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.content-container"))
-        )
+        # Wait for the location containers to load after location permissions;
+        # their labels are filled in last, so wait for those to show
+        with scrapeMetrics.stage('wait', url=base_url):
+            WebDriverWait(driver, 15).until(
+                EC.visibility_of_any_elements_located((By.CSS_SELECTOR, "div.content-container div.label"))
+            )
+            location_elements = driver.find_elements(By.CSS_SELECTOR, "div.content-container")
         
         locations = []
         for elem in location_elements:
@@ -153,7 +183,7 @@ def get_dining_locations():
                 
                 if name and name != "Unknown":
                     locations.append(location_data)
-                    print(f"Added {name} with hours: {hours_data}")
+                    scrapeMetrics.progress(f"Added {name} with hours: {hours_data}")
                 
             except Exception as e:
                 print(f"Error processing a location element: {e}")
@@ -167,7 +197,7 @@ def get_dining_locations():
         print(f"Error in get_dining_locations: {e}")
         raise  # Re-raise the exception to be handled in the main block
 
-def extract_menu_items(html_content, location_name, meal_type):
+def extract_menu_items(html_content, location_name, meal_type, dishes=None):
     """
     Extract menu items from the HTML content for a specific meal type.
     
@@ -175,11 +205,12 @@ def extract_menu_items(html_content, location_name, meal_type):
     html_content (str): HTML page source
     location_name (str): Name of the dining location
     meal_type (str): Type of meal (breakfast/lunch/dinner)
+    dishes (DishPool): If given, items share one record per distinct dish
     
     Returns:
     list of dict: List of menu items with details
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=MENU_ITEM_STRAINER)
     
     items = []
     
@@ -201,19 +232,21 @@ def extract_menu_items(html_content, location_name, meal_type):
         for trait in trait_elems:
             # Extract trait name from background image URL
             style = trait.get('style', '')
-            trait_match = re.search(r'Food_Trait_Icons_([^-]+)', style)
+            trait_match = TRAIT_PATTERN.search(style)
             if trait_match:
                 traits.append(trait_match.group(1))
         
         # Create item dictionary
-        item_dict = {
-            'location_name': location_name,
+        dish = {
             'item_name': name,
             'calories': calories,
             'dietary_traits': ', '.join(traits) if traits else ''
         }
         
-        items.append(item_dict)
+        if dishes is not None:
+            items.append(dishes.item(location_name, dish))
+        else:
+            items.append({'location_name': location_name, **dish})
     
     return items
 
@@ -226,94 +259,375 @@ def clean_calories(cal_string):
         return 'N/A'
     
     # Remove 'Cal' or 'cal' and extract numeric value
-    match = re.search(r'(\d+)', str(cal_string))
+    match = CALORIES_PATTERN.search(str(cal_string))
     return match.group(1) if match else 'N/A'
 
-def get_menu_for_locations(locations, meal_type):
+def wait_for_menu(driver, timeout=10):
+    """
+    Wait until the menu items have rendered instead of sleeping a fixed time.
+    Returns False if no items showed up within the timeout (e.g. no menu that day).
+    """
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "ns-menu-item-food"))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+def load_menu_page(driver, menu_link, timeout=10):
+    """
+    Navigate to a menu page and return its page source once the items have rendered.
+    """
+    with scrapeMetrics.stage('navigate', url=menu_link):
+        driver.get(menu_link)
+    with scrapeMetrics.stage('wait', url=menu_link):
+        if not wait_for_menu(driver, timeout):
+            scrapeMetrics.count('menu_wait_timeouts')
+    with scrapeMetrics.stage('page_source', url=menu_link):
+        return driver.page_source
+
+def scrape_menu_page(driver, location, meal_type, menu_date, timeout=10, page_cache=None, dishes=None):
+    """
+    Load one (location, meal, date) menu page and extract its items.
+
+    Args:
+    driver (WebDriver or callable): Browser session to load the page with, or a
+    function returning one, so no browser is needed when the page is cached
+    location (dict): Dining location as returned by get_dining_locations
+    meal_type (str): Type of meal (breakfast/lunch/dinner)
+    menu_date (str): Date in YYYY-MM-DD format
+    timeout (float): Seconds to wait for the menu items to render
+    page_cache (PageCache): Cache of rendered pages to read from and record to
+    dishes (DishPool): If given, items share one record per distinct dish
+
+    Returns:
+    list of dict: Menu items on the page
+    """
+    # Generate menu link for the date and meal type
+    menu_link = f"{location['link']}/{meal_type}/{menu_date}"
+
+    def load():
+        return load_menu_page(driver() if callable(driver) else driver, menu_link, timeout)
+
+    # Get the page source and extract menu items
+    page_source = fetchCache.get_page(page_cache, menu_link, load)
+    with scrapeMetrics.stage('parse', url=menu_link):
+        return extract_menu_items(page_source, location['name'], meal_type, dishes)
+
+def get_menu_for_locations(locations, meal_type, driver, menu_date=None, page_cache=None, dishes=None):
     """
     Get menu items for each location for a specific meal type.
     
     Args:
     locations (list): List of dining locations
     meal_type (str): Type of meal (breakfast/lunch/dinner)
+    driver (WebDriver): Browser session to load the pages with
+    menu_date (str): Date in YYYY-MM-DD format, defaults to today
+    page_cache (PageCache): Cache of rendered pages to read from and record to
+    dishes (DishPool): If given, items share one record per distinct dish
     
     Returns:
     list: List of all menu items across locations
     """
-    current_date = datetime.now().strftime('%Y-%m-%d')
+    current_date = menu_date or datetime.now().strftime('%Y-%m-%d')
     
     all_menu_items = []
     
     for location in locations:
         try:
-            # Generate menu link for current date and meal type
-            menu_link = f"{location['link']}/{meal_type}/{current_date}"
-            
-            # Navigate to the menu page
-            driver.get(menu_link)
-            time.sleep(5)  # Wait for page to load
-            
-            # Get the page source
-            page_source = driver.page_source
-            
-            # Extract menu items
-            menu_items = extract_menu_items(page_source, location['name'], meal_type)
+            menu_items = scrape_menu_page(driver, location, meal_type, current_date, page_cache=page_cache,
+                                          dishes=dishes)
             
             # Add to all menu items
             all_menu_items.extend(menu_items)
             
-            print(f"Added {len(menu_items)} {meal_type} items for {location['name']}")
+            scrapeMetrics.progress(f"Added {len(menu_items)} {meal_type} items for {location['name']}")
         
         except Exception as e:
             print(f"Error getting {meal_type} menu for {location['name']}: {e}")
+            scrapeMetrics.count('menu_page_errors')
     
     return all_menu_items
 
-# Main function
-if __name__ == "__main__":
+def get_menus_parallel(locations, meal_types=MEAL_TYPES, menu_date=None, pool_size=4, skip_closed=True,
+                       page_cache=None):
+    """
+    Scrape every (location, meal) menu page of one date over a small pool of
+    headless browser sessions.
+
+    Args:
+    locations (list): List of dining locations
+    meal_types (list): Meals to scrape (breakfast/lunch/dinner)
+    menu_date (str): Date in YYYY-MM-DD format, defaults to today
+    pool_size (int): Number of browser sessions to run at once
+    skip_closed (bool): Skip meals whose hours are listed as "Closed" for a location
+    page_cache (PageCache): Cache of rendered pages to read from and record to
+
+    Returns:
+    dict: meal_type -> list of menu items, in the same location order as
+    get_menu_for_locations would produce
+    """
+    if menu_date is None:
+        menu_date = datetime.now().strftime('%Y-%m-%d')
+    return get_menus_for_dates(locations, [menu_date], meal_types, pool_size, skip_closed, page_cache)[menu_date]
+
+def get_menus_for_dates(locations, menu_dates, meal_types=MEAL_TYPES, pool_size=4, skip_closed=True,
+                        page_cache=None, dishes=None):
+    """
+    Scrape every (location, meal, date) menu page over a small pool of headless
+    browser sessions, shared by all dates.
+
+    Args:
+    locations (list): List of dining locations
+    menu_dates (list): Dates in YYYY-MM-DD format
+    meal_types (list): Meals to scrape (breakfast/lunch/dinner)
+    pool_size (int): Number of browser sessions to run at once
+    skip_closed (bool): Skip meals whose hours are listed as "Closed" for a
+    location; only applied to today, the day the hours were read for
+    page_cache (PageCache): Cache of rendered pages; browsers are only started
+    for pages it cannot serve
+    dishes (DishPool): If given, items share one record per distinct dish
+
+    Returns:
+    dict: date -> meal_type -> list of menu items, in location order
+    """
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    jobs = []
+    for menu_date in menu_dates:
+        for meal_type in meal_types:
+            for location in locations:
+                if (skip_closed and menu_date == today
+                        and location.get(f'{meal_type}_hours', '').strip().lower() == 'closed'):
+                    scrapeMetrics.progress(f"Skipping {meal_type} for {location['name']} (closed)")
+                    scrapeMetrics.count('meals_skipped_closed')
+                    continue
+                jobs.append((location, meal_type, menu_date))
+
+    drivers = queue.Queue()
+    created = []
+
+    def run_job(job):
+        location, meal_type, job_date = job
+        borrowed = []
+
+        def borrow():
+            # Borrow a browser from the pool, starting a new one if the pool is not full yet
+            try:
+                driver = drivers.get_nowait()
+            except queue.Empty:
+                driver = browserDriver.create_driver()
+                created.append(driver)
+            borrowed.append(driver)
+            return driver
+
+        try:
+            return scrape_menu_page(borrow, location, meal_type, job_date, page_cache=page_cache, dishes=dishes)
+        finally:
+            for driver in borrowed:
+                drivers.put(driver)
+
+    menus = {menu_date: {meal_type: [] for meal_type in meal_types} for menu_date in menu_dates}
+    try:
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            futures = [executor.submit(run_job, job) for job in jobs]
+            # Collect in job order so the merged output is deterministic
+            for (location, meal_type, menu_date), future in zip(jobs, futures):
+                try:
+                    menu_items = future.result()
+                    menus[menu_date][meal_type].extend(menu_items)
+                    scrapeMetrics.progress(f"Added {len(menu_items)} {meal_type} items for {location['name']} on {menu_date}")
+                except Exception as e:
+                    print(f"Error getting {meal_type} menu for {location['name']} on {menu_date}: {e}")
+                    scrapeMetrics.count('menu_page_errors')
+    finally:
+        for driver in created:
+            try:
+                driver.quit()
+            except:
+                pass
+
+    return menus
+
+def scrape_with_api(workers, menu_dates, foods=None, page_cache=None, dishes=None):
+    """
+    Get locations and the menus of the given dates from the Nutrislice JSON API,
+    without a browser. If foods is given it is filled with
+    nutritionCache.item_identity -> nutrition details of every dish; if dishes
+    (a DishPool) is given the items share one record per distinct dish.
+
+    Returns:
+    tuple: (locations, dict of date -> meal_type -> list of menu items)
+    """
+    session = nutrisliceClient.create_session(pool_size=max(workers, 1), page_cache=page_cache)
+    try:
+        locations = nutrisliceClient.get_dining_locations(session)
+        menus = nutrisliceClient.get_menus_for_dates(session, locations, MEAL_TYPES, menu_dates,
+                                                     max_in_flight=max(workers, 1), foods=foods,
+                                                     dishes=dishes)
+        return locations, menus
+    finally:
+        session.close()
+
+def scrape_with_browser(driver, workers, menu_dates, page_cache=None, dishes=None):
+    """
+    Get locations and the menus of the given dates by driving the menu site in a
+    browser. If dishes (a DishPool) is given the items share one record per
+    distinct dish.
+
+    Returns:
+    tuple: (locations, dict of date -> meal_type -> list of menu items)
+    """
+    locations = get_dining_locations(driver)
+    if workers > 1:
+        menus = get_menus_for_dates(locations, menu_dates, pool_size=workers, page_cache=page_cache,
+                                    dishes=dishes)
+    else:
+        menus = {menu_date: {meal_type: get_menu_for_locations(locations, meal_type, driver, menu_date, page_cache,
+                                                                dishes)
+                             for meal_type in MEAL_TYPES}
+                 for menu_date in menu_dates}
+    return locations, menus
+
+def main(source='api', workers=4, days=1, page_cache=None, output_dir=script_dir,
+         snapshot_path=searchIndex.DEFAULT_SNAPSHOT_PATH):
+    """
+    Scrape the dining locations and the menus of the next days, and save them
+    to the CSVs, the menu database and the nutrition cache in output_dir.
+
+    Args:
+    source (str): 'api' for the Nutrislice JSON API, falling back to the
+    browser on failure, or 'browser' for Selenium only
+    workers (int): Number of menu pages fetched at once (1 = sequential)
+    days (int): Number of days of menus to scrape, starting today
+    page_cache (PageCache): Cache of responses and page sources, or None
+    output_dir (str): Directory the CSVs and databases are written to
+    snapshot_path (str): Search snapshot refreshed with the new menus
+    """
+    driver = None
     try:
-        # Get the directory of the current script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        
         # Set the CSV file paths
-        locations_csv_path = os.path.join(script_dir, "dining_hall_locations.csv")
-        breakfast_items_csv_path = os.path.join(script_dir, "dining_hall_breakfast_items.csv")
-        lunch_items_csv_path = os.path.join(script_dir, "dining_hall_lunch_items.csv")
-        dinner_items_csv_path = os.path.join(script_dir, "dining_hall_dinner_items.csv")
+        locations_csv_path = os.path.join(output_dir, "dining_hall_locations.csv")
+        
+        # Dates of the menus scraped in this run; the CSVs hold today's
+        today = datetime.now()
+        menu_date = today.strftime('%Y-%m-%d')
+        menu_dates = [(today + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(max(days, 1))]
+        
+        # First, get dining locations and menus, from the API if possible
+        dining_locations, menus_by_date = None, None
+        # Nutrition details of every dish, which the API sends with the menus
+        foods = {}
+        # Dishes repeat across halls and days; every item refers to one shared copy
+        dishes = dishPool.DishPool()
+        if source == 'api':
+            try:
+                dining_locations, menus_by_date = scrape_with_api(workers, menu_dates, foods, page_cache, dishes)
+            except Exception as e:
+                print(f"Nutrislice API failed, falling back to the browser: {e}")
+                scrapeMetrics.count('api_fallback_to_browser')
         
-        # First, get and save dining locations
-        dining_locations = get_dining_locations()
+        if dining_locations is None:
+            driver = browserDriver.create_driver()
+            dining_locations, menus_by_date = scrape_with_browser(driver, workers, menu_dates, page_cache, dishes)
         
         if dining_locations:
             print(f"\nFound {len(dining_locations)} dining locations:")
             
+            item_count = sum(len(items) for menus in menus_by_date.values() for items in menus.values())
+            scrapeMetrics.progress(f"{item_count} menu items, {len(dishes)} distinct dishes")
+            menus = menus_by_date[menu_date]
+            
             # Save dining hall locations
-            df = pd.DataFrame(dining_locations)
-            df.to_csv(locations_csv_path, index=False, quoting=csv.QUOTE_ALL)
+            with scrapeMetrics.stage('write', file=locations_csv_path):
+                df = pd.DataFrame(dining_locations)
+                df.to_csv(locations_csv_path, index=False, quoting=csv.QUOTE_ALL)
             print(f"Dining hall locations saved to {locations_csv_path}")
             
-            # Get and save breakfast items
-            breakfast_items = get_menu_for_locations(dining_locations, 'breakfast')
-            breakfast_df = pd.DataFrame(breakfast_items)
-            breakfast_df.to_csv(breakfast_items_csv_path, index=False, quoting=csv.QUOTE_ALL)
-            print(f"Breakfast items saved to {breakfast_items_csv_path}")
+            # Save the items for each meal to its own CSV
+            for meal_type in MEAL_TYPES:
+                items_csv_path = os.path.join(output_dir, f"dining_hall_{meal_type}_items.csv")
+                with scrapeMetrics.stage('write', file=items_csv_path):
+                    items_df = pd.DataFrame(menus[meal_type], columns=MENU_ITEM_COLUMNS)
+                    items_df.to_csv(items_csv_path, index=False, quoting=csv.QUOTE_ALL)
+                print(f"{meal_type.capitalize()} items saved to {items_csv_path}")
+            
+            # Keep the history of every run in the menu database
+            conn = menuStore.connect(os.path.join(output_dir, "dining_hall_menus.db"))
+            try:
+                menuStore.upsert_locations(conn, dining_locations)
+                for stored_date, stored_menus in menus_by_date.items():
+                    for meal_type in MEAL_TYPES:
+                        with scrapeMetrics.stage('write', file='dining_hall_menus.db', meal=meal_type, date=stored_date):
+                            count = menuStore.upsert_menu_items(conn, stored_menus[meal_type], meal_type, stored_date)
+                        scrapeMetrics.progress(f"Stored {count} {meal_type} items for {stored_date}")
+            finally:
+                conn.close()
             
-            # Get and save lunch items
-            lunch_items = get_menu_for_locations(dining_locations, 'lunch')
-            lunch_df = pd.DataFrame(lunch_items)
-            lunch_df.to_csv(lunch_items_csv_path, index=False, quoting=csv.QUOTE_ALL)
-            print(f"Lunch items saved to {lunch_items_csv_path}")
+            # Nutrition details: stored from the API menus, or taken from earlier
+            # API runs for browser-scraped menus, which show none
+            cache = nutritionCache.NutritionCache(os.path.join(output_dir, "nutrition_cache.db"))
+            try:
+                # Every dish of every scraped day, keyed by (date, meal) so all are looked up
+                all_menus = {(stored_date, meal_type): items
+                             for stored_date, stored_menus in menus_by_date.items()
+                             for meal_type, items in stored_menus.items()}
+                details, stats = nutritionCache.update_nutrition(cache, all_menus, foods)
+                print(f"Nutrition for {stats['dishes']} dishes: {stats['stored']} from the menus, "
+                      f"{stats['cached']} cached, {stats['unavailable']} unavailable")
+                
+                nutrition_csv_path = os.path.join(output_dir, "dining_hall_nutrition.csv")
+                nutrition_df = pd.DataFrame(sorted(details.values(), key=lambda record: record['item_name']),
+                                            columns=nutritionCache.COLUMNS)
+                with scrapeMetrics.stage('write', file=nutrition_csv_path):
+                    nutrition_df.to_csv(nutrition_csv_path, index=False, quoting=csv.QUOTE_ALL)
+                print(f"Nutrition details saved to {nutrition_csv_path}")
+                
+                # Drop details older than max_age; the API just refreshed those of the dishes it listed
+                print(f"Evicted {cache.evict_stale()} stale dishes from the nutrition cache")
+            finally:
+                cache.close()
             
-            # Get and save dinner items
-            dinner_items = get_menu_for_locations(dining_locations, 'dinner')
-            dinner_df = pd.DataFrame(dinner_items)
-            dinner_df.to_csv(dinner_items_csv_path, index=False, quoting=csv.QUOTE_ALL)
-            print(f"Dinner items saved to {dinner_items_csv_path}")
+            # Refresh the search snapshot the app loads at startup
+            with scrapeMetrics.stage('write', file='search_snapshot.pkl'):
+                searchIndex.update_snapshot(menu_csvs={
+                    meal_type: os.path.join(output_dir, f"dining_hall_{meal_type}_items.csv") for meal_type in MEAL_TYPES
+                }, snapshot_path=snapshot_path)
         else:
             print("No dining locations found!")
+        
+        if page_cache is not None:
+            print(f"Page cache: {page_cache.stats()}")
     
     except Exception as e:
         print(f"An error occurred: {e}")
     
     finally:
-        driver.quit()
\ No newline at end of file
+        if driver is not None:
+            driver.quit()
+
+# Main function
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape dining hall locations and menus to CSV")
+    parser.add_argument('--source', choices=['api', 'browser'], default='api',
+                        help="api: Nutrislice JSON API, falling back to the browser on failure; browser: Selenium only")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Number of menu pages fetched at once (1 = sequential)")
+    parser.add_argument('--days', type=int, default=1,
+                        help="Number of days of menus to scrape, starting today")
+    parser.add_argument('--api-url', default=nutrisliceClient.api_url,
+                        help="Base URL of the Nutrislice API (e.g. a local stand-in server)")
+    parser.add_argument('--output-dir', default=script_dir, help="Directory the CSVs and databases are written to")
+    parser.add_argument('--snapshot', default=searchIndex.DEFAULT_SNAPSHOT_PATH, help="Search snapshot to refresh")
+    fetchCache.add_cache_arguments(parser)
+    scrapeMetrics.add_metrics_arguments(parser)
+    browserDriver.add_driver_arguments(parser)
+    args = parser.parse_args()
+    scrapeMetrics.enable_from_args(args)
+    browserDriver.configure_from_args(args)
+    nutrisliceClient.api_url = args.api_url
+    try:
+        main(args.source, args.workers, args.days, fetchCache.cache_from_args(args), args.output_dir, args.snapshot)
+    finally:
+        scrapeMetrics.finish()
@@ -0,0 +1,321 @@
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+import dietTraits
+
+# SQLite history of every scraped menu, next to the per-meal CSVs that only hold
+# the latest run. Rows are keyed by (date, location, meal, item), so lookups for
+# one hall's menu on a given day and "how often does this dish appear" are index
+# queries no matter how many months of menus are stored. Each distinct dish
+# (name, calories, traits) is stored once in dishes and menus refer to it, so
+# the same dish served every day of a week adds a small row per day, not a copy.
+# Dishes also keep their traits as a dietTraits bitmask, for filtering by diet.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(script_dir, "dining_hall_menus.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS locations (
+    name TEXT PRIMARY KEY,
+    link TEXT,
+    address TEXT,
+    dates_of_operation TEXT,
+    breakfast_hours TEXT,
+    lunch_hours TEXT,
+    dinner_hours TEXT,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dishes (
+    dish_id INTEGER PRIMARY KEY,
+    item_name TEXT NOT NULL,
+    calories TEXT NOT NULL,
+    dietary_traits TEXT NOT NULL,
+    trait_mask INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (item_name, calories, dietary_traits)
+);
+
+CREATE TABLE IF NOT EXISTS menu_items (
+    menu_date TEXT NOT NULL,
+    location_name TEXT NOT NULL,
+    meal TEXT NOT NULL,
+    dish_id INTEGER NOT NULL REFERENCES dishes (dish_id),
+    scraped_at TEXT NOT NULL,
+    PRIMARY KEY (menu_date, location_name, meal, dish_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_menu_items_location_date ON menu_items (location_name, menu_date, meal);
+CREATE INDEX IF NOT EXISTS idx_menu_items_dish_date ON menu_items (dish_id, menu_date);
+"""
+
+SCHEMA_VERSION = 2
+
+# Databases written before dishes were split out kept the dish columns in menu_items
+MIGRATE_FROM_V0 = f"""
+BEGIN;
+DROP INDEX IF EXISTS idx_menu_items_location_date;
+DROP INDEX IF EXISTS idx_menu_items_item_date;
+ALTER TABLE menu_items RENAME TO menu_items_v0;
+{SCHEMA}
+INSERT OR IGNORE INTO dishes (item_name, calories, dietary_traits)
+    SELECT DISTINCT item_name, COALESCE(calories, 'N/A'), COALESCE(dietary_traits, '') FROM menu_items_v0;
+INSERT OR IGNORE INTO menu_items (menu_date, location_name, meal, dish_id, scraped_at)
+    SELECT old.menu_date, old.location_name, old.meal, dishes.dish_id, old.scraped_at
+    FROM menu_items_v0 AS old
+    JOIN dishes ON dishes.item_name = old.item_name
+               AND dishes.calories = COALESCE(old.calories, 'N/A')
+               AND dishes.dietary_traits = COALESCE(old.dietary_traits, '');
+DROP TABLE menu_items_v0;
+PRAGMA user_version = 1;
+COMMIT;
+"""
+
+
+def connect(path=DEFAULT_DB_PATH):
+    """
+    Open the menu database, creating the tables and indexes if needed.
+    """
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    # WAL lets readers query while a scrape is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    columns = [row['name'] for row in conn.execute("PRAGMA table_info(menu_items)")]
+    if 'item_name' in columns:
+        conn.executescript(MIGRATE_FROM_V0)
+    else:
+        conn.executescript(SCHEMA)
+    if version < 2:
+        # Version 1 databases have no trait masks yet
+        dish_columns = [row['name'] for row in conn.execute("PRAGMA table_info(dishes)")]
+        with conn:
+            if 'trait_mask' not in dish_columns:
+                conn.execute("ALTER TABLE dishes ADD COLUMN trait_mask INTEGER NOT NULL DEFAULT 0")
+            traits = [row[0] for row in conn.execute("SELECT DISTINCT dietary_traits FROM dishes")]
+            conn.executemany("UPDATE dishes SET trait_mask = ? WHERE dietary_traits = ?",
+                             [(dietTraits.trait_mask(text), text) for text in traits])
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def upsert_locations(conn, locations):
+    """
+    Insert or update dining locations as returned by get_dining_locations.
+    """
+    now = datetime.now().isoformat(timespec='seconds')
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO locations (name, link, address, dates_of_operation,
+                                   breakfast_hours, lunch_hours, dinner_hours, updated_at)
+            VALUES (:name, :link, :address, :dates_of_operation,
+                    :breakfast_hours, :lunch_hours, :dinner_hours, :updated_at)
+            ON CONFLICT (name) DO UPDATE SET
+                link = excluded.link,
+                address = excluded.address,
+                dates_of_operation = excluded.dates_of_operation,
+                breakfast_hours = excluded.breakfast_hours,
+                lunch_hours = excluded.lunch_hours,
+                dinner_hours = excluded.dinner_hours,
+                updated_at = excluded.updated_at
+            """,
+            [dict(location, updated_at=now) for location in locations]
+        )
+
+
+def upsert_menu_items(conn, items, meal_type, menu_date):
+    """
+    Store the menu items of one meal and date in bulk.
+
+    Every (location, meal, date) menu present in items replaces what was stored
+    for it before, so dishes dropped from a menu on a re-scrape do not linger.
+    Menus of locations missing from items (e.g. a failed page) are kept.
+
+    Args:
+    conn (Connection): Database connection from connect()
+    items (list of dict): Menu items as built by extract_menu_items
+    meal_type (str): Type of meal (breakfast/lunch/dinner)
+    menu_date (str): Date in YYYY-MM-DD format
+
+    Returns:
+    int: Number of rows written
+    """
+    now = datetime.now().isoformat(timespec='seconds')
+    # The same dish listed twice on one menu is stored once; dishes that only
+    # share a name (e.g. two sizes of one soup) are different dishes
+    rows = {
+        (item['location_name'], item['item_name'], str(item.get('calories', 'N/A')),
+         item.get('dietary_traits', '') or '')
+        for item in items
+    }
+
+    with conn:
+        # Stage the menu, then resolve every dish id with one join instead of a
+        # lookup per dish
+        conn.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS staged_menu_items (
+                location_name TEXT, item_name TEXT, calories TEXT, dietary_traits TEXT, trait_mask INTEGER
+            )
+            """
+        )
+        conn.execute("DELETE FROM staged_menu_items")
+        conn.executemany(
+            "INSERT INTO staged_menu_items VALUES (?, ?, ?, ?, ?)",
+            [row + (dietTraits.trait_mask(row[3]),) for row in rows]
+        )
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO dishes (item_name, calories, dietary_traits, trait_mask)
+            SELECT DISTINCT item_name, calories, dietary_traits, trait_mask FROM staged_menu_items
+            """
+        )
+        conn.execute(
+            """
+            DELETE FROM menu_items
+            WHERE menu_date = ? AND meal = ? AND location_name IN (SELECT location_name FROM staged_menu_items)
+            """,
+            (menu_date, meal_type)
+        )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO menu_items (menu_date, location_name, meal, dish_id, scraped_at)
+            SELECT ?, staged_menu_items.location_name, ?, dishes.dish_id, ?
+            FROM staged_menu_items JOIN dishes USING (item_name, calories, dietary_traits)
+            """,
+            (menu_date, meal_type, now)
+        )
+        conn.execute("DELETE FROM staged_menu_items")
+    return len(rows)
+
+
+def get_menu(conn, location_name, meal_type, menu_date):
+    """
+    Get one location's menu for a meal and date, e.g. dinner at Four Lakes Market.
+
+    Returns:
+    list of dict: Menu items with the same keys extract_menu_items builds
+    """
+    cursor = conn.execute(
+        """
+        SELECT menu_items.location_name, dishes.item_name, dishes.calories, dishes.dietary_traits,
+               dishes.trait_mask
+        FROM menu_items JOIN dishes USING (dish_id)
+        WHERE menu_items.menu_date = ? AND menu_items.location_name = ? AND menu_items.meal = ?
+        ORDER BY dishes.item_name
+        """,
+        (menu_date, location_name, meal_type)
+    )
+    return [dict(row) for row in cursor]
+
+
+def get_day(conn, menu_date):
+    """
+    Every location's menus for one date, e.g. to build a dietTraits.DayMenu.
+
+    Returns:
+    list of dict: location_name, meal, item_name, calories, dietary_traits and
+    trait_mask of every dish served
+    """
+    cursor = conn.execute(
+        """
+        SELECT menu_items.location_name, menu_items.meal, dishes.item_name, dishes.calories,
+               dishes.dietary_traits, dishes.trait_mask
+        FROM menu_items JOIN dishes USING (dish_id)
+        WHERE menu_items.menu_date = ?
+        ORDER BY menu_items.location_name, menu_items.meal, dishes.item_name
+        """,
+        (menu_date,)
+    )
+    return [dict(row) for row in cursor]
+
+
+def get_item_history(conn, item_name, start_date=None, end_date=None):
+    """
+    How often a dish appeared, per location and meal, between two dates.
+
+    Returns:
+    list of dict: location_name, meal, days (number of dates it was served),
+    first_seen and last_seen
+    """
+    cursor = conn.execute(
+        """
+        SELECT location_name, meal, COUNT(DISTINCT menu_date) AS days,
+               MIN(menu_date) AS first_seen, MAX(menu_date) AS last_seen
+        FROM menu_items
+        WHERE dish_id IN (SELECT dish_id FROM dishes WHERE item_name = ?)
+          AND menu_date BETWEEN ? AND ?
+        GROUP BY location_name, meal
+        ORDER BY days DESC, location_name, meal
+        """,
+        (item_name, start_date or '0000-00-00', end_date or '9999-99-99')
+    )
+    return [dict(row) for row in cursor]
+
+
+def export_parquet(conn, path, start_date=None, end_date=None):
+    """
+    Export menu history to a Parquet file for analytics (needs pyarrow or
+    fastparquet installed).
+
+    Returns:
+    int: Number of rows exported
+    """
+    df = pd.read_sql_query(
+        """
+        SELECT menu_items.menu_date, menu_items.location_name, menu_items.meal,
+               dishes.item_name, dishes.calories, dishes.dietary_traits, dishes.trait_mask,
+               menu_items.scraped_at
+        FROM menu_items JOIN dishes USING (dish_id)
+        WHERE menu_items.menu_date BETWEEN ? AND ?
+        ORDER BY menu_items.menu_date, menu_items.location_name, menu_items.meal, dishes.item_name
+        """,
+        conn,
+        params=(start_date or '0000-00-00', end_date or '9999-99-99')
+    )
+    df['menu_date'] = pd.to_datetime(df['menu_date'])
+    df['calories'] = pd.to_numeric(df['calories'], errors='coerce').astype('Int64')
+    df['trait_mask'] = df['trait_mask'].astype('uint32')
+    for column in ['location_name', 'meal']:
+        df[column] = df[column].astype('category')
+    df.to_parquet(path, index=False)
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the dining hall menu history")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    menu_parser = subparsers.add_parser('menu', help="Show one location's menu")
+    menu_parser.add_argument('location')
+    menu_parser.add_argument('meal', choices=['breakfast', 'lunch', 'dinner'])
+    menu_parser.add_argument('date', help="YYYY-MM-DD")
+    history_parser = subparsers.add_parser('history', help="Show how often a dish appears")
+    history_parser.add_argument('item')
+    history_parser.add_argument('--start', default=None, help="YYYY-MM-DD")
+    history_parser.add_argument('--end', default=None, help="YYYY-MM-DD")
+    export_parser = subparsers.add_parser('export', help="Export the history to Parquet")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--start', default=None, help="YYYY-MM-DD")
+    export_parser.add_argument('--end', default=None, help="YYYY-MM-DD")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    try:
+        if args.command == 'menu':
+            for item in get_menu(conn, args.location, args.meal, args.date):
+                print(f"{item['item_name']} ({item['calories']} cal) {item['dietary_traits']}")
+        elif args.command == 'history':
+            for row in get_item_history(conn, args.item, args.start, args.end):
+                print(f"{row['location_name']} {row['meal']}: {row['days']} days "
+                      f"({row['first_seen']} to {row['last_seen']})")
+        else:
+            count = export_parquet(conn, args.path, args.start, args.end)
+            print(f"Exported {count} rows to {args.path}")
+    finally:
+        conn.close()
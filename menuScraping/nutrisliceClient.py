@@ -0,0 +1,297 @@
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import nutritionCache
+
+# Modules shared by the scrapers live in ../shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import fetchCache
+import scrapeMetrics
+
+# The menu site at base_url is a front end for this JSON API, so everything the
+# browser scraper reads from the rendered page can be pulled from here directly
+base_url = "https://wisc-housingdining.nutrislice.com/"
+api_url = "https://wisc-housingdining.api.nutrislice.com/menu/api/"
+
+# Keys the menu-type entries of the schools endpoint may carry a readable hours string in
+HOURS_KEYS = ('formatted_hours', 'hours_text', 'hours')
+
+TRAIT_PATTERN = re.compile(r'Food_Trait_Icons_([^-]+)')
+
+
+def create_session(pool_size=8, retries=3, page_cache=None):
+    """
+    Create a requests session with a connection pool sized for pool_size
+    concurrent requests and retries with backoff on transient errors. GET
+    requests go through page_cache (a fetchCache.PageCache) if one is given.
+    """
+    session = fetchCache.CachedSession(page_cache)
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'Accept': 'application/json'})
+    return session
+
+
+def get_json(session, path, timeout=10):
+    with scrapeMetrics.stage('fetch', url=f"{api_url}{path}"):
+        response = session.get(f"{api_url}{path}", timeout=timeout)
+    # Retries made by the session's Retry policy (cached responses have no raw)
+    retries = getattr(response.raw, 'retries', None)
+    if retries is not None and retries.history:
+        scrapeMetrics.count('http_retries', len(retries.history))
+    response.raise_for_status()
+    with scrapeMetrics.stage('parse', url=f"{api_url}{path}"):
+        return response.json()
+
+
+def location_slug(location):
+    # The menu link looks like https://.../menu/<slug>
+    return location['link'].rstrip('/').rsplit('/', 1)[-1]
+
+
+def get_dining_locations(session):
+    """
+    Get all dining locations from the schools endpoint.
+
+    Returns:
+    list of dict: Locations with the same keys get_dining_locations in
+    menuScrape.py produces (name, link, address, dates_of_operation and
+    breakfast/lunch/dinner hours)
+    """
+    locations = []
+    for school in get_json(session, 'schools/'):
+        name = (school.get('name') or '').strip()
+        slug = school.get('slug')
+        if not name or not slug:
+            continue
+
+        hours = {'breakfast_hours': '', 'lunch_hours': '', 'dinner_hours': ''}
+        for menu_type in school.get('active_menu_types') or []:
+            key = f"{menu_type.get('slug', '')}_hours"
+            if key in hours:
+                hours[key] = next((str(menu_type[k]).strip() for k in HOURS_KEYS if menu_type.get(k)), '')
+
+        locations.append({
+            'name': name,
+            'link': f"{base_url}menu/{slug}",
+            'address': (school.get('address') or '').strip(),
+            'dates_of_operation': (school.get('dates_of_operation') or '').strip(),
+            'breakfast_hours': hours['breakfast_hours'],
+            'lunch_hours': hours['lunch_hours'],
+            'dinner_hours': hours['dinner_hours']
+        })
+
+    if not locations:
+        raise Exception("No locations found")
+
+    return locations
+
+
+def get_week(session, location, meal_type, menu_date):
+    """
+    Get the week of menus containing menu_date for one location and meal.
+
+    Returns:
+    dict: date (YYYY-MM-DD) -> list of raw menu item dicts for that day
+    """
+    date = datetime.strptime(menu_date, '%Y-%m-%d')
+    path = f"weeks/school/{location_slug(location)}/menu-type/{meal_type}/{date:%Y/%m/%d}/"
+    week = get_json(session, path)
+    return {day['date']: day.get('menu_items') or [] for day in week.get('days', [])}
+
+
+def trait_from_icon(icon):
+    # Icons point at the same Food_Trait_Icons_<trait>-... images the web page
+    # uses as backgrounds, so the trait names match what extract_menu_items reads
+    for key in ('custom_icon_url', 'icon_url', 'image'):
+        trait_match = TRAIT_PATTERN.search(str(icon.get(key) or ''))
+        if trait_match:
+            return trait_match.group(1)
+    return icon.get('slug') or icon.get('name') or ''
+
+
+def format_calories(calories):
+    """
+    Format calories like clean_calories does: the integer value as a string,
+    or 'N/A' if it is missing
+    """
+    if calories is None:
+        return 'N/A'
+    try:
+        return str(int(round(float(calories))))
+    except (TypeError, ValueError):
+        return 'N/A'
+
+
+def nutrition_from_food(food):
+    """
+    Nutrition facts and ingredients of a raw food object.
+
+    Returns:
+    dict: food_id, calories, protein_g, carbs_g, fat_g and ingredients
+    """
+    nutrition = food.get('rounded_nutrition_info') or {}
+    return {
+        'food_id': food.get('id'),
+        'calories': nutrition.get('calories'),
+        'protein_g': nutrition.get('g_protein'),
+        'carbs_g': nutrition.get('g_carbs'),
+        'fat_g': nutrition.get('g_fat'),
+        'ingredients': (food.get('ingredients') or '').strip()
+    }
+
+
+def build_menu_items(menu_items, location_name, foods=None, dishes=None):
+    """
+    Turn the raw menu items of one day into the dicts extract_menu_items builds.
+
+    Args:
+    menu_items (list): Raw menu items from the API
+    location_name (str): Name of the dining location
+    foods (dict): If given, filled with nutritionCache.item_identity -> nutrition
+    details of every food (see nutrition_from_food)
+    dishes (DishPool): If given, items share one record per distinct dish
+
+    Returns:
+    list of dict: List of menu items with details
+    """
+    items = []
+    for menu_item in menu_items:
+        food = menu_item.get('food')
+        # Section titles ("Entrees", "Grill", ...) have no food attached
+        if menu_item.get('is_section_title') or not food:
+            continue
+
+        nutrition = food.get('rounded_nutrition_info') or {}
+        icons = (food.get('icons') or {}).get('food_icons') or []
+        traits = [trait for trait in (trait_from_icon(icon) for icon in icons) if trait]
+
+        item_name = (food.get('name') or 'Unknown').strip()
+        if foods is not None:
+            identity = nutritionCache.item_identity(item_name, food.get('id'))
+            if identity not in foods:
+                foods[identity] = nutrition_from_food(food)
+
+        dish = {
+            'item_name': item_name,
+            'calories': format_calories(nutrition.get('calories')),
+            'dietary_traits': ', '.join(traits) if traits else '',
+            # Tells apart dishes that share a name; not written to the CSVs
+            'food_id': food.get('id')
+        }
+        if dishes is not None:
+            items.append(dishes.item(location_name, dish))
+        else:
+            items.append({'location_name': location_name, **dish})
+    return items
+
+
+def get_menu_items(session, location, meal_type, menu_date, foods=None, dishes=None):
+    """
+    Get the menu items of one location, meal and date.
+
+    Returns:
+    list of dict: List of menu items with details
+    """
+    days = get_week(session, location, meal_type, menu_date)
+    return build_menu_items(days.get(menu_date, []), location['name'], foods, dishes)
+
+
+def get_menus(session, locations, meal_types, menu_date=None, max_in_flight=8, foods=None, dishes=None):
+    """
+    Get the menus of every location and meal for one date, fetching
+    (location, meal) pairs concurrently over the shared session. If foods is
+    given it is filled with nutritionCache.item_identity -> nutrition details;
+    if dishes (a DishPool) is given the items share one record per distinct dish.
+
+    Returns:
+    dict: meal_type -> list of menu items, in location order
+    """
+    if menu_date is None:
+        menu_date = datetime.now().strftime('%Y-%m-%d')
+
+    jobs = [(location, meal_type) for meal_type in meal_types for location in locations]
+    menus = {meal_type: [] for meal_type in meal_types}
+    failures = 0
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = [executor.submit(get_menu_items, session, location, meal_type, menu_date, foods, dishes)
+                   for location, meal_type in jobs]
+        for (location, meal_type), future in zip(jobs, futures):
+            try:
+                menu_items = future.result()
+                menus[meal_type].extend(menu_items)
+                scrapeMetrics.progress(f"Added {len(menu_items)} {meal_type} items for {location['name']}")
+            except Exception as e:
+                print(f"Error getting {meal_type} menu for {location['name']}: {e}")
+                scrapeMetrics.count('menu_request_errors')
+                failures += 1
+
+    # Let the caller fall back to the browser scraper if the API is unusable
+    if jobs and failures == len(jobs):
+        raise Exception("Every menu request to the Nutrislice API failed")
+
+    return menus
+
+
+def get_menu_items_for_dates(session, location, meal_type, menu_dates, foods=None, dishes=None):
+    """
+    Get the menu items of one location and meal for several dates. Each request
+    returns a whole week, so a 7-day window costs one or two requests.
+
+    Returns:
+    dict: date (YYYY-MM-DD) -> list of menu items
+    """
+    pending = sorted(set(menu_dates))
+    by_date = {}
+    while pending:
+        days = get_week(session, location, meal_type, pending[0])
+        for menu_date in pending:
+            if menu_date in days:
+                by_date[menu_date] = build_menu_items(days[menu_date], location['name'], foods, dishes)
+        # A date the week did not cover has no menu; don't ask for it again
+        by_date.setdefault(pending[0], [])
+        pending = [menu_date for menu_date in pending if menu_date not in by_date]
+    return by_date
+
+
+def get_menus_for_dates(session, locations, meal_types, menu_dates, max_in_flight=8, foods=None, dishes=None):
+    """
+    Get the menus of every location and meal for several dates in one run,
+    fetching (location, meal) pairs concurrently over the shared session.
+    foods and dishes are passed on as for get_menus.
+
+    Returns:
+    dict: date -> meal_type -> list of menu items, in location order
+    """
+    jobs = [(location, meal_type) for meal_type in meal_types for location in locations]
+    menus = {menu_date: {meal_type: [] for meal_type in meal_types} for menu_date in menu_dates}
+    failures = 0
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = [executor.submit(get_menu_items_for_dates, session, location, meal_type, menu_dates, foods,
+                                   dishes)
+                   for location, meal_type in jobs]
+        for (location, meal_type), future in zip(jobs, futures):
+            try:
+                for menu_date, menu_items in future.result().items():
+                    menus[menu_date][meal_type].extend(menu_items)
+                    scrapeMetrics.progress(f"Added {len(menu_items)} {meal_type} items for {location['name']} on {menu_date}")
+            except Exception as e:
+                print(f"Error getting {meal_type} menus for {location['name']}: {e}")
+                scrapeMetrics.count('menu_request_errors')
+                failures += 1
+
+    # Let the caller fall back to the browser scraper if the API is unusable
+    if jobs and failures == len(jobs):
+        raise Exception("Every menu request to the Nutrislice API failed")
+
+    return menus
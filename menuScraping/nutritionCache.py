@@ -0,0 +1,198 @@
+import argparse
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta
+
+# Nutrition facts (protein, carbs, fat) and ingredients per dish. The Nutrislice
+# API sends them with every menu, so an API run needs no extra requests for
+# them; this cache keeps them so runs that scrape the menu pages in a browser,
+# which show no nutrition, can still fill them in from earlier API runs. Dishes
+# are keyed by their Nutrislice food id, so two dishes that share a name keep
+# their own facts; items without an id (browser runs) are matched by name, to the
+# most recently stored dish of that name. Details older than max_age are dropped.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.path.join(script_dir, "nutrition_cache.db")
+
+# Details older than this are not used, and are deleted by evict_stale
+DEFAULT_MAX_AGE = timedelta(days=30)
+
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nutrition (
+    identity TEXT PRIMARY KEY,
+    item_name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    food_id INTEGER,
+    calories REAL,
+    protein_g REAL,
+    carbs_g REAL,
+    fat_g REAL,
+    ingredients TEXT,
+    fetched_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_nutrition_fetched_at ON nutrition (fetched_at);
+CREATE INDEX IF NOT EXISTS idx_nutrition_name_key ON nutrition (name_key, fetched_at);
+"""
+
+COLUMNS = ['identity', 'item_name', 'name_key', 'food_id', 'calories', 'protein_g', 'carbs_g', 'fat_g',
+           'ingredients', 'fetched_at']
+
+
+def name_key(item_name):
+    """
+    A dish name lowercased with punctuation and spacing normalized, so
+    "Tuna Salad" and "tuna  salad" match across the API and browser output.
+    """
+    return NON_WORD_PATTERN.sub(' ', str(item_name).lower()).strip()
+
+
+def item_identity(item_name, food_id=None):
+    """
+    Cache key of a dish: its Nutrislice food id, or its normalized name when
+    there is no id.
+    """
+    if food_id is not None and food_id == food_id and str(food_id) != '':
+        return f"food:{int(food_id)}"
+    return f"name:{name_key(item_name)}"
+
+
+class NutritionCache:
+    """
+    Persistent SQLite cache of dish details with refresh-by-age.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_age=DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        columns = [row['name'] for row in self.conn.execute("PRAGMA table_info(nutrition)")]
+        if columns and 'name_key' not in columns:
+            # Caches from before food ids were used are keyed by name only;
+            # everything in them comes back with the next API run
+            self.conn.execute("DROP TABLE nutrition")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _select_fresh(self, column, keys, now):
+        cutoff = ((now or datetime.now()) - self.max_age).isoformat(timespec='seconds')
+        keys = list(keys)
+        rows = []
+        # Stay below SQLite's limit on query parameters
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            rows.extend(dict(row) for row in self.conn.execute(
+                f"SELECT * FROM nutrition WHERE {column} IN ({placeholders}) AND fetched_at >= ? "
+                f"ORDER BY fetched_at",
+                chunk + [cutoff]
+            ))
+        return rows
+
+    def get_fresh(self, identities, now=None):
+        """
+        Cached details for the given identities that are younger than max_age.
+
+        Returns:
+        dict: identity -> details dict
+        """
+        return {row['identity']: row for row in self._select_fresh('identity', identities, now)}
+
+    def get_fresh_by_name(self, name_keys, now=None):
+        """
+        Cached details younger than max_age for the given normalized names; where
+        several dishes share a name, the most recently stored one.
+
+        Returns:
+        dict: name key -> details dict
+        """
+        return {row['name_key']: row for row in self._select_fresh('name_key', name_keys, now)}
+
+    def put_many(self, records):
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO nutrition ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join(':' + column for column in COLUMNS)})",
+                records
+            )
+
+    def evict_stale(self, now=None):
+        """
+        Delete details older than max_age.
+
+        Returns:
+        int: Number of rows deleted
+        """
+        cutoff = ((now or datetime.now()) - self.max_age).isoformat(timespec='seconds')
+        with self.conn:
+            return self.conn.execute("DELETE FROM nutrition WHERE fetched_at < ?", (cutoff,)).rowcount
+
+
+def update_nutrition(cache, menus, foods):
+    """
+    Store the details the menus came with for dishes the cache has no fresh
+    details of, and look up the rest in the cache.
+
+    Args:
+    cache (NutritionCache): Cache to read from and store new details in
+    menus (dict): meal_type -> list of menu item dicts; API items carry a food_id
+    foods (dict): identity (see item_identity) -> details dict with food_id,
+    calories, protein_g, carbs_g, fat_g and ingredients, for the dishes whose
+    details came with the menus; empty for browser runs
+
+    Returns:
+    tuple: (dict of identity -> details, stats dict with dishes, stored,
+    cached and unavailable counts)
+    """
+    # One representative item name per dish
+    names = {}
+    for items in menus.values():
+        for item in items:
+            names.setdefault(item_identity(item['item_name'], item.get('food_id')), item['item_name'])
+
+    # Dishes cached recently keep their details; only new and stale ones are stored
+    details = cache.get_fresh(names)
+    now = datetime.now().isoformat(timespec='seconds')
+    records = []
+    for identity, item_name in names.items():
+        fetched = foods.get(identity)
+        if fetched is not None and identity not in details:
+            record = dict(fetched, identity=identity, item_name=item_name, name_key=name_key(item_name),
+                          fetched_at=now)
+            records.append({column: record.get(column) for column in COLUMNS})
+    cache.put_many(records)
+    details.update((record['identity'], record) for record in records)
+
+    # Dishes without an id that nothing was found for: the latest dish of that name
+    missing = [identity for identity in names if identity not in details and identity.startswith('name:')]
+    by_name = cache.get_fresh_by_name(name_key(names[identity]) for identity in missing)
+    for identity in missing:
+        if name_key(names[identity]) in by_name:
+            details[identity] = by_name[name_key(names[identity])]
+
+    stats = {
+        'dishes': len(names),
+        'stored': len(records),
+        'cached': len(details) - len(records),
+        'unavailable': len(names) - len(details)
+    }
+    return details, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the dish nutrition cache")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help="Nutrition cache file")
+    parser.add_argument('--max-age-days', type=float, default=DEFAULT_MAX_AGE.days,
+                        help="Delete details older than this many days")
+    args = parser.parse_args()
+
+    cache = NutritionCache(args.cache, timedelta(days=args.max_age_days))
+    try:
+        print(f"Evicted {cache.evict_stale()} stale dishes from {args.cache}")
+    finally:
+        cache.close()
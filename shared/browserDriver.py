@@ -0,0 +1,247 @@
+import json
+import os
+import shutil
+import threading
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.service import Service
+
+# Chrome for the scrapers that need a real browser. Browsers are only started
+# when a page has to be rendered (see LazyDriver), run headless with images,
+# fonts and media turned off, and use a chromedriver binary that is resolved
+# once and pinned:
+#
+# 1. --chromedriver / $CHROMEDRIVER, if given
+# 2. the binary recorded in PIN_FILE by an earlier run
+# 3. chromedriver on the PATH
+# 4. a download by webdriver_manager, recorded in PIN_FILE for later runs
+#
+# Only the last step touches the network. If Chrome was upgraded and no longer
+# works with the pinned binary, the pin is dropped and the driver resolved again.
+
+PIN_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'badger-scrapers', 'chromedriver.json')
+
+# Requests for these are blocked; the scrapers only read the DOM, and image
+# URLs stay in the src and style attributes they are read from
+BLOCKED_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+                '*.woff', '*.woff2', '*.ttf', '*.otf', '*.mp4', '*.webm', '*.mp3']
+
+# Settings for every browser started by create_driver, changed with configure()
+_settings = {
+    'headless': True,
+    'load_images': False,
+    'driver_path': os.environ.get('CHROMEDRIVER'),
+    'driver_version': None,
+    'page_load_strategy': 'eager'
+}
+_driver_path = None
+_lock = threading.Lock()
+
+
+def configure(**settings):
+    """
+    Change the settings of browsers started from now on, e.g.
+    configure(headless=False) to watch the scrapers work.
+    """
+    global _driver_path
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown browser settings: {', '.join(sorted(unknown))}")
+    with _lock:
+        if 'driver_path' in settings or 'driver_version' in settings:
+            _driver_path = None
+        _settings.update(settings)
+
+
+def _read_pin():
+    try:
+        with open(PIN_FILE, encoding='utf-8') as f:
+            pin = json.load(f)
+    except (OSError, ValueError):
+        return None
+    path = pin.get('path')
+    if not path or not os.access(path, os.X_OK):
+        return None
+    if _settings['driver_version'] and pin.get('version') != _settings['driver_version']:
+        return None
+    return path
+
+
+def _write_pin(path, version):
+    os.makedirs(os.path.dirname(PIN_FILE), exist_ok=True)
+    tmp_path = f"{PIN_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'path': path, 'version': version}, f)
+    os.replace(tmp_path, PIN_FILE)
+
+
+def _resolve_driver_path():
+    if _settings['driver_path']:
+        return _settings['driver_path']
+    path = _read_pin() or shutil.which('chromedriver')
+    if path:
+        return path
+
+    # Only needed when there is no chromedriver yet, so imported here
+    from webdriver_manager.chrome import ChromeDriverManager
+    manager = ChromeDriverManager(driver_version=_settings['driver_version'])
+    path = manager.install()
+    _write_pin(path, _settings['driver_version'] or os.path.basename(os.path.dirname(os.path.dirname(path))))
+    print(f"Pinned chromedriver {path}")
+    return path
+
+
+def driver_path():
+    """
+    Path of the chromedriver binary, resolved once per process.
+    """
+    global _driver_path
+    with _lock:
+        if _driver_path is None:
+            _driver_path = _resolve_driver_path()
+        return _driver_path
+
+
+def _drop_pin(path):
+    # Forget a pinned binary that no longer starts a session
+    global _driver_path
+    with _lock:
+        if _driver_path == path:
+            _driver_path = None
+        if _read_pin() == path:
+            try:
+                os.remove(PIN_FILE)
+            except FileNotFoundError:
+                pass
+
+
+def chrome_options(headless=None, load_images=None):
+    """
+    Options for a scraping browser.
+
+    Args:
+    headless (bool): Run without a window; defaults to the configured setting
+    load_images (bool): Load images; defaults to the configured setting
+
+    Returns:
+    ChromeOptions
+    """
+    headless = _settings['headless'] if headless is None else headless
+    load_images = _settings['load_images'] if load_images is None else load_images
+
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless=new')
+        # The listing pages lay out differently in the default 800x600 window
+        options.add_argument('--window-size=1366,900')
+    else:
+        options.add_argument('--start-maximized')
+    for argument in ['--disable-gpu', '--disable-extensions', '--disable-infobars', '--disable-dev-shm-usage',
+                     '--no-first-run', '--no-default-browser-check', '--mute-audio', '--disable-sync',
+                     '--disable-background-networking', '--disable-component-update', '--disable-default-apps',
+                     '--disable-features=Translate,MediaRouter,OptimizationHints']:
+        options.add_argument(argument)
+
+    prefs = {
+        'profile.default_content_setting_values.geolocation': 1,  # 1 = allow
+        'profile.default_content_setting_values.notifications': 2  # 2 = block
+    }
+    if not load_images:
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        prefs['profile.managed_default_content_settings.images'] = 2
+    options.add_experimental_option('prefs', prefs)
+
+    # Every scraper waits for the elements it reads, so there is no need to
+    # wait for the whole page (and its subresources) to load first
+    options.page_load_strategy = _settings['page_load_strategy']
+    return options
+
+
+def create_driver(headless=None, load_images=None):
+    """
+    Start a Chrome browser for scraping.
+
+    Args:
+    headless (bool): Run without a window; defaults to the configured setting
+    (headless unless configured otherwise)
+    load_images (bool): Load images, fonts and media; off unless configured otherwise
+
+    Returns:
+    WebDriver
+    """
+    options = chrome_options(headless, load_images)
+    load_images = _settings['load_images'] if load_images is None else load_images
+    path = driver_path()
+    try:
+        driver = webdriver.Chrome(service=Service(executable_path=path), options=options)
+    except SessionNotCreatedException:
+        if path == _settings['driver_path']:
+            raise
+        # Chrome was probably upgraded past the pinned driver
+        print(f"chromedriver {path} could not start Chrome, resolving it again")
+        _drop_pin(path)
+        driver = webdriver.Chrome(service=Service(executable_path=driver_path()), options=options)
+
+    if not load_images:
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+        except Exception as e:
+            print(f"Could not block heavy resources: {e}")
+    return driver
+
+
+class LazyDriver:
+    """
+    A browser that is only started the first time get() is called, so runs
+    served from the API or the page cache never start one.
+
+    Use as a context manager, or call quit() when done.
+    """
+
+    def __init__(self, headless=None, load_images=None):
+        self.headless = headless
+        self.load_images = load_images
+        self.driver = None
+
+    def get(self):
+        if self.driver is None:
+            self.driver = create_driver(self.headless, self.load_images)
+        return self.driver
+
+    def quit(self):
+        if self.driver is not None:
+            driver, self.driver = self.driver, None
+            driver.quit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.quit()
+
+
+def add_driver_arguments(parser):
+    """
+    Add the browser options shared by the scrapers to an argparse parser.
+    """
+    parser.add_argument('--show-browser', action='store_true',
+                        help="Run Chrome with a window instead of headless")
+    parser.add_argument('--load-images', action='store_true',
+                        help="Let Chrome load images, fonts and media")
+    parser.add_argument('--chromedriver', default=None, metavar='PATH',
+                        help="chromedriver binary to use instead of the pinned one")
+    parser.add_argument('--driver-version', default=None,
+                        help="chromedriver version to download and pin if none is pinned yet")
+
+
+def configure_from_args(args):
+    """
+    Apply the options added by add_driver_arguments.
+    """
+    settings = {'headless': not args.show_browser, 'load_images': args.load_images,
+                'driver_version': args.driver_version}
+    if args.chromedriver:
+        settings['driver_path'] = args.chromedriver
+    configure(**settings)
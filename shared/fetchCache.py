@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+# On-disk cache for everything the scrapers fetch: HTTP responses (through
+# CachedSession) and rendered browser page sources (through get_page).
+#
+# Modes:
+#   off     - no caching, every fetch goes to the live site
+#   cache   - serve entries younger than the TTL; revalidate older HTTP entries
+#             with If-None-Match / If-Modified-Since before fetching them again
+#   record  - always fetch live and save the result, to build a replay set
+#   replay  - serve only from the cache and never touch the network or a
+#             browser; a missing entry raises CacheMiss
+#
+# Entries are kept to max_bytes in total by evicting the least recently used.
+
+MODES = ['off', 'cache', 'record', 'replay']
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(repo_dir, ".page_cache")
+DEFAULT_TTL = 6 * 60 * 60  # seconds
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class CacheMiss(Exception):
+    """
+    Raised in replay mode for a URL that was never recorded.
+    """
+
+
+class PageCache:
+    """
+    Size-bounded LRU cache of fetched pages on disk. Each entry is a body file
+    and a small JSON metadata file; the metadata file's modification time is
+    bumped on every hit and is what the LRU eviction goes by.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, mode='cache', ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode {mode!r}, expected one of {MODES}")
+        self.directory = directory
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self._entries())
+
+    def _paths(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        subdir = os.path.join(self.directory, digest[:2])
+        return os.path.join(subdir, f"{digest}.json"), os.path.join(subdir, f"{digest}.body")
+
+    def _entries(self):
+        # (last used, metadata path, size) of every entry
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.json'):
+                    meta_path = os.path.join(root, name)
+                    body_path = meta_path[:-len('.json')] + '.body'
+                    try:
+                        size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+                        yield os.path.getmtime(meta_path), meta_path, size
+                    except OSError:
+                        continue
+
+    def lookup(self, key):
+        """
+        The cached entry for key, fresh or not.
+
+        Returns:
+        tuple: (metadata dict, body bytes), or None if there is no entry
+        """
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(meta_path)  # mark as recently used
+        except OSError:
+            pass
+        return meta, body
+
+    def is_fresh(self, meta):
+        # Recorded entries are served regardless of age when replaying
+        return self.mode == 'replay' or time.time() - meta['fetched_at'] <= self.ttl
+
+    def store(self, key, body, meta):
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = dict(meta, key=key, fetched_at=time.time())
+
+        old_size = 0
+        if os.path.exists(meta_path) and os.path.exists(body_path):
+            old_size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+
+        # Write both files under temporary names first so a reader never sees half an entry
+        for path, data in ((body_path, body), (meta_path, json.dumps(meta).encode('utf-8'))):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self.lock:
+            self.total_bytes += os.path.getsize(meta_path) + os.path.getsize(body_path) - old_size
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def touch(self, key):
+        """
+        Reset the age of an entry that was revalidated with the server.
+        """
+        meta_path, _ = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            meta['fetched_at'] = time.time()
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+        except (OSError, ValueError):
+            pass
+
+    def _evict(self):
+        # Drop least recently used entries until 90% of the limit is left
+        target = self.max_bytes * 0.9
+        for _, meta_path, size in sorted(self._entries()):
+            if self.total_bytes <= target:
+                break
+            body_path = meta_path[:-len('.json')] + '.body'
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.total_bytes -= size
+
+    def count(self, outcome):
+        """
+        Count a lookup as one of hits, misses or revalidated. Lookups come from
+        the scrapers' worker threads, so the counters are only bumped under the lock.
+        """
+        with self.lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'mode': self.mode,
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'bytes': self.total_bytes
+            }
+
+
+class CachedSession(requests.Session):
+    """
+    requests.Session whose GET requests go through a PageCache. Other methods,
+    and GET requests with a body, are passed through untouched.
+    """
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+
+    def request(self, method, url, params=None, data=None, headers=None, *args, **kwargs):
+        # Same signature as requests.Session.request, so positional callers keep working
+        if (self.cache is None or self.cache.mode == 'off' or method.upper() != 'GET' or
+                data is not None or kwargs.get('json') is not None):
+            return super().request(method, url, params, data, headers, *args, **kwargs)
+
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        key = f"GET {full_url}"
+        cached = self.cache.lookup(key) if self.cache.mode != 'record' else None
+
+        if cached is not None and self.cache.is_fresh(cached[0]):
+            self.cache.count('hits')
+            return _build_response(full_url, *cached)
+        if self.cache.mode == 'replay':
+            raise CacheMiss(full_url)
+
+        # Stale entry: ask the server whether it changed
+        headers = dict(headers or {})
+        if cached is not None:
+            meta = cached[0]
+            if meta['headers'].get('ETag'):
+                headers['If-None-Match'] = meta['headers']['ETag']
+            if meta['headers'].get('Last-Modified'):
+                headers['If-Modified-Since'] = meta['headers']['Last-Modified']
+
+        response = super().request(method, full_url, None, None, headers, *args, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            self.cache.count('revalidated')
+            self.cache.touch(key)
+            return _build_response(full_url, *cached)
+
+        self.cache.count('misses')
+        if response.status_code == 200:
+            self.cache.store(key, response.content, {
+                'url': full_url,
+                'status': response.status_code,
+                'encoding': response.encoding,
+                'headers': {name: response.headers[name]
+                            for name in ('Content-Type', 'ETag', 'Last-Modified') if name in response.headers}
+            })
+        return response
+
+
+def _build_response(url, meta, body):
+    response = requests.models.Response()
+    response.status_code = meta.get('status', 200)
+    response._content = body
+    response.url = url
+    response.encoding = meta.get('encoding')
+    response.headers.update(meta.get('headers', {}))
+    return response
+
+
+def get_page(cache, url, load):
+    """
+    Get the page source of a browser-rendered page through the cache.
+
+    Args:
+    cache (PageCache): Cache to use, or None to always load
+    url (str): URL of the page, used as the cache key
+    load (callable): Loads the page in a browser and returns its page source;
+    only called when the cache cannot serve the page
+
+    Returns:
+    str: Page source
+    """
+    if cache is None or cache.mode == 'off':
+        return load()
+
+    key = f"PAGE {url}"
+    if cache.mode != 'record':
+        cached = cache.lookup(key)
+        if cached is not None and cache.is_fresh(cached[0]):
+            cache.count('hits')
+            return cached[1].decode('utf-8')
+    if cache.mode == 'replay':
+        raise CacheMiss(url)
+
+    cache.count('misses')
+    page_source = load()
+    cache.store(key, page_source.encode('utf-8'), {'url': url})
+    return page_source
+
+
+def add_cache_arguments(parser):
+    """
+    Add the --cache-* options shared by the scrapers to an argparse parser.
+    """
+    parser.add_argument('--cache-mode', choices=MODES, default='off',
+                        help="off: always fetch live; cache: reuse fresh pages; record: fetch live and save; "
+                             "replay: serve saved pages only, offline")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Directory of the page cache")
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL / 3600,
+                        help="Hours a cached page is served without revalidation")
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="Size limit of the page cache in MB")
+
+
+def cache_from_args(args):
+    """
+    The PageCache configured by add_cache_arguments options, or None when off.
+    """
+    if args.cache_mode == 'off':
+        return None
+    return PageCache(args.cache_dir, args.cache_mode, args.cache_ttl * 3600, int(args.cache_max_mb * 1024 * 1024))
@@ -0,0 +1,211 @@
+import json
+import math
+import threading
+import time
+from contextlib import nullcontext
+
+# Per-stage timings and counters for the scrapers. Code marks its stages with
+#
+#     with scrapeMetrics.stage('parse', url=menu_link):
+#         items = extract_menu_items(...)
+#
+# and bumps counters with scrapeMetrics.count('view_menus_selector_1'). Nothing
+# is recorded until a run calls enable(); until then stage() hands back one
+# shared no-op context manager and count() returns at once, so instrumented
+# code costs a function call and a None check per stage.
+#
+# Stages used by the scrapers: navigate (driver.get), wait (waiting for
+# elements to render), page_source, fetch (plain HTTP), parse and write.
+#
+# Per-page progress lines ("Processing 10/1000", "Added 42 lunch items ...") go
+# through progress(). They are printed by default, but a run with --metrics
+# already records every page as a stage, so there they are left out unless
+# --verbose is also given. Errors and end-of-run results are printed as usual.
+
+_active = None
+_NULL_STAGE = nullcontext()
+_show_progress = True
+
+
+class Metrics:
+    """
+    Timings and counters of one run. Each finished stage can also be written as
+    a JSON line to events_file, with the labels it was started with.
+    """
+
+    def __init__(self, events_file=None):
+        self.events_file = events_file
+        self.durations = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def record(self, name, seconds, labels):
+        with self.lock:
+            self.durations.setdefault(name, []).append(seconds)
+            if self.events_file is not None:
+                event = {'time': time.time(), 'stage': name, 'seconds': round(seconds, 6)}
+                event.update(labels)
+                self.events_file.write(json.dumps(event) + '\n')
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        """
+        Returns:
+        dict: wall_seconds, stages (name -> count, total_seconds, p50, p95 and
+        max in seconds) and counters
+        """
+        with self.lock:
+            stages = {}
+            for name, durations in self.durations.items():
+                ordered = sorted(durations)
+                stages[name] = {
+                    'count': len(ordered),
+                    'total_seconds': sum(ordered),
+                    'p50': percentile(ordered, 50),
+                    'p95': percentile(ordered, 95),
+                    'max': ordered[-1]
+                }
+            return {
+                'wall_seconds': time.perf_counter() - self.started,
+                'stages': stages,
+                'counters': dict(sorted(self.counters.items()))
+            }
+
+
+class _Stage:
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        labels = self.labels
+        if exc_type is not None:
+            labels = dict(labels, error=exc_type.__name__)
+        self.metrics.record(self.name, time.perf_counter() - self.start, labels)
+        return False
+
+
+def percentile(ordered, p):
+    # Nearest-rank percentile of an already sorted list
+    if not ordered:
+        return None
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def enable(events_path=None):
+    """
+    Start recording metrics for this process.
+
+    Args:
+    events_path (str): JSON lines file every finished stage is appended to;
+    only the in-memory summary is kept if None
+
+    Returns:
+    Metrics
+    """
+    global _active
+    events_file = open(events_path, 'a', encoding='utf-8') if events_path else None
+    _active = Metrics(events_file)
+    return _active
+
+
+def disable():
+    """
+    Stop recording and close the events file.
+
+    Returns:
+    dict: Summary of the run, or None if metrics were not enabled
+    """
+    global _active
+    metrics, _active = _active, None
+    if metrics is None:
+        return None
+    summary = metrics.summary()
+    if metrics.events_file is not None:
+        metrics.events_file.write(json.dumps({'time': time.time(), 'summary': summary}) + '\n')
+        metrics.events_file.close()
+    return summary
+
+
+def stage(name, **labels):
+    """
+    Context manager timing one stage of one page. No-op unless enabled.
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return _Stage(_active, name, labels)
+
+
+def count(name, n=1):
+    """
+    Add n to a counter, e.g. for retries and fallbacks. No-op unless enabled.
+    """
+    if _active is not None:
+        _active.count(name, n)
+
+
+def show_progress(show):
+    """
+    Turn the lines printed by progress() on or off.
+    """
+    global _show_progress
+    _show_progress = show
+
+
+def progress(message):
+    """
+    Print a per-page progress line, unless turned off with show_progress().
+    """
+    if _show_progress:
+        print(message)
+
+
+def print_summary(summary):
+    print(f"Run took {summary['wall_seconds']:.1f} s")
+    for name, numbers in summary['stages'].items():
+        print(f"  {name}: {numbers['count']} x, total {numbers['total_seconds']:.2f} s, "
+              f"p50 {numbers['p50'] * 1000:.1f} ms, p95 {numbers['p95'] * 1000:.1f} ms")
+    for name, value in summary['counters'].items():
+        print(f"  {name}: {value}")
+
+
+def add_metrics_arguments(parser):
+    """
+    Add the --metrics option shared by the scrapers to an argparse parser.
+    """
+    parser.add_argument('--metrics', nargs='?', const='', default=None, metavar='PATH',
+                        help="Record per-stage timings and counters and print a summary; "
+                             "with a PATH, also append every stage and the summary to it as JSON lines")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Print per-page progress even with --metrics")
+
+
+def enable_from_args(args):
+    """
+    Enable metrics if --metrics was given; per-page progress is then only
+    printed with --verbose.
+    """
+    if args.metrics is not None:
+        enable(args.metrics or None)
+    show_progress(args.metrics is None or args.verbose)
+
+
+def finish():
+    """
+    Stop recording and print the run summary, if metrics were enabled.
+    """
+    summary = disable()
+    if summary is not None:
+        print_summary(summary)
+    return summary
@@ -0,0 +1,314 @@
+import argparse
+import bisect
+import heapq
+import os
+import pickle
+import re
+import time
+
+import pandas as pd
+
+# Search-as-you-type over clubs and dining hall menu items. The scrapers call
+# update_snapshot() when they finish, which reads their CSVs once and pickles a
+# ready-to-use index; the app only loads that snapshot, it never parses CSVs.
+#
+# - exact words: inverted index term -> {doc id: field weight}
+# - prefixes: the vocabulary is kept sorted, so all words starting with what the
+#   user has typed so far are one bisect away (a flattened trie)
+# - typos: every word of 4+ letters is also stored under each of its one-letter
+#   deletions, so words one edit away are found with dictionary lookups only
+
+SNAPSHOT_VERSION = 1
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SNAPSHOT_PATH = os.path.join(repo_dir, "search_snapshot.pkl")
+DEFAULT_CLUBS_CSV = os.path.join(repo_dir, "clubScraping", "organization_data.csv")
+DEFAULT_MENU_CSVS = {
+    meal_type: os.path.join(repo_dir, "menuScraping", f"dining_hall_{meal_type}_items.csv")
+    for meal_type in ['breakfast', 'lunch', 'dinner']
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("a an and are as at be by for from in is it of on or our the to we with you your".split())
+
+# How much a word counts depending on the field it appears in
+TITLE_WEIGHT = 3.0
+BODY_WEIGHT = 1.0
+
+# Score factors for how a query word matched an indexed word
+EXACT_FACTOR = 1.0
+PREFIX_FACTOR = 0.8
+TYPO_FACTOR = 0.5
+
+# Words shorter than this are never matched with a typo
+MIN_TYPO_LENGTH = 4
+
+# Most words a prefix expands to, the ones in the most documents first; keeps
+# one or two letter prefixes fast
+MAX_PREFIX_EXPANSIONS = 64
+
+
+def tokenize(text):
+    if not isinstance(text, str):
+        return []
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def deletions(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def within_one_edit(a, b):
+    """
+    True if a and b differ by at most one insertion, deletion, substitution or
+    swap of two neighbouring letters.
+    """
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+    if len(a) > len(b):
+        a, b = b, a
+    # b is one letter longer than a
+    for i in range(len(a)):
+        if a[i] != b[i]:
+            return a[i:] == b[i + 1:]
+    return True
+
+
+class SearchIndex:
+    """
+    In-memory search index over documents of a few kinds ('club', 'menu_item').
+    Build it with build_index() or load a snapshot with SearchIndex.load().
+    """
+
+    def __init__(self, docs, terms, postings, typo_index):
+        self.docs = docs  # list of dicts with at least 'kind' and 'title'
+        self.terms = terms  # sorted vocabulary
+        self.postings = postings  # aligned with terms: {doc id: weight}
+        self.typo_index = typo_index  # one-letter deletion -> list of term ids
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+
+    def _expand(self, token, prefix):
+        """
+        Find the indexed words a query word matches.
+
+        Returns:
+        dict: term id -> score factor (the best way the word matched)
+        """
+        matches = {}
+        term_id = self.term_ids.get(token)
+        if term_id is not None:
+            matches[term_id] = EXACT_FACTOR
+
+        if prefix:
+            start = bisect.bisect_left(self.terms, token)
+            end = bisect.bisect_left(self.terms, token + '\uffff')
+            expansions = range(start, end)
+            if end - start > MAX_PREFIX_EXPANSIONS:
+                expansions = heapq.nlargest(MAX_PREFIX_EXPANSIONS, expansions, key=lambda i: len(self.postings[i]))
+            for i in expansions:
+                matches.setdefault(i, PREFIX_FACTOR)
+
+        if len(token) >= MIN_TYPO_LENGTH:
+            # Words with one letter more, and words sharing a one-letter deletion
+            candidates = set(self.typo_index.get(token, ()))
+            for deleted in deletions(token):
+                candidates.update(self.typo_index.get(deleted, ()))
+                if deleted in self.term_ids:
+                    candidates.add(self.term_ids[deleted])
+            for i in candidates:
+                if i not in matches and within_one_edit(token, self.terms[i]):
+                    matches[i] = TYPO_FACTOR
+
+        return matches
+
+    def search(self, query, limit=10, kind=None):
+        """
+        Search for documents matching every word of the query. The last word is
+        also matched as a prefix unless the query ends in a space, so this can be
+        called on every keystroke.
+
+        Args:
+        query (str): What the user has typed so far
+        limit (int): Maximum number of results
+        kind (str): Only return documents of this kind ('club' or 'menu_item')
+
+        Returns:
+        list of dict: Matching documents, best first, each with a 'score'
+        """
+        if not isinstance(query, str):
+            return []
+        # The word being typed is kept even if it is a stop word so far ("the"
+        # on the way to "theatre"); finished stop words are dropped
+        words = TOKEN_PATTERN.findall(query.lower())
+        last_is_prefix = bool(words) and query[-1:].isalnum()
+        tokens = [word for word in words[:-1] if word not in STOP_WORDS]
+        if words and (last_is_prefix or words[-1] not in STOP_WORDS):
+            tokens.append(words[-1])
+        if not tokens:
+            return []
+
+        scores = None
+        for pos, token in enumerate(tokens):
+            matches = self._expand(token, last_is_prefix and pos == len(tokens) - 1)
+
+            token_scores = {}
+            for term_id, factor in matches.items():
+                for doc_id, weight in self.postings[term_id].items():
+                    score = weight * factor
+                    if score > token_scores.get(doc_id, 0):
+                        token_scores[doc_id] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                # Every word has to match
+                if len(token_scores) > len(scores):
+                    scores = {doc_id: s + token_scores[doc_id] for doc_id, s in scores.items() if doc_id in token_scores}
+                else:
+                    scores = {doc_id: s + scores[doc_id] for doc_id, s in token_scores.items() if doc_id in scores}
+            if not scores:
+                return []
+
+        if kind is not None:
+            scores = {doc_id: s for doc_id, s in scores.items() if self.docs[doc_id]['kind'] == kind}
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [dict(self.docs[doc_id], score=score) for doc_id, score in best]
+
+    def save(self, path):
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'docs': self.docs,
+            'terms': self.terms,
+            'postings': self.postings,
+            'typo_index': self.typo_index
+        }
+        # Write to a temporary file first so readers never see a half-written snapshot
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_SNAPSHOT_PATH):
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported search snapshot version in {path}: {snapshot.get('version')}")
+        return cls(snapshot['docs'], snapshot['terms'], snapshot['postings'], snapshot['typo_index'])
+
+
+def club_documents(df):
+    for name, description in zip(df['Name'], df['Description']):
+        if isinstance(name, str) and name:
+            yield {'kind': 'club', 'title': name}, [(name, TITLE_WEIGHT), (description, BODY_WEIGHT)]
+
+
+def menu_documents(menus):
+    """
+    One document per distinct dish, listing every location and meal it is served
+    at, so a dish served in every hall shows up once.
+
+    Args:
+    menus (dict): meal_type -> DataFrame of menu items as saved by menuScrape.py
+    """
+    dishes = {}
+    for meal_type, df in menus.items():
+        for row in df.itertuples(index=False):
+            if not isinstance(row.item_name, str) or not row.item_name:
+                continue
+            dish = dishes.setdefault(row.item_name, {
+                'kind': 'menu_item',
+                'title': row.item_name,
+                'calories': str(row.calories),
+                'dietary_traits': row.dietary_traits if isinstance(row.dietary_traits, str) else '',
+                'served': []
+            })
+            served = (row.location_name, meal_type)
+            if served not in dish['served']:
+                dish['served'].append(served)
+
+    for dish in dishes.values():
+        locations = ' '.join(sorted({location for location, _ in dish['served']}))
+        yield dish, [(dish['title'], TITLE_WEIGHT), (dish['dietary_traits'], BODY_WEIGHT), (locations, BODY_WEIGHT)]
+
+
+def build_index(documents):
+    """
+    Build a SearchIndex.
+
+    Args:
+    documents (iterable): (doc dict, [(field text, weight), ...]) pairs
+
+    Returns:
+    SearchIndex
+    """
+    docs = []
+    word_postings = {}
+    for doc, fields in documents:
+        doc_id = len(docs)
+        docs.append(doc)
+        for text, weight in fields:
+            for token in tokenize(text):
+                postings = word_postings.setdefault(token, {})
+                if weight > postings.get(doc_id, 0):
+                    postings[doc_id] = weight
+
+    terms = sorted(word_postings)
+    postings = [word_postings[term] for term in terms]
+
+    typo_index = {}
+    for term_id, term in enumerate(terms):
+        if len(term) >= MIN_TYPO_LENGTH:
+            for deleted in deletions(term):
+                typo_index.setdefault(deleted, []).append(term_id)
+
+    return SearchIndex(docs, terms, postings, typo_index)
+
+
+def update_snapshot(clubs_csv=DEFAULT_CLUBS_CSV, menu_csvs=DEFAULT_MENU_CSVS, snapshot_path=DEFAULT_SNAPSHOT_PATH):
+    """
+    Rebuild the search snapshot from the latest scraper output. Missing CSVs are
+    skipped, so either scraper can call this on its own.
+    """
+    documents = []
+    if os.path.exists(clubs_csv):
+        documents.extend(club_documents(pd.read_csv(clubs_csv)))
+    menus = {meal_type: pd.read_csv(path) for meal_type, path in menu_csvs.items() if os.path.exists(path)}
+    documents.extend(menu_documents(menus))
+
+    index = build_index(documents)
+    index.save(snapshot_path)
+    print(f"Search snapshot saved to {snapshot_path}: {len(index.docs)} documents, {len(index.terms)} words")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search clubs and menu items")
+    parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT_PATH, help="Search snapshot file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('build', help="Rebuild the snapshot from the scraper CSVs")
+    query_parser = subparsers.add_parser('query', help="Run a search")
+    query_parser.add_argument('text')
+    query_parser.add_argument('--kind', choices=['club', 'menu_item'], default=None)
+    query_parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        update_snapshot(snapshot_path=args.snapshot)
+    else:
+        index = SearchIndex.load(args.snapshot)
+        start = time.perf_counter()
+        results = index.search(args.text, args.limit, args.kind)
+        elapsed = time.perf_counter() - start
+        for result in results:
+            print(f"  {result['score']:.2f}  [{result['kind']}] {result['title']}")
+        print(f"{len(results)} results in {elapsed * 1000:.3f} ms")
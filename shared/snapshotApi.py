@@ -0,0 +1,451 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import signal
+import time
+from datetime import datetime
+from email.utils import formatdate
+
+import pandas as pd
+
+# Read-only HTTP API the app reads dining halls, menus and clubs from:
+#
+#     GET /                               what the snapshot holds
+#     GET /halls                          every hall with its hours
+#     GET /halls/<hall>                   one hall
+#     GET /halls/<hall>/menu              its items for every meal
+#     GET /halls/<hall>/menu/<meal>       its items for one meal
+#     GET /clubs                          every club, without descriptions
+#     GET /clubs/<club>                   one club
+#
+# Every response is built when the scraper CSVs are loaded: serialized to JSON,
+# gzipped, given a strong ETag, and stored with its status line and headers as
+# ready-to-send bytes. Answering a request is a dictionary lookup and a write;
+# nothing is parsed, serialized or read from disk. The CSVs are polled for
+# changes and a new snapshot is built in a worker thread when a scrape
+# finishes, then swapped in with a single assignment, so every request sees
+# either the whole old snapshot or the whole new one.
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_LOCATIONS_CSV = os.path.join(repo_dir, "menuScraping", "dining_hall_locations.csv")
+DEFAULT_CLUBS_CSV = os.path.join(repo_dir, "clubScraping", "organization_data.csv")
+DEFAULT_MENU_CSVS = {
+    meal_type: os.path.join(repo_dir, "menuScraping", f"dining_hall_{meal_type}_items.csv")
+    for meal_type in ['breakfast', 'lunch', 'dinner']
+}
+
+# Placeholders the club scraper writes for missing or failed fields
+MISSING_VALUES = frozenset(['', 'Error', 'No description available', 'No email available',
+                            'No website available', 'No Instagram available', 'No image available'])
+
+SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
+# Bodies smaller than this are not worth compressing
+MIN_GZIP_BYTES = 512
+
+# Largest request head accepted, and how long an idle keep-alive connection is kept
+MAX_HEAD_BYTES = 16 * 1024
+IDLE_TIMEOUT = 15
+
+
+def slugify(name):
+    return SLUG_PATTERN.sub('-', name.lower().replace("'", '')).strip('-')
+
+
+def unique_slug(name, taken):
+    slug = slugify(name) or 'unnamed'
+    candidate, n = slug, 2
+    while candidate in taken:
+        candidate = f"{slug}-{n}"
+        n += 1
+    taken.add(candidate)
+    return candidate
+
+
+def _status_line(status):
+    return {200: b"HTTP/1.1 200 OK\r\n", 304: b"HTTP/1.1 304 Not Modified\r\n", 400: b"HTTP/1.1 400 Bad Request\r\n",
+            404: b"HTTP/1.1 404 Not Found\r\n", 405: b"HTTP/1.1 405 Method Not Allowed\r\n"}[status]
+
+
+def _head(status, headers):
+    # Status line and headers, without the blank line ending them, so the
+    # Date and Connection headers can still be added per request
+    return _status_line(status) + ''.join(f"{name}: {value}\r\n" for name, value in headers).encode('latin-1')
+
+
+class Resource:
+    """
+    One response, pre-serialized. variants maps "client accepts gzip" to the
+    (head, body) to send; not_modified maps it to the head of the 304.
+    """
+
+    __slots__ = ('etags', 'variants', 'not_modified')
+
+    def __init__(self, body, max_age, content_type='application/json; charset=utf-8', status=200):
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        cache_control = f"public, max-age={max_age}"
+        common = [('Content-Type', content_type), ('Cache-Control', cache_control), ('Vary', 'Accept-Encoding')]
+
+        # Strong ETags name the exact bytes, so the gzipped body gets its own
+        identity_etag = f'"{digest}"'
+        identity = (_head(status, common + [('ETag', identity_etag), ('Content-Length', len(body))]), body)
+        self.etags = {identity_etag}
+        self.variants = {False: identity, True: identity}
+        self.not_modified = {False: _head(304, [('Cache-Control', cache_control), ('Vary', 'Accept-Encoding'),
+                                                ('ETag', identity_etag)])}
+        self.not_modified[True] = self.not_modified[False]
+
+        compressed = gzip.compress(body, 9, mtime=0) if len(body) >= MIN_GZIP_BYTES else body
+        if len(compressed) < len(body):
+            gzip_etag = f'"{digest}-gzip"'
+            self.etags.add(gzip_etag)
+            self.variants[True] = (_head(status, common + [('Content-Encoding', 'gzip'), ('ETag', gzip_etag),
+                                                           ('Content-Length', len(compressed))]), compressed)
+            self.not_modified[True] = _head(304, [('Cache-Control', cache_control), ('Vary', 'Accept-Encoding'),
+                                                  ('ETag', gzip_etag)])
+
+    @classmethod
+    def json(cls, value, max_age):
+        return cls(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), max_age)
+
+
+def _error(status, message, extra_headers=()):
+    body = json.dumps({'error': message}).encode('utf-8')
+    return (_head(status, [('Content-Type', 'application/json; charset=utf-8'), ('Cache-Control', 'no-store'),
+                           ('Content-Length', len(body))] + list(extra_headers)), body)
+
+
+NOT_FOUND = _error(404, "not found")
+METHOD_NOT_ALLOWED = _error(405, "only GET and HEAD are supported", [('Allow', 'GET, HEAD')])
+BAD_REQUEST = _error(400, "bad request")
+
+
+class Snapshot:
+    """
+    Every resource of one load of the scraper output.
+
+    resources maps a path (without trailing slash) to its Resource; signature
+    identifies the CSV versions it was built from.
+    """
+
+    def __init__(self, resources, signature, built_at):
+        self.resources = resources
+        self.signature = signature
+        self.built_at = built_at
+
+
+def source_signature(paths):
+    # (path, modification time, size) of every input; changes whenever a scrape rewrites one
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def _read_csv(path):
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def _menu_item(row):
+    calories = row.calories.strip()
+    return {
+        'name': row.item_name,
+        'calories': int(calories) if calories.isdigit() else None,
+        'dietary_traits': [trait.strip() for trait in row.dietary_traits.split(',') if trait.strip()]
+    }
+
+
+def _club_value(value):
+    return None if value.strip() in MISSING_VALUES else value
+
+
+def build_snapshot(locations_csv=DEFAULT_LOCATIONS_CSV, menu_csvs=DEFAULT_MENU_CSVS, clubs_csv=DEFAULT_CLUBS_CSV,
+                   max_age=60):
+    """
+    Load the scraper CSVs into ready-to-send responses. Missing CSVs leave
+    their endpoints empty.
+
+    Args:
+    locations_csv (str): Dining hall locations saved by menuScrape.py
+    menu_csvs (dict): meal_type -> menu items CSV saved by menuScrape.py
+    clubs_csv (str): Organizations saved by clubsScrape.py
+    max_age (int): Seconds clients may use a response before revalidating it
+
+    Returns:
+    Snapshot
+    """
+    # Taken before reading, so a CSV rewritten while loading triggers another reload
+    signature = source_signature([locations_csv, *menu_csvs.values(), clubs_csv])
+    resources = {}
+
+    # location name -> meal_type -> items, in CSV order
+    menus = {}
+    menu_dates = {}
+    for meal_type, path in menu_csvs.items():
+        df = _read_csv(path)
+        if df is None:
+            continue
+        # menuScrape.py writes today's menus to the CSVs
+        menu_dates[meal_type] = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d')
+        for row in df.itertuples(index=False):
+            if row.item_name:
+                menus.setdefault(row.location_name, {}).setdefault(meal_type, []).append(_menu_item(row))
+
+    locations = _read_csv(locations_csv)
+    locations = locations.to_dict('records') if locations is not None else []
+    # Halls that only appear in the menus still get their menu served
+    listed = {location['name'] for location in locations}
+    locations.extend({'name': name} for name in menus if name not in listed)
+
+    halls = []
+    taken = set()
+    for location in locations:
+        slug = unique_slug(location['name'], taken)
+        hall = {
+            'id': slug,
+            'name': location['name'],
+            'address': location.get('address') or None,
+            'dates_of_operation': location.get('dates_of_operation') or None,
+            'hours': {meal_type: location.get(f'{meal_type}_hours') or None for meal_type in menu_csvs},
+            'menu': f"/halls/{slug}/menu"
+        }
+        halls.append(hall)
+        resources[f"/halls/{slug}"] = Resource.json(hall, max_age)
+
+        hall_menus = menus.get(location['name'], {})
+        meals = {}
+        for meal_type in menu_csvs:
+            meal = {'hall': hall['name'], 'meal': meal_type, 'date': menu_dates.get(meal_type),
+                    'items': hall_menus.get(meal_type, [])}
+            meals[meal_type] = meal
+            resources[f"/halls/{slug}/menu/{meal_type}"] = Resource.json(meal, max_age)
+        resources[f"/halls/{slug}/menu"] = Resource.json({'hall': hall['name'], 'meals': meals}, max_age)
+    resources['/halls'] = Resource.json({'halls': halls}, max_age)
+
+    clubs = []
+    clubs_df = _read_csv(clubs_csv)
+    taken = set()
+    for row in (clubs_df.itertuples(index=False) if clubs_df is not None else []):
+        if not row.Name:
+            continue
+        slug = unique_slug(row.Name, taken)
+        club = {
+            'id': slug,
+            'name': row.Name,
+            'email': _club_value(row.Email),
+            'website': _club_value(row.Website),
+            'instagram': _club_value(row.Instagram),
+            'image': _club_value(row.Image_Source)
+        }
+        clubs.append(club)
+        resources[f"/clubs/{slug}"] = Resource.json(dict(club, description=_club_value(row.Description)), max_age)
+    resources['/clubs'] = Resource.json({'clubs': clubs}, max_age)
+
+    built_at = time.time()
+    resources[''] = Resource.json({
+        'built_at': formatdate(built_at, usegmt=True),
+        'halls': len(halls),
+        'menu_items': sum(len(items) for hall_menus in menus.values() for items in hall_menus.values()),
+        'clubs': len(clubs),
+        'endpoints': ['/halls', '/halls/{hall}', '/halls/{hall}/menu', '/halls/{hall}/menu/{meal}',
+                      '/clubs', '/clubs/{club}']
+    }, max_age)
+    return Snapshot(resources, signature, built_at)
+
+
+def accepts_gzip(accept_encoding):
+    for coding in accept_encoding.split(','):
+        name, *params = coding.split(';')
+        if name.strip().lower() not in ('gzip', 'x-gzip', '*'):
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        # "gzip;q=0" means the client does not want it
+        return q > 0
+    return False
+
+
+def etag_matches(if_none_match, etags):
+    if if_none_match.strip() == '*':
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
+
+
+class SnapshotServer:
+    """
+    Serves the current Snapshot over HTTP/1.1 with keep-alive, on asyncio.
+
+    Args:
+    build (callable): Returns a fresh Snapshot; called in a worker thread on reload
+    signature (callable): Returns the signature of the inputs as they are now
+    """
+
+    def __init__(self, build, signature):
+        self.build = build
+        self.signature = signature
+        self.snapshot = build()
+        self.requests = 0
+        self._date_second = None
+        self._date_header = b''
+
+    def date_header(self):
+        now = int(time.time())
+        if now != self._date_second:
+            self._date_header = f"Date: {formatdate(now, usegmt=True)}\r\n".encode('latin-1')
+            self._date_second = now
+        return self._date_header
+
+    def respond(self, method, target, headers):
+        """
+        Returns:
+        tuple: (head, body) to send, body being None for HEAD
+        """
+        if method not in ('GET', 'HEAD'):
+            return METHOD_NOT_ALLOWED
+        path = target.partition('?')[0].rstrip('/')
+        # One read of self.snapshot per request, so a swap never mixes two snapshots
+        resource = self.snapshot.resources.get(path)
+        if resource is None:
+            return NOT_FOUND
+
+        gzipped = accepts_gzip(headers.get('accept-encoding', ''))
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None and etag_matches(if_none_match, resource.etags):
+            return resource.not_modified[gzipped], None
+        head, body = resource.variants[gzipped]
+        return head, body if method == 'GET' else None
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                        ConnectionError):
+                    break
+                self.requests += 1
+
+                lines = request_head.decode('latin-1').split('\r\n')
+                parts = lines[0].split(' ')
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                if len(parts) != 3 or not parts[2].startswith('HTTP/1.'):
+                    (head, body), keep_alive = BAD_REQUEST, False
+                else:
+                    head, body = self.respond(parts[0], parts[1], headers)
+                    keep_alive = (connection == 'keep-alive' if parts[2] == 'HTTP/1.0' else connection != 'close')
+                    # Requests with a body are not expected; rather than read it, close after answering
+                    if 'content-length' in headers or 'transfer-encoding' in headers:
+                        keep_alive = False
+
+                writer.write(head + self.date_header() +
+                             (b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n"))
+                if body:
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def reload(self):
+        """
+        Build a new snapshot in a worker thread and swap it in. The old one keeps
+        being served if the build fails.
+        """
+        start = time.perf_counter()
+        try:
+            snapshot = await asyncio.get_running_loop().run_in_executor(None, self.build)
+        except Exception as e:
+            print(f"Reload failed, still serving the snapshot of {formatdate(self.snapshot.built_at, usegmt=True)}: {e}")
+            return
+        self.snapshot = snapshot
+        print(f"Reloaded {len(snapshot.resources)} resources in {time.perf_counter() - start:.2f} s")
+
+    async def watch(self, poll_seconds):
+        # A changed signature has to stay the same for one more poll before it is
+        # loaded, so CSVs that are still being written are not picked up half done
+        pending = None
+        while True:
+            await asyncio.sleep(poll_seconds)
+            signature = await asyncio.get_running_loop().run_in_executor(None, self.signature)
+            if signature == self.snapshot.signature:
+                pending = None
+            elif signature != pending:
+                pending = signature
+            else:
+                pending = None
+                await self.reload()
+
+    async def serve(self, host='127.0.0.1', port=8080, poll_seconds=30):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEAD_BYTES)
+        loop = asyncio.get_running_loop()
+        try:
+            # kill -HUP reloads at once, e.g. from the end of a scrape job
+            loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(self.reload()))
+        except (NotImplementedError, AttributeError):
+            pass
+        watcher = asyncio.ensure_future(self.watch(poll_seconds)) if poll_seconds > 0 else None
+        print(f"Serving {len(self.snapshot.resources)} resources on "
+              f"http://{host}:{server.sockets[0].getsockname()[1]}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve dining halls, menus and clubs from the scraper output")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--locations-csv', default=DEFAULT_LOCATIONS_CSV, help="Dining hall locations CSV")
+    parser.add_argument('--menu-dir', default=os.path.dirname(DEFAULT_LOCATIONS_CSV),
+                        help="Directory of the dining_hall_<meal>_items.csv files")
+    parser.add_argument('--clubs-csv', default=DEFAULT_CLUBS_CSV, help="Organizations CSV")
+    parser.add_argument('--poll-seconds', type=float, default=30,
+                        help="How often to check the CSVs for a new scrape; 0 to only reload on SIGHUP")
+    parser.add_argument('--max-age', type=int, default=60,
+                        help="Seconds clients may use a response before revalidating it")
+    args = parser.parse_args()
+
+    menu_csvs = {meal_type: os.path.join(args.menu_dir, os.path.basename(path))
+                 for meal_type, path in DEFAULT_MENU_CSVS.items()}
+    sources = [args.locations_csv, *menu_csvs.values(), args.clubs_csv]
+    api = SnapshotServer(lambda: build_snapshot(args.locations_csv, menu_csvs, args.clubs_csv, args.max_age),
+                         lambda: source_signature(sources))
+    try:
+        asyncio.run(api.serve(args.host, args.port, args.poll_seconds))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The scrapers import their neighbours and ../shared by plain module name
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ['shared', 'menuScraping', 'clubScraping', 'unionScraping', 'benchmarks']:
+    sys.path.insert(0, os.path.join(repo_dir, directory))
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+import clubEvents
+
+CLUBS = [(f"/organization/club-{i}", f"Club {i}") for i in range(80)]
+NOW = 1_700_000_000.0
+
+
+def brute_force(feed, user_id, after):
+    # Every upcoming event of the followed clubs, soonest first
+    follows = feed.follows.get(user_id, 0)
+    return sorted((event['start'], event_id) for event_id, event in feed.events.items()
+                  if follows >> event['club_id'] & 1 and (event['start'], event_id) > after)
+
+
+@pytest.fixture
+def feed():
+    rng = random.Random(7)
+    feed, weights = clubEvents.synthetic_feed(CLUBS, 3000, NOW - 86400, 30, seed=3)
+    # Events at the same instant are told apart by their id in the cursor
+    for club_id in range(0, 80, 9):
+        feed.add_event(club_id, "Same time", NOW + 3600)
+    for event_id in rng.sample(sorted(feed.events), 200):
+        feed.remove_event(event_id)
+    for n_follows in (1, 3, 10, 40, 80):
+        for i in range(4):
+            clubEvents.follow_randomly(feed, f"user{n_follows}-{i}", n_follows, weights, rng)
+    return feed
+
+
+def test_pages_match_brute_force(feed):
+    for user_id in feed.follows:
+        expected = brute_force(feed, user_id, (NOW, -1))
+        shown = []
+        cursor = None
+        while True:
+            page = feed.timeline(user_id, 25, cursor, NOW)
+            shown.extend((event['start'], event['event_id']) for event in page['events'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        assert shown == expected, user_id
+
+
+def test_merge_and_scan_agree(feed):
+    rng = random.Random(11)
+    for user_id, follows in feed.follows.items():
+        follows &= feed.clubs_with_events
+        for _ in range(5):
+            after = (NOW + rng.uniform(-86400, 30 * 86400), rng.randrange(len(feed.events)))
+            limit = rng.choice([1, 7, 50])
+            merged = feed._merge(clubEvents.iter_bits(follows), after, limit)
+            assert merged == feed._scan(follows, after, limit)
+            assert merged == brute_force(feed, user_id, after)[:limit]
+
+
+def test_cursor_round_trip():
+    key = (NOW + 0.125, 42)
+    assert clubEvents.decode_cursor(clubEvents.encode_cursor(key)) == key
+    with pytest.raises(ValueError):
+        clubEvents.decode_cursor('not a cursor')
+
+
+def test_follows_survive_a_rescrape(tmp_path):
+    feed = clubEvents.EventFeed(CLUBS[:3])
+    feed.follow('user1', '/organization/club-1')
+    clubEvents.save_positions(feed.positions, str(tmp_path / 'positions.json'))
+
+    # The next scrape lists a new club first, renames one and drops another
+    clubs = [('/organization/new', 'New Club'), ('/organization/club-1', 'Club One'), CLUBS[2]]
+    rescraped = clubEvents.EventFeed(clubs, clubEvents.load_positions(str(tmp_path / 'positions.json')))
+    rescraped.follows = dict(feed.follows)
+    assert rescraped.followed_clubs('user1') == ['Club One']
+    assert rescraped.positions['/organization/new'] == 3
+    with pytest.raises(KeyError):
+        rescraped.follow('user1', '/organization/club-0')
@@ -0,0 +1,23 @@
+import pandas as pd
+
+import clubsScrape
+import fixtureSite
+
+
+def scrape(pages, tmp_path, max_age_days=None):
+    with fixtureSite.FixtureServer(pages, fixtureSite.build_endpoints(5)) as server:
+        clubsScrape.main('http', 2, server.url, incremental=True, max_age_days=max_age_days, listing='api',
+                         snapshot_path=str(tmp_path / 'search_snapshot.pkl'), output_dir=str(tmp_path))
+    return pd.read_csv(tmp_path / 'organization_data.csv').set_index('Name')
+
+
+def test_failed_refetch_keeps_the_checkpointed_row(tmp_path):
+    pages = fixtureSite.build_pages(5)
+    first = scrape(pages, tmp_path)
+    name = "Organization 1 & Friends"
+    assert first.loc[name, 'Email'] != 'Error fetching data'
+
+    # Every organization is stale, and the page of one of them fails this time
+    del pages['/organization/org-1']
+    second = scrape(pages, tmp_path, max_age_days=0)
+    assert second.loc[name].to_dict() == first.loc[name].to_dict()
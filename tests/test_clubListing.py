@@ -0,0 +1,33 @@
+import json
+
+import clubsScrape
+import fixtureSite
+
+
+def paged_endpoint(n_organizations, page_cap, report_count=True):
+    # Search endpoint that returns at most page_cap organizations per request
+    search = fixtureSite.search_api(n_organizations)
+
+    def endpoint(path, query):
+        content_type, body = search(path, query)
+        page = json.loads(body)
+        page['value'] = page['value'][:page_cap]
+        if not report_count:
+            del page['@odata.count']
+        return content_type, json.dumps(page).encode('utf-8')
+
+    return {clubsScrape.search_path: endpoint}
+
+
+def test_capped_pages_keep_going_until_the_reported_count():
+    with fixtureSite.FixtureServer({}, paged_endpoint(45, page_cap=10)) as server:
+        organizations = list(clubsScrape.iter_organizations(server.url, batch_size=20))
+    assert [link for _, link, _ in organizations] == [f"/organization/org-{i}" for i in range(45)]
+
+
+def test_short_page_ends_the_listing_without_a_count():
+    with fixtureSite.FixtureServer({}, paged_endpoint(45, page_cap=50, report_count=False)) as server:
+        organizations = list(clubsScrape.iter_organizations(server.url, batch_size=20))
+        requests = server.requests
+    assert len(organizations) == 45
+    assert requests == 3
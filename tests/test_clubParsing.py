@@ -0,0 +1,123 @@
+import glob
+import os
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+import clubsScrape
+
+# Saved club pages, parsed by the current functions with every available parser
+# and compared field by field with the functions before lxml and the strainers
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'clubs')
+DETAIL_PAGES = sorted(glob.glob(os.path.join(FIXTURES_DIR, 'organization_*.html')))
+
+try:
+    import lxml
+    PARSERS = ['html.parser', 'lxml']
+except ImportError:
+    PARSERS = ['html.parser']
+
+
+def read_fixture(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+# The extraction as it was before lxml, strainers and compiled patterns
+def reference_names_links_and_images(html_content):
+    soup = BeautifulSoup(html_content, 'html.parser')
+    organizations = soup.find('ul', class_='MuiList-root MuiList-padding').find_all('a')
+    names = []
+    links = []
+    image_sources = []
+
+    for org in organizations:
+        name = org.find('div', style=lambda x: x and 'font-size: 1.125rem;' in x).text.strip()
+        link = org.get('href')
+        img_tag = org.find('img')
+        image_src = img_tag.get('src') if img_tag else 'No image available'
+
+        names.append(name)
+        links.append(link)
+        image_sources.append(image_src)
+
+    return names, links, image_sources
+
+
+def reference_details_from_html(html_content):
+    website = 'No website available'
+    instagram = 'No Instagram available'
+    email = 'No email available'
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    description_elem = soup.select_one('.bodyText-large.userSupplied')
+    description = description_elem.get_text('\n', strip=True) if description_elem else ''
+    if not description:
+        description = 'No description available'
+
+    email_span = soup.find('span', class_='sr-only', string='Contact Email')
+    if email_span:
+        parent_div = email_span.parent
+        if parent_div:
+            email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', parent_div.text)
+            if email_match:
+                email = email_match.group()
+
+    if email == 'No email available':
+        email_div = soup.find('div', string=lambda text: text and 'E:' in text if text else False)
+        if email_div:
+            email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', email_div.text)
+            if email_match:
+                email = email_match.group()
+
+    if email == 'No email available':
+        all_email_matches = re.findall(r'[\w\.-]+@[\w\.-]+\.\w+', html_content)
+        if all_email_matches:
+            email = all_email_matches[0]
+
+    for link in soup.find_all('a', attrs={'href': True}):
+        href = link['href']
+        aria_label = link.get('aria-label', '').lower()
+
+        if ('visit our site' in aria_label or
+            'globe' in str(link) or
+            (href.startswith('http') and
+             not any(social in href for social in ['instagram', 'facebook', 'linkedin', 'youtube', 'twitter', 'calendar.google']))):
+            website = href
+            if 'visit our site' in aria_label or 'globe' in str(link):
+                break
+
+        if 'instagram' in aria_label or 'instagram.com' in href:
+            instagram = href
+
+    return description, email, website, instagram
+
+
+def test_fixtures_cover_every_email_source():
+    assert len(DETAIL_PAGES) >= 4
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_listing_matches_reference(monkeypatch, parser):
+    monkeypatch.setattr(clubsScrape, 'HTML_PARSER', parser)
+    html_content = read_fixture(os.path.join(FIXTURES_DIR, 'organizations.html'))
+    expected = reference_names_links_and_images(html_content)
+    names, links, image_sources = clubsScrape.extract_names_links_and_images(html_content)
+
+    assert len(names) == len(expected[0]) == 5
+    for field, actual, wanted in zip(['name', 'link', 'image_src'], (names, links, image_sources), expected):
+        assert actual == wanted, field
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+@pytest.mark.parametrize('path', DETAIL_PAGES, ids=os.path.basename)
+def test_details_match_reference(monkeypatch, parser, path):
+    monkeypatch.setattr(clubsScrape, 'HTML_PARSER', parser)
+    html_content = read_fixture(path)
+    expected = reference_details_from_html(html_content)
+    actual = clubsScrape.extract_details_from_html(html_content)
+
+    for field, value, wanted in zip(['description', 'email', 'website', 'instagram'], actual, expected):
+        assert value == wanted, field
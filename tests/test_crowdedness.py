@@ -0,0 +1,39 @@
+import pytest
+
+import crowdedness
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_report_times_do_not_refill_the_rate_limit():
+    clock = FakeClock()
+    aggregator = crowdedness.CrowdAggregator(['Four Lakes Market'], clock=clock)
+    for _ in range(crowdedness.RATE_BURST):
+        aggregator.report('Four Lakes Market', 'user1', 3)
+
+    # A report dated far in the future does not buy more tokens
+    with pytest.raises(crowdedness.RateLimitError):
+        aggregator.report('Four Lakes Market', 'user1', 3, when=clock.now + 86400)
+
+    # The server clock going backwards does not drain them either
+    clock.now += crowdedness.RATE_SECONDS
+    aggregator.report('Four Lakes Market', 'user1', 3)
+    clock.now -= 3 * crowdedness.RATE_SECONDS
+    with pytest.raises(crowdedness.RateLimitError):
+        aggregator.report('Four Lakes Market', 'user1', 3)
+
+
+def test_idle_users_are_forgotten():
+    clock = FakeClock()
+    aggregator = crowdedness.CrowdAggregator(['Four Lakes Market'], clock=clock)
+    aggregator.report('Four Lakes Market', 'user1', 3)
+    aggregator.report('Four Lakes Market', 'user2', 3)
+    clock.now += crowdedness.RATE_BURST * crowdedness.RATE_SECONDS
+    aggregator.report('Four Lakes Market', 'user3', 3)
+    assert list(aggregator.tokens) == ['user3']
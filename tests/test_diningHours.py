@@ -0,0 +1,37 @@
+import os
+from datetime import date, datetime
+
+import pandas as pd
+
+import diningHours
+
+LOCATION = {
+    'name': 'Four Lakes Market',
+    'dates_of_operation': 'Jan 12 - May 9',
+    'breakfast_hours': '7AM - 10AM',
+    'lunch_hours': '11AM - 2PM',
+    'dinner_hours': 'Closed'
+}
+
+
+def test_dates_in_the_scrape_year():
+    assert diningHours.parse_dates('Jan 12 - May 9', date(2025, 3, 1)) == (date(2025, 1, 12), date(2025, 5, 9))
+    assert diningHours.parse_dates('Aug 30 - Jan 5', date(2025, 9, 1)) == (date(2025, 8, 30), date(2026, 1, 5))
+
+
+def test_december_scrape_places_spring_term_in_the_next_year():
+    assert diningHours.parse_dates('Jan 12 - May 9', date(2025, 12, 15)) == (date(2026, 1, 12), date(2026, 5, 9))
+    # A range still running at the scrape date stays where it is
+    assert diningHours.parse_dates('Sep 2 - Dec 19', date(2025, 12, 15)) == (date(2025, 9, 2), date(2025, 12, 19))
+
+
+def test_december_scrape_keeps_halls_open_in_spring(tmp_path):
+    path = str(tmp_path / 'dining_hall_locations.csv')
+    pd.DataFrame([LOCATION]).to_csv(path, index=False)
+    scraped = datetime(2025, 12, 15, 8, 0).timestamp()
+    os.utime(path, (scraped, scraped))
+
+    schedule = diningHours.load_schedule(path)
+    assert schedule.open_at(datetime(2026, 2, 3, 8, 30)) == ['Four Lakes Market']
+    assert schedule.open_at(datetime(2025, 12, 16, 8, 30)) == []
+    assert schedule.halls[0].next_opening(datetime(2025, 12, 16, 8, 30)) == datetime(2026, 1, 12, 7, 0)
@@ -0,0 +1,43 @@
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import fetchCache
+import fixtureSite
+
+PAGES = {'/page': '<html><body>cached</body></html>'}
+
+
+def test_request_keeps_the_session_signature():
+    base = list(inspect.signature(requests.Session.request).parameters)
+    ours = list(inspect.signature(fetchCache.CachedSession.request).parameters)
+    assert ours[:5] == base[:5]
+
+
+def test_positional_arguments_reach_the_cache(tmp_path):
+    cache = fetchCache.PageCache(str(tmp_path), 'cache')
+    with fixtureSite.FixtureServer(PAGES) as server:
+        session = fetchCache.CachedSession(cache)
+        try:
+            for _ in range(2):
+                response = session.request('GET', f"{server.url}/page", {'q': '1'}, None, {'Accept': 'text/html'})
+                assert response.text == PAGES['/page']
+        finally:
+            session.close()
+        assert server.requests == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_counters_are_exact_under_concurrent_lookups(tmp_path):
+    cache = fetchCache.PageCache(str(tmp_path), 'cache')
+    with fixtureSite.FixtureServer(PAGES) as server:
+        session = fetchCache.CachedSession(cache)
+        try:
+            session.get(f"{server.url}/page", timeout=10)
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                list(executor.map(lambda _: session.get(f"{server.url}/page", timeout=10), range(400)))
+        finally:
+            session.close()
+    assert cache.stats()['hits'] == 400
+    assert cache.stats()['misses'] == 1
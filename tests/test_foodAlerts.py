@@ -0,0 +1,18 @@
+import foodAlerts
+
+
+def test_duplicate_terms_alert_once():
+    matcher = foodAlerts.AlertMatcher({'ann': ['Pizza', 'pizza', ' PIZZA! '], 'bob': ['pizza']})
+    menus = {'lunch': [{'location_name': 'Four Lakes Market', 'item_name': 'Pepperoni Pizza'}]}
+
+    alerts, stats = foodAlerts.match_menus(matcher, menus)
+
+    assert len(matcher.terms) == 1
+    assert alerts['ann'] == {'Four Lakes Market': ({'item_name': 'Pepperoni Pizza', 'meal': 'lunch', 'term': 'pizza'},)}
+    assert alerts['bob'] == alerts['ann']
+    assert stats['matches'] == 2
+
+
+def test_watchers_keep_first_seen_order():
+    matcher = foodAlerts.AlertMatcher({'carl': ['soup'], 'ann': ['Soup'], 'bob': ['soup']})
+    assert list(matcher.watchers[0]) == ['carl', 'ann', 'bob']
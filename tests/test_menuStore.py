@@ -0,0 +1,39 @@
+import dishPool
+import menuStore
+import nutrisliceClient
+
+
+def raw_item(food_id, name, calories):
+    return {'food': {'id': food_id, 'name': name, 'rounded_nutrition_info': {'calories': calories}}}
+
+
+def test_dish_pool_shares_dishes_across_locations():
+    dishes = dishPool.DishPool()
+    raw = [raw_item(1, 'Pizza', 300), raw_item(2, 'Salad', 150)]
+    four_lakes = nutrisliceClient.build_menu_items(raw, 'Four Lakes Market', dishes=dishes)
+    gordon = nutrisliceClient.build_menu_items(raw, 'Gordon Avenue Market', dishes=dishes)
+
+    assert len(dishes) == 2
+    assert four_lakes[0].dish is gordon[0].dish
+    assert gordon[0]['location_name'] == 'Gordon Avenue Market'
+    assert gordon[0] == dict(nutrisliceClient.build_menu_items(raw, 'Gordon Avenue Market')[0])
+
+
+def test_upsert_keeps_dishes_that_share_a_name(tmp_path):
+    conn = menuStore.connect(str(tmp_path / 'menus.db'))
+    items = [
+        {'location_name': 'Four Lakes Market', 'item_name': 'Soup', 'calories': '100', 'dietary_traits': ''},
+        {'location_name': 'Four Lakes Market', 'item_name': 'Soup', 'calories': '250', 'dietary_traits': ''},
+        {'location_name': 'Four Lakes Market', 'item_name': 'Soup', 'calories': '250', 'dietary_traits': ''},
+        {'location_name': 'Gordon Avenue Market', 'item_name': 'Soup', 'calories': '100', 'dietary_traits': ''},
+    ]
+    assert menuStore.upsert_menu_items(conn, items, 'lunch', '2024-09-03') == 3
+    menu = menuStore.get_menu(conn, 'Four Lakes Market', 'lunch', '2024-09-03')
+    assert sorted(item['calories'] for item in menu) == ['100', '250']
+    assert conn.execute("SELECT COUNT(*) FROM dishes").fetchone()[0] == 2
+
+    # A re-scrape replaces the menus of the locations it covers and keeps the others
+    menuStore.upsert_menu_items(conn, items[:1], 'lunch', '2024-09-03')
+    assert len(menuStore.get_menu(conn, 'Four Lakes Market', 'lunch', '2024-09-03')) == 1
+    assert len(menuStore.get_menu(conn, 'Gordon Avenue Market', 'lunch', '2024-09-03')) == 1
+    conn.close()
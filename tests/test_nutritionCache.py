@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import nutritionCache
+
+
+def details(food_id, protein):
+    return {'food_id': food_id, 'calories': 100, 'protein_g': protein, 'carbs_g': 10,
+            'fat_g': 5, 'ingredients': 'water'}
+
+
+def test_item_identity_prefers_food_id():
+    assert nutritionCache.item_identity("Tuna Salad", 12) == 'food:12'
+    assert nutritionCache.item_identity("Tuna  Salad!", None) == 'name:tuna salad'
+    assert nutritionCache.item_identity("Tuna Salad", float('nan')) == 'name:tuna salad'
+
+
+def test_dishes_sharing_a_name_keep_their_own_details(tmp_path):
+    cache = nutritionCache.NutritionCache(str(tmp_path / 'cache.db'))
+    menus = {('2024-09-03', 'lunch'): [{'item_name': 'Pizza', 'food_id': 1}, {'item_name': 'Pizza', 'food_id': 2}]}
+    foods = {'food:1': details(1, 10), 'food:2': details(2, 20)}
+    found, stats = nutritionCache.update_nutrition(cache, menus, foods)
+    assert stats == {'dishes': 2, 'stored': 2, 'cached': 0, 'unavailable': 0}
+    assert found['food:1']['protein_g'] == 10
+    assert found['food:2']['protein_g'] == 20
+
+    # A later API run that brought no details for one of them reads it from the cache
+    found, stats = nutritionCache.update_nutrition(cache, menus, {'food:1': details(1, 11)})
+    assert stats == {'dishes': 2, 'stored': 0, 'cached': 2, 'unavailable': 0}
+    assert found['food:2']['protein_g'] == 20
+    cache.close()
+
+
+def test_items_without_id_fall_back_to_the_name(tmp_path):
+    cache = nutritionCache.NutritionCache(str(tmp_path / 'cache.db'))
+    nutritionCache.update_nutrition(cache, {'lunch': [{'item_name': 'Tuna Salad', 'food_id': 7}]},
+                                    {'food:7': details(7, 25)})
+    found, stats = nutritionCache.update_nutrition(
+        cache, {'lunch': [{'item_name': 'tuna salad'}, {'item_name': 'Soup'}]}, {})
+    assert stats == {'dishes': 2, 'stored': 0, 'cached': 1, 'unavailable': 1}
+    assert found['name:tuna salad']['food_id'] == 7
+    cache.close()
+
+
+def test_stale_details_are_not_used(tmp_path):
+    cache = nutritionCache.NutritionCache(str(tmp_path / 'cache.db'), max_age=timedelta(days=1))
+    nutritionCache.update_nutrition(cache, {'lunch': [{'item_name': 'Soup', 'food_id': 3}]},
+                                    {'food:3': details(3, 5)})
+    later = datetime.now() + timedelta(days=2)
+    assert cache.get_fresh(['food:3'], now=later) == {}
+    assert cache.evict_stale(now=later) == 1
+    cache.close()
+
+
+def test_only_new_and_stale_details_are_stored(tmp_path):
+    cache = nutritionCache.NutritionCache(str(tmp_path / 'cache.db'), max_age=timedelta(days=1))
+    menus = {'lunch': [{'item_name': 'Soup', 'food_id': 3}, {'item_name': 'Salad', 'food_id': 4}]}
+    foods = {'food:3': details(3, 5), 'food:4': details(4, 6)}
+    nutritionCache.update_nutrition(cache, menus, foods)
+
+    # Fresh details are not written again on the next run
+    found, stats = nutritionCache.update_nutrition(cache, menus, {'food:3': details(3, 9), 'food:4': details(4, 6)})
+    assert stats['stored'] == 0
+    assert found['food:3']['protein_g'] == 5
+
+    # Once stale they are replaced by what the menus brought
+    old = (datetime.now() - timedelta(days=2)).isoformat(timespec='seconds')
+    cache.conn.execute("UPDATE nutrition SET fetched_at = ? WHERE identity = 'food:3'", (old,))
+    found, stats = nutritionCache.update_nutrition(cache, menus, {'food:3': details(3, 9), 'food:4': details(4, 6)})
+    assert stats == {'dishes': 2, 'stored': 1, 'cached': 1, 'unavailable': 0}
+    assert found['food:3']['protein_g'] == 9
+    cache.close()
@@ -0,0 +1,27 @@
+import argparse
+
+import scrapeMetrics
+
+
+def parse(argv):
+    parser = argparse.ArgumentParser()
+    scrapeMetrics.add_metrics_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def test_progress_is_left_out_of_metrics_runs(capsys):
+    try:
+        scrapeMetrics.enable_from_args(parse([]))
+        scrapeMetrics.progress("Processing 1/10")
+        assert capsys.readouterr().out == "Processing 1/10\n"
+
+        scrapeMetrics.enable_from_args(parse(['--metrics']))
+        scrapeMetrics.progress("Processing 1/10")
+        assert capsys.readouterr().out == ""
+
+        scrapeMetrics.enable_from_args(parse(['--metrics', '--verbose']))
+        scrapeMetrics.progress("Processing 1/10")
+        assert capsys.readouterr().out == "Processing 1/10\n"
+    finally:
+        scrapeMetrics.disable()
+        scrapeMetrics.show_progress(True)
@@ -0,0 +1,41 @@
+import searchIndex
+
+CLUBS = ["Anime Club", "Animal Rescue", "Theatre Troupe", "Forever Young", "Chess Club", "Theater of the Absurd"]
+
+
+def club_index(names=CLUBS):
+    return searchIndex.build_index(({'kind': 'club', 'title': name}, [(name, searchIndex.TITLE_WEIGHT)])
+                                   for name in names)
+
+
+def titles(results):
+    return [result['title'] for result in results]
+
+
+def test_stop_word_prefixes_match_while_typing():
+    index = club_index()
+    assert set(titles(index.search("a"))) == {"Anime Club", "Animal Rescue", "Theater of the Absurd"}
+    assert set(titles(index.search("an"))) == {"Anime Club", "Animal Rescue"}
+    assert set(titles(index.search("the"))) == {"Theatre Troupe", "Theater of the Absurd"}
+    assert titles(index.search("for")) == ["Forever Young"]
+
+
+def test_finished_stop_words_are_dropped():
+    index = club_index()
+    assert titles(index.search("the ")) == []
+    # "the" is done and dropped; only "club" is typed as a prefix
+    assert set(titles(index.search("the club"))) == {"Anime Club", "Chess Club"}
+    # The prefix stays on the word being typed, not the finished word before it
+    assert titles(index.search("chess a")) == []
+    assert titles(index.search("anime c")) == ["Anime Club"]
+
+
+def test_short_prefixes_keep_the_most_common_words():
+    # More rare words starting with "b" than a prefix expands to, all sorting
+    # before "band", which five clubs share
+    names = [f"Bab{i:03d} Society" for i in range(searchIndex.MAX_PREFIX_EXPANSIONS + 10)]
+    names += [f"Zz{i} Band" for i in range(5)]
+    index = club_index(names)
+    found = titles(index.search("b", limit=len(names)))
+    assert {f"Zz{i} Band" for i in range(5)} <= set(found)
+    assert len(found) == searchIndex.MAX_PREFIX_EXPANSIONS - 1 + 5
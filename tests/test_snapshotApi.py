@@ -0,0 +1,150 @@
+import asyncio
+import gzip
+import json
+import threading
+
+import pandas as pd
+
+import snapshotApi
+
+
+def write_csvs(tmp_path, n_clubs=30):
+    pd.DataFrame([{'name': 'Four Lakes Market', 'link': '', 'address': '640 Elm Dr',
+                   'dates_of_operation': '', 'breakfast_hours': '7am', 'lunch_hours': '11am',
+                   'dinner_hours': '5pm'}]).to_csv(tmp_path / 'locations.csv', index=False)
+    menu_csvs = {}
+    for meal_type in ['breakfast', 'lunch', 'dinner']:
+        path = tmp_path / f'{meal_type}.csv'
+        pd.DataFrame([{'location_name': 'Four Lakes Market', 'item_name': f'{meal_type} special',
+                       'calories': '300', 'dietary_traits': 'Vegan'}]).to_csv(path, index=False)
+        menu_csvs[meal_type] = str(path)
+    pd.DataFrame([{'Name': f'Club {i}', 'Description': 'We meet weekly', 'Email': f'club{i}@wisc.edu',
+                   'Website': 'No website available', 'Instagram': 'No Instagram available',
+                   'Image_Source': 'No image available'} for i in range(n_clubs)]
+                 ).to_csv(tmp_path / 'clubs.csv', index=False)
+    return str(tmp_path / 'locations.csv'), menu_csvs, str(tmp_path / 'clubs.csv')
+
+
+def make_server(tmp_path, n_clubs=30):
+    locations_csv, menu_csvs, clubs_csv = write_csvs(tmp_path, n_clubs)
+    return snapshotApi.SnapshotServer(lambda: snapshotApi.build_snapshot(locations_csv, menu_csvs, clubs_csv),
+                                      lambda: None)
+
+
+def header(head, name):
+    for line in head.decode('latin-1').split('\r\n'):
+        key, _, value = line.partition(':')
+        if key.lower() == name.lower():
+            return value.strip()
+    return None
+
+
+def test_etag_revalidation_returns_304(tmp_path):
+    server = make_server(tmp_path)
+    head, body = server.respond('GET', '/halls/four-lakes-market', {})
+    assert head.startswith(b"HTTP/1.1 200")
+    etag = header(head, 'ETag')
+
+    head, body = server.respond('GET', '/halls/four-lakes-market', {'if-none-match': etag})
+    assert head.startswith(b"HTTP/1.1 304") and body is None
+    assert header(head, 'ETag') == etag
+    # Weak comparison, as If-None-Match asks for
+    head, _ = server.respond('GET', '/halls/four-lakes-market', {'if-none-match': f'"other", W/{etag}'})
+    assert head.startswith(b"HTTP/1.1 304")
+    head, _ = server.respond('GET', '/halls/four-lakes-market', {'if-none-match': '"other"'})
+    assert head.startswith(b"HTTP/1.1 200")
+
+
+def test_gzip_is_negotiated(tmp_path):
+    server = make_server(tmp_path)
+    plain_head, plain = server.respond('GET', '/clubs', {})
+    assert header(plain_head, 'Content-Encoding') is None
+    assert json.loads(plain)['clubs'][0]['website'] is None
+
+    head, body = server.respond('GET', '/clubs', {'accept-encoding': 'br, gzip'})
+    assert header(head, 'Content-Encoding') == 'gzip'
+    assert gzip.decompress(body) == plain
+    assert header(head, 'ETag') != header(plain_head, 'ETag')
+    # A gzip ETag only revalidates the gzip variant's 304
+    head, _ = server.respond('GET', '/clubs', {'accept-encoding': 'gzip', 'if-none-match': header(head, 'ETag')})
+    assert head.startswith(b"HTTP/1.1 304")
+
+    head, _ = server.respond('GET', '/clubs', {'accept-encoding': 'gzip;q=0, identity'})
+    assert header(head, 'Content-Encoding') is None
+    # Small bodies are not worth compressing
+    head, _ = server.respond('GET', '/halls/four-lakes-market/menu/lunch', {'accept-encoding': 'gzip'})
+    assert header(head, 'Content-Encoding') is None
+
+
+def test_unsupported_methods_get_405(tmp_path):
+    server = make_server(tmp_path)
+    head, body = server.respond('POST', '/clubs', {})
+    assert head.startswith(b"HTTP/1.1 405")
+    assert header(head, 'Allow') == 'GET, HEAD'
+    head, body = server.respond('HEAD', '/clubs', {})
+    assert head.startswith(b"HTTP/1.1 200") and body is None
+    assert server.respond('GET', '/nowhere', {})[0].startswith(b"HTTP/1.1 404")
+
+
+def test_reload_swaps_the_whole_snapshot(tmp_path):
+    server = make_server(tmp_path)
+    old = server.snapshot
+    old_etag = header(server.respond('GET', '/clubs', {})[0], 'ETag')
+    new = snapshotApi.build_snapshot(*write_csvs(tmp_path, n_clubs=5))
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_build():
+        started.set()
+        release.wait(5)
+        return new
+
+    async def run():
+        server.build = slow_build
+        reload = asyncio.ensure_future(server.reload())
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        # Requests during the build are served from the old snapshot
+        assert server.snapshot is old
+        assert header(server.respond('GET', '/clubs', {})[0], 'ETag') == old_etag
+        release.set()
+        await reload
+
+    asyncio.run(run())
+    assert server.snapshot is new
+    assert len(json.loads(server.respond('GET', '/clubs', {})[1])['clubs']) == 5
+
+
+def test_failed_reload_keeps_serving_the_old_snapshot(tmp_path):
+    server = make_server(tmp_path)
+    old = server.snapshot
+
+    def broken_build():
+        raise ValueError("CSV is half written")
+
+    server.build = broken_build
+    asyncio.run(server.reload())
+    assert server.snapshot is old
+
+
+def test_keep_alive_connection_serves_a_304(tmp_path):
+    server = make_server(tmp_path)
+
+    async def run():
+        listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"GET /halls HTTP/1.1\r\nHost: test\r\n\r\n")
+        head = await reader.readuntil(b'\r\n\r\n')
+        body = await reader.readexactly(int(header(head, 'Content-Length')))
+        writer.write(f"GET /halls HTTP/1.1\r\nHost: test\r\nIf-None-Match: {header(head, 'ETag')}\r\n"
+                     f"Connection: close\r\n\r\n".encode('latin-1'))
+        second = await reader.read()
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return head, body, second
+
+    head, body, second = asyncio.run(run())
+    assert head.startswith(b"HTTP/1.1 200") and header(head, 'Connection') == 'keep-alive'
+    assert json.loads(body)['halls'][0]['name'] == 'Four Lakes Market'
+    assert second.startswith(b"HTTP/1.1 304") and second.endswith(b"Connection: close\r\n\r\n")
@@ -0,0 +1,29 @@
+import wisconsin_union_scraper
+
+PAGE = """<html><body>
+<header><nav><a class="nav-hours" href="/hours">Hours</a><a href="/locations">Locations</a></nav></header>
+<main>
+  <h1>Strada</h1>
+  <div class="venue-hours"><h2>Hours</h2><ul><li>Mon-Fri: 7am - 10pm</li><li>Sat-Sun: 11am - 8pm</li></ul></div>
+  <h3>Location</h3><p>Memorial Union, 800 Langdon St</p>
+  <a href="/dine/menus/strada/">View Menu</a>
+</main>
+<footer><div class="footer-hours"><strong>Building hours</strong> 6am - midnight</div>
+<div class="footer-address">800 Langdon St, Madison</div></footer>
+</body></html>"""
+
+
+def test_hours_and_location_come_from_the_main_content():
+    details = wisconsin_union_scraper.extract_venue_details(
+        PAGE, "https://union.wisc.edu/dine/find-food-and-drink/strada/")
+    assert details["Hours"] == "Mon-Fri: 7am - 10pm; Sat-Sun: 11am - 8pm"
+    assert details["Location"] == "Memorial Union, 800 Langdon St"
+    assert details["Menu Links"] == "https://union.wisc.edu/dine/menus/strada/"
+
+
+def test_page_chrome_is_skipped_without_a_main_element():
+    page = PAGE.replace("<main>", "<div>").replace("</main>", "</div>")
+    details = wisconsin_union_scraper.extract_venue_details(
+        page, "https://union.wisc.edu/dine/find-food-and-drink/strada/")
+    assert details["Hours"] == "Mon-Fri: 7am - 10pm; Sat-Sun: 11am - 8pm"
+    assert details["Location"] == "Memorial Union, 800 Langdon St"
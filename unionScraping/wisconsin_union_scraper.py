@@ -1,47 +1,201 @@
 import re
 import csv
-import requests
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
-def scrape_restaurants_to_csv():
-    base_url = "https://union.wisc.edu"
-    target_url = f"{base_url}/dine/find-food-and-drink/"
-    response = requests.get(target_url)
-    response.raise_for_status()
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Regex to match hrefs that begin with "/dine/find-food-and-drink/" 
-    # and have some text after that (e.g., "/strada/", "/der-rathskeller/", etc.)
-    pattern = re.compile(r"^/dine/find-food-and-drink/[^/]+")
-
-    # Find all <a> tags whose "href" matches the pattern
-    a_tags = soup.find_all("a", href=pattern)
-
-    # List of terms to exclude
-    exclude_terms = [
-        "Menu View", 
-        "Map View", 
-        "View Menu", 
-        "View Map", 
-        "Location",
-        "Directions"
-    ]
-
-    with open("restaurants.csv", mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Restaurant Name"])  # CSV header
-
-        for a_tag in a_tags:
-            # Extract the visible text
-            restaurant_name = a_tag.get_text(strip=True)
-            
-            # Skip if the name is in the exclude list or is empty
-            if (restaurant_name and 
-                not any(term.lower() in restaurant_name.lower() for term in exclude_terms)):
-                writer.writerow([restaurant_name])
-
-    print("Scraping complete. The CSV file 'restaurants.csv' has been created.")
+# Modules shared by the scrapers live in ../shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import fetchCache
+import scrapeMetrics
+
+base_url = "https://union.wisc.edu"
+
+# Regex to match hrefs that begin with "/dine/find-food-and-drink/"
+# and have some text after that (e.g., "/strada/", "/der-rathskeller/", etc.)
+VENUE_LINK_PATTERN = re.compile(r"^/dine/find-food-and-drink/[^/#?]+")
+
+# Link texts that point at a venue page but are not its name
+EXCLUDE_TERMS = [
+    "Menu View",
+    "Map View",
+    "View Menu",
+    "View Map",
+    "Location",
+    "Directions"
+]
+
+# Headings of the hours and location blocks, and the class names of the blocks
+# themselves ("hours", "venue-hours", "venue-location", ...)
+HOURS_PATTERN = re.compile(r"hours", re.IGNORECASE)
+LOCATION_PATTERN = re.compile(r"location|address", re.IGNORECASE)
+HOURS_CLASS_PATTERN = re.compile(r"(^|[-_])hours$", re.IGNORECASE)
+LOCATION_CLASS_PATTERN = re.compile(r"(^|[-_])(location|address)$", re.IGNORECASE)
+MENU_PATTERN = re.compile(r"menu", re.IGNORECASE)
+
+# Site navigation and footers link to "Hours" and "Locations" pages too
+CHROME_TAGS = ["nav", "header", "footer"]
+
+CSV_COLUMNS = ["Restaurant Name", "Link", "Hours", "Location", "Menu Links"]
+
+def extract_venue_links(html_content, site_url=base_url):
+    """
+    Find the venue pages linked from the find-food-and-drink page.
+
+    The same venue is usually linked several times (its name, "View Menu",
+    "Directions", ...), so links are deduplicated by their path and named after
+    the first link text that is not one of EXCLUDE_TERMS.
+
+    Returns:
+    list of tuple: (restaurant name, absolute venue URL), in page order
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+    names = {}
+    for a_tag in soup.find_all("a", href=VENUE_LINK_PATTERN):
+        # "/dine/find-food-and-drink/strada/#menu" and ".../strada" are the same page
+        path = urlsplit(a_tag["href"]).path.rstrip("/") + "/"
+        names.setdefault(path, None)
+
+        # Extract the visible text
+        restaurant_name = a_tag.get_text(strip=True)
+
+        # Skip if the name is in the exclude list or is empty
+        if (names[path] is None and restaurant_name and
+            not any(term.lower() in restaurant_name.lower() for term in EXCLUDE_TERMS)):
+            names[path] = restaurant_name
+
+    return [(name, urljoin(site_url, path)) for path, name in names.items() if name]
+
+def in_page_chrome(element):
+    return element.find_parent(CHROME_TAGS) is not None
+
+def section_text(soup, class_pattern, heading_pattern):
+    """
+    Text of the hours or location block of a venue page: the first element in
+    the main content with a class matching class_pattern, else the element
+    after a heading matching heading_pattern. Navigation, headers and footers
+    are skipped. Lines are joined with "; ".
+    """
+    content = soup.find("main") or soup.find(attrs={"role": "main"}) or soup.body or soup
+    element = next((element for element in content.find_all(class_=class_pattern)
+                    if not in_page_chrome(element)), None)
+    if element is None:
+        heading = next((heading for heading in content.find_all(["h2", "h3", "h4", "dt", "strong"],
+                                                                string=heading_pattern)
+                        if not in_page_chrome(heading)), None)
+        if heading is None:
+            return ''
+        element = heading.find_next_sibling() or heading.parent
+        if element is None:
+            return ''
+
+    lines = [line for line in element.get_text("\n", strip=True).split("\n")
+             if not heading_pattern.fullmatch(line.rstrip(':'))]
+    return "; ".join(lines)
+
+def extract_venue_details(html_content, page_url):
+    """
+    Extract the hours, location and menu links from a venue page.
+
+    Returns:
+    dict: Hours, Location and Menu Links ("; "-separated absolute URLs)
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    menu_links = []
+    for a_tag in soup.find_all("a", href=True):
+        href = a_tag["href"]
+        if href.startswith("#") or not (MENU_PATTERN.search(href) or MENU_PATTERN.search(a_tag.get_text())):
+            continue
+        link = urljoin(page_url, href)
+        # Skip links back to the venue page itself (e.g. "#menu" tabs)
+        if urlsplit(link).path.rstrip("/") == urlsplit(page_url).path.rstrip("/"):
+            continue
+        if link not in menu_links:
+            menu_links.append(link)
+
+    return {
+        "Hours": section_text(soup, HOURS_CLASS_PATTERN, HOURS_PATTERN),
+        "Location": section_text(soup, LOCATION_CLASS_PATTERN, LOCATION_PATTERN),
+        "Menu Links": "; ".join(menu_links)
+    }
+
+def fetch_venue_details(session, venues, max_in_flight=8, timeout=10):
+    """
+    Fetch every venue page concurrently over the shared session.
+
+    Args:
+    session (Session): Session with a connection pool of at least max_in_flight
+    venues (list): (restaurant name, venue URL) tuples from extract_venue_links
+    max_in_flight (int): Maximum number of requests in flight at once
+    timeout (float): Per-request timeout in seconds
+
+    Returns:
+    list of dict: One CSV row per venue, in the same order as venues; the
+    detail columns are left empty where the page could not be fetched
+    """
+    def fetch(venue):
+        name, page_url = venue
+        row = {"Restaurant Name": name, "Link": page_url, "Hours": '', "Location": '', "Menu Links": ''}
+        try:
+            with scrapeMetrics.stage('fetch', url=page_url):
+                response = session.get(page_url, timeout=timeout)
+                response.raise_for_status()
+            with scrapeMetrics.stage('parse', url=page_url):
+                row.update(extract_venue_details(response.text, page_url))
+        except Exception as e:
+            print(f"Error fetching {page_url}: {e}")
+            scrapeMetrics.count('venue_errors')
+        return row
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        return list(executor.map(fetch, venues))
+
+def scrape_restaurants_to_csv(page_cache=None, site_url=base_url, csv_path="restaurants.csv", max_in_flight=8,
+                              timeout=10):
+    target_url = f"{site_url}/dine/find-food-and-drink/"
+
+    # One session for the listing and every venue page, with a connection pool as
+    # large as the number of requests in flight so connections are reused
+    session = fetchCache.CachedSession(page_cache)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    try:
+        with scrapeMetrics.stage('fetch', url=target_url):
+            response = session.get(target_url, timeout=timeout)
+            response.raise_for_status()
+
+        with scrapeMetrics.stage('parse', url=target_url):
+            venues = extract_venue_links(response.text, site_url)
+
+        rows = fetch_venue_details(session, venues, max_in_flight, timeout)
+    finally:
+        session.close()
+
+    with scrapeMetrics.stage('write', file=csv_path), open(csv_path, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"Scraping complete. The CSV file '{csv_path}' has been created with {len(rows)} restaurants.")
+    return rows
 
 if __name__ == "__main__":
-    scrape_restaurants_to_csv()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape Wisconsin Union restaurants to restaurants.csv")
+    parser.add_argument('--site-url', default=base_url, help="Base URL of the site (e.g. a local stand-in server)")
+    parser.add_argument('--output', default="restaurants.csv", help="CSV file to write")
+    parser.add_argument('--workers', type=int, default=8, help="Number of venue pages fetched at once")
+    fetchCache.add_cache_arguments(parser)
+    scrapeMetrics.add_metrics_arguments(parser)
+    args = parser.parse_args()
+    scrapeMetrics.enable_from_args(args)
+    try:
+        scrape_restaurants_to_csv(fetchCache.cache_from_args(args), args.site_url, args.output, args.workers)
+    finally:
+        scrapeMetrics.finish()